@@ -4,46 +4,21 @@ import pandas as pd
 import numpy as np
 import time
 import threading
-import websocket
-import json
+from candle_feed import get_feed
+from streaming_rsi import CandleRSI
 
-# Function to fetch historical data using WebSocket
+# Function to fetch historical data from the live candle subscription
 
 def fetch_data(symbol, timeframe, count=200):
-    data = []
     try:
-        ws = websocket.create_connection("wss://ws.derivws.com/websockets/v3?app_id=1089")
-        request = {
-            "ticks_history": symbol,
-            "adjust_start_time": 1,
-            "count": count,
-            "end": "latest",
-            "granularity": int(timeframe),
-            "style": "candles"
-        }
-        ws.send(json.dumps(request))
-        response = json.loads(ws.recv())
-        ws.close()
-        if 'candles' in response:
-            candles = response['candles']
-            df = pd.DataFrame(candles)
-            if all(col in df.columns for col in ['open', 'close', 'high', 'low']):
-                return df
+        return get_feed().candles(symbol, int(timeframe), count)
     except Exception as e:
         print(f"Error fetching data for {symbol} on timeframe {timeframe}: {e}")
     return None
 
-# RSI Calculation
+# RSI per (symbol, timeframe), updated only with the candles closed since the last cycle
 
-def calculate_rsi(data, period=14):
-    delta = data['close'].diff()
-    gain = np.where(delta > 0, delta, 0)
-    loss = np.where(delta < 0, -delta, 0)
-    avg_gain = pd.Series(gain).rolling(window=period).mean()
-    avg_loss = pd.Series(loss).rolling(window=period).mean()
-    rs = avg_gain / avg_loss
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
+rsi = CandleRSI(period=14)
 
 # Fibonacci Retracement Levels
 
@@ -91,11 +66,10 @@ def analyze_market():
         for tf_label, tf in timeframes.items():
             data = fetch_data(symbol, tf)
             if data is not None:
-                data['rsi'] = calculate_rsi(data)
                 fib_levels = fibonacci_levels(data)
                 support, resistance = support_resistance_levels(data)
                 current_price = data['close'].iloc[-1]
-                rsi_value = data['rsi'].iloc[-1]
+                rsi_value = rsi.latest((symbol, tf), data['epoch'], data['close'])
 
                 if rsi_value < 30 and current_price <= fib_levels['0.618'] and current_price > support:
                     signal = 'Buy'
@@ -145,20 +119,21 @@ def scheduled_updates():
         update_signals()
         time.sleep(300)  # Update every 5 minutes
 
-# Main Tkinter window
+if __name__ == "__main__":
+    # Main Tkinter window
 
-app = tk.Tk()
-app.title("Multi-Pair Trading Signals")
-app.geometry("700x500")
+    app = tk.Tk()
+    app.title("Multi-Pair Trading Signals")
+    app.geometry("700x500")
 
-label = tk.Label(app, text="HOW FAR", font=("Helvetica", 16))
-label.pack(pady=20)
+    label = tk.Label(app, text="HOW FAR", font=("Helvetica", 16))
+    label.pack(pady=20)
 
-signal_text = tk.StringVar()
-signal_display = tk.Label(app, textvariable=signal_text, font=("Helvetica", 10), justify=tk.LEFT, anchor='w')
-signal_display.pack(pady=10, padx=10, fill=tk.BOTH, expand=True)
+    signal_text = tk.StringVar()
+    signal_display = tk.Label(app, textvariable=signal_text, font=("Helvetica", 10), justify=tk.LEFT, anchor='w')
+    signal_display.pack(pady=10, padx=10, fill=tk.BOTH, expand=True)
 
-# Run scheduled updates in a separate thread
-threading.Thread(target=scheduled_updates, daemon=True).start()
+    # Run scheduled updates in a separate thread
+    threading.Thread(target=scheduled_updates, daemon=True).start()
 
-app.mainloop()
+    app.mainloop()
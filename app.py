@@ -3,13 +3,26 @@ import json
 import websocket
 import threading
 import datetime
+from candle_aggregator import CandleAggregator
+from rate_limiter import PRIORITY_LIVE, get_scheduler, scheduler_stats
+from candle_store import get_store
+from deriv_client import DERIV_API_URL, get_client
+from frame_recorder import recorder_from_env
+from streaming_rsi import RSIStreams
+from support_resistance import SupportResistanceTracker
 
 app = Flask(__name__)
 
-DERIV_API_URL = "wss://ws.derivws.com/websockets/v3?app_id=1089"
 SYMBOLS = ["frxXAUUSD", "frxEURUSD", "frxGBPUSD", "frxUSDJPY", "cryBTCUSD", "R_75", "R_50", "R_10", "R_100"]
 
+GRANULARITIES = [300, 900, 1800, 3600]  # 5m, 15m, 30m, 1h
+RSI_GRANULARITY = 300  # RSI runs on 5m closes, previewed with the live price
+LEVEL_WINDOWS = [100, 1000]  # Support/resistance windows, in ticks
+
 live_data = {}
+candles = CandleAggregator(GRANULARITIES)
+rsi = RSIStreams(period=14)
+levels = SupportResistanceTracker(LEVEL_WINDOWS)
 
 def on_message(ws, message):
     """Handles incoming WebSocket messages"""
@@ -17,10 +30,16 @@ def on_message(ws, message):
     if "tick" in data:
         symbol = data["tick"]["symbol"]
         price = float(data["tick"]["quote"])
-        session = get_trading_session()
+        closed = candles.add_tick(symbol, data["tick"]["epoch"], price)
+        if RSI_GRANULARITY in closed:
+            rsi.update(symbol, closed[RSI_GRANULARITY][4])
+        levels.update(symbol, price)
+        support, resistance = levels.levels(symbol)
+        session = get_trading_session(data["tick"]["epoch"])
         signal = "Hold"  # Implement actual signal logic
 
-        live_data[symbol] = {"price": price, "session": session, "signal": signal}
+        live_data[symbol] = {"price": price, "session": session, "signal": signal, "rsi": rsi.preview(symbol, price),
+                             "support": support, "resistance": resistance}
 
 def on_error(ws, error):
     print(f"WebSocket Error: {error}")
@@ -28,11 +47,15 @@ def on_error(ws, error):
 def on_open(ws):
     """Subscribes to live price updates for symbols"""
     for symbol in SYMBOLS:
+        get_scheduler('deriv').acquire(PRIORITY_LIVE)
         ws.send(json.dumps({"ticks": symbol}))
 
-def get_trading_session():
-    """Determines the current trading session"""
-    current_hour = datetime.datetime.utcnow().hour
+def get_trading_session(epoch=None):
+    """Determines the trading session at ``epoch`` (now by default), so replays see the recorded session"""
+    if epoch is None:
+        current_hour = datetime.datetime.utcnow().hour
+    else:
+        current_hour = datetime.datetime.utcfromtimestamp(int(epoch)).hour
     if 0 <= current_hour < 8:
         return "Asian"
     elif 8 <= current_hour < 16:
@@ -40,9 +63,28 @@ def get_trading_session():
     else:
         return "New York"
 
+def seed_history():
+    """Fills the candle series and the RSI from cached history (topped up from Deriv) before ticks arrive"""
+    for symbol in SYMBOLS:
+        for granularity in GRANULARITIES:
+            try:
+                history = get_store().fetch(get_client(), symbol, granularity, candles.max_candles)
+            except Exception as e:
+                print(f"Error loading {symbol} history ({granularity}s): {e}")
+                continue
+            if history is None or history.empty:
+                continue
+            candles.seed(symbol, granularity, history.to_dict('records'))
+            if granularity == RSI_GRANULARITY:
+                # The last candle is still open; it is fed in when a tick closes it
+                rsi.state(symbol).seed(history['close'].iloc[:-1])
+
 def start_websocket():
-    """Starts WebSocket connection"""
-    ws = websocket.WebSocketApp(DERIV_API_URL, on_message=on_message, on_error=on_error, on_open=on_open)
+    """Starts WebSocket connection, recording every frame when RECORD_FRAMES is set"""
+    seed_history()
+    recorder = recorder_from_env('app')
+    handler = recorder.wrap(on_message) if recorder else on_message
+    ws = websocket.WebSocketApp(DERIV_API_URL, on_message=handler, on_error=on_error, on_open=on_open)
     ws.run_forever()
 
 @app.route('/get_prices', methods=['GET'])
@@ -50,6 +92,22 @@ def get_prices():
     """Returns the latest trading data"""
     return jsonify(live_data)
 
+@app.route('/get_candles/<symbol>/<int:granularity>', methods=['GET'])
+def get_candles(symbol, granularity):
+    """Returns the candles built from live ticks for one symbol and granularity"""
+    return jsonify(candles.candles(symbol, granularity))
+
+@app.route('/get_levels/<symbol>', methods=['GET'])
+def get_levels(symbol):
+    """Returns the rolling support and resistance of one symbol for every tick window"""
+    return jsonify({window: dict(zip(("support", "resistance"), levels.levels(symbol, window)))
+                    for window in LEVEL_WINDOWS})
+
+@app.route('/get_scheduler_stats', methods=['GET'])
+def get_scheduler_stats():
+    """Returns queue depth and wait times for the outbound request schedulers"""
+    return jsonify(scheduler_stats())
+
 if __name__ == '__main__':
     ws_thread = threading.Thread(target=start_websocket)
     ws_thread.daemon = True
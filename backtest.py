@@ -0,0 +1,290 @@
+"""Vectorized backtester for bar data.
+
+Signals, stops and targets are computed for every bar at once; exits are then resolved
+for all candidate trades together by scanning forward in growing blocks of bars, so the
+Python-level work grows with log(holding period) rather than with the number of bars.
+
+Fill rules inside a bar, for a long (shorts are mirrored):
+  * the bar opens at or through the stop or the target (a gap): filled at the open;
+  * the bar's low reaches the stop: filled at the stop, even if the high also reached the
+    target, since the order of the two within the bar is unknown;
+  * otherwise the high reaches the target: filled at the target.
+Trades still open on the last bar are closed at its close.
+
+    python backtest.py btc_1h.csv --lookback 100
+    python backtest.py --synthetic 1000000
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+import indicators
+
+LONG = 1
+SHORT = -1
+
+EXIT_STOP = 'stop_loss'
+EXIT_TARGET = 'take_profit'
+EXIT_END = 'end_of_data'
+
+# Largest (trades x bars) block resolve_exits gathers at once
+MAX_GATHER = 4_000_000
+
+
+def fib_zone_signals(high, low, close, lookback=100):
+    """Signals of the Fibonacci premium/discount strategy in gold.analyze_market and trade.py.
+
+    At every bar the swing high/low is taken over the last ``lookback`` bars (the window the
+    live bots fetch). A close in the premium zone (above the midpoint of the 50% level and
+    the swing high) sells with the stop at the swing high; a close in the discount zone buys
+    with the stop at the swing low. Both target the 50% level. Returns (direction, stop_loss,
+    take_profit) arrays with direction 0 where there is no signal.
+    """
+    high, low, close = (np.asarray(values, dtype=float)[None, :] for values in (high, low, close))
+    swing_high = indicators.rolling_max(high, lookback)[0]
+    swing_low = indicators.rolling_min(low, lookback)[0]
+    close = close[0]
+    fib_50 = swing_high - 0.5 * (swing_high - swing_low)
+    premium_zone = fib_50 + (swing_high - fib_50) / 2
+    discount_zone = fib_50 - (fib_50 - swing_low) / 2
+
+    with np.errstate(invalid='ignore'):
+        sell = close >= premium_zone
+        buy = ~sell & (close <= discount_zone)
+    direction = np.where(sell, SHORT, np.where(buy, LONG, 0))
+    stop_loss = np.where(sell, swing_high, swing_low)
+    take_profit = fib_50
+    # A stop or target equal to the entry cannot be traded
+    valid = (direction != 0) & (stop_loss != close) & (take_profit != close)
+    return np.where(valid, direction, 0), stop_loss, take_profit
+
+
+def rsi_fib_levels(close, rsi, support, resistance, oversold=30, overbought=70, fib_ratio=0.618, reward_ratio=2.0):
+    """Entries and exits of the trade21/copilottrade rules from precomputed indicator arrays.
+
+    Buys when RSI is below ``oversold`` and the close is at or below the ``fib_ratio``
+    retracement but above support, with the stop at support and the target ``reward_ratio``
+    times that risk away; sells are the mirror image against resistance.
+    """
+    fib = resistance - fib_ratio * (resistance - support)
+    with np.errstate(invalid='ignore'):
+        buy = (rsi < oversold) & (close <= fib) & (close > support)
+        sell = ~buy & (rsi > overbought) & (close >= fib) & (close < resistance)
+    direction = np.where(buy, LONG, np.where(sell, SHORT, 0))
+    stop_loss = np.where(buy, support, resistance)
+    take_profit = close + np.where(buy, 1, -1) * reward_ratio * np.abs(close - stop_loss)
+    return direction, stop_loss, take_profit
+
+
+def rsi_fib_signals(high, low, close, rsi_period=14, oversold=30, overbought=70, fib_ratio=0.618, reward_ratio=2.0,
+                    window=200):
+    """Signals of trade21.evaluate_signal at every bar, with support/resistance over the last ``window`` bars"""
+    high, low, close = (np.asarray(values, dtype=float)[None, :] for values in (high, low, close))
+    rsi = indicators.rsi(close, rsi_period)[0]
+    support = indicators.rolling_min(low, window)[0]
+    resistance = indicators.rolling_max(high, window)[0]
+    return rsi_fib_levels(close[0], rsi, support, resistance, oversold, overbought, fib_ratio, reward_ratio)
+
+
+def resolve_exits(open_, high, low, close, entry_index, direction, stop_loss, take_profit, max_bars=None):
+    """Finds the exit bar and fill price of every trade, entered at the close of ``entry_index``.
+
+    All trades are checked together against the next 8, then 16, 32, ... bars; each block
+    is one 2-D gather, so even a million-bar history needs only a few dozen passes.
+    Returns (exit_index, exit_price, exit_reason) arrays.
+    """
+    open_, high, low, close = (np.asarray(values, dtype=float) for values in (open_, high, low, close))
+    entry_index = np.asarray(entry_index, dtype=np.int64)
+    direction = np.asarray(direction)
+    stop_loss = np.asarray(stop_loss, dtype=float)
+    take_profit = np.asarray(take_profit, dtype=float)
+    n_bars = len(close)
+    last_bar = n_bars - 1
+    if max_bars is not None:
+        last_bars = np.minimum(entry_index + max_bars, last_bar)
+    else:
+        last_bars = np.full(len(entry_index), last_bar)
+
+    exit_index = last_bars.copy()
+    exit_price = close[last_bars]
+    exit_reason = np.full(len(entry_index), EXIT_END, dtype=object)
+
+    # Work in "long" terms: for shorts, negate prices so the same comparisons apply
+    sign = np.where(direction == SHORT, -1.0, 1.0)
+    active = np.flatnonzero(entry_index < last_bars)
+    offset, block = 1, 8
+    while len(active):
+        steps = np.arange(offset, offset + block)
+        bars = entry_index[active, None] + steps[None, :]
+        in_range = bars <= last_bars[active, None]
+        bars = np.minimum(bars, last_bar)
+
+        s = sign[active, None]
+        bar_open, bar_high, bar_low = open_[bars] * s, high[bars] * s, low[bars] * s
+        # For shorts the negated low is the adverse extreme, so swap high and low
+        adverse = np.where(s > 0, bar_low, bar_high)
+        favourable = np.where(s > 0, bar_high, bar_low)
+        sl = (stop_loss[active] * sign[active])[:, None]
+        tp = (take_profit[active] * sign[active])[:, None]
+
+        gap_stop = bar_open <= sl
+        gap_target = bar_open >= tp
+        hit_stop = adverse <= sl
+        hit_target = favourable >= tp
+        event = (hit_stop | hit_target | gap_stop | gap_target) & in_range
+
+        found = event.any(axis=1)
+        rows = np.flatnonzero(found)
+        if len(rows):
+            first = event[rows].argmax(axis=1)
+            trades = active[rows]
+            bar_index = bars[rows, first]
+            o = open_[bar_index]
+            stop_first = gap_stop[rows, first] | (~gap_target[rows, first] & hit_stop[rows, first])
+            gapped = gap_stop[rows, first] | gap_target[rows, first]
+            price = np.where(stop_first, stop_loss[trades], take_profit[trades])
+            exit_index[trades] = bar_index
+            exit_price[trades] = np.where(gapped, o, price)
+            exit_reason[trades] = np.where(stop_first, EXIT_STOP, EXIT_TARGET)
+
+        # Trades whose window is exhausted without an event keep their end-of-data exit
+        exhausted = entry_index[active] + offset + block - 1 >= last_bars[active]
+        active = active[~found & ~exhausted]
+        offset += block
+        # Grow the block, but keep each gather to a few million elements
+        block = max(8, min(block * 2, MAX_GATHER // max(len(active), 1)))
+    return exit_index, exit_price, exit_reason
+
+
+def select_trades(entry_index, exit_index):
+    """Keeps one position at a time: after a trade exits, the next one is the first signal after its exit bar"""
+    if not len(entry_index):
+        return np.array([], dtype=np.int64)
+    following = np.searchsorted(entry_index, exit_index, side='right')
+    taken = []
+    k = 0
+    while k < len(entry_index):
+        taken.append(k)
+        k = following[k]
+    return np.array(taken, dtype=np.int64)
+
+
+def backtest_metrics(returns, equity):
+    """Win rate, return, drawdown and profit factor for per-trade returns and the equity curve"""
+    if not len(returns):
+        return {'trades': 0, 'win_rate': 0.0, 'total_return': 0.0, 'max_drawdown': 0.0,
+                'profit_factor': 0.0, 'average_return': 0.0}
+    peak = np.maximum.accumulate(np.r_[1.0, equity])
+    drawdown = 1 - np.r_[1.0, equity] / peak
+    gains = returns[returns > 0].sum()
+    losses = -returns[returns < 0].sum()
+    return {
+        'trades': int(len(returns)),
+        'win_rate': float((returns > 0).mean()),
+        'total_return': float(equity[-1] - 1),
+        'max_drawdown': float(drawdown.max()),
+        'profit_factor': float(gains / losses) if losses else float('inf'),
+        'average_return': float(returns.mean()),
+    }
+
+
+def simulate(open_, high, low, close, direction, stop_loss, take_profit, fee=0.0, fraction=1.0, max_bars=None,
+             overlap=False):
+    """Turns per-bar signal arrays into trades; returns a dict of per-trade arrays plus the equity curve"""
+    entry_index = np.flatnonzero(direction)
+    exit_index, exit_price, exit_reason = resolve_exits(
+        open_, high, low, close, entry_index, direction[entry_index],
+        stop_loss[entry_index], take_profit[entry_index], max_bars)
+
+    if not overlap:
+        taken = select_trades(entry_index, exit_index)
+        entry_index, exit_index = entry_index[taken], exit_index[taken]
+        exit_price, exit_reason = exit_price[taken], exit_reason[taken]
+
+    side = direction[entry_index]
+    entry_price = close[entry_index]
+    returns = side * (exit_price - entry_price) / entry_price - 2 * fee
+    return {
+        'entry_index': entry_index,
+        'exit_index': exit_index,
+        'side': side,
+        'entry_price': entry_price,
+        'exit_price': exit_price,
+        'exit_reason': exit_reason,
+        'returns': returns,
+        'equity': np.cumprod(1 + fraction * returns),
+    }
+
+
+def run_backtest(df, signals=fib_zone_signals, fee=0.0, fraction=1.0, max_bars=None, overlap=False, **params):
+    """Backtests ``signals(high, low, close, **params)`` over an OHLC DataFrame.
+
+    ``fee`` is charged per side as a fraction of the price, and ``fraction`` of equity is put
+    into each trade. With ``overlap=False`` only one position is open at a time.
+    Returns {'trades': DataFrame, 'equity': Series indexed by exit bar, 'metrics': dict}.
+    """
+    open_, high, low, close = (df[column].to_numpy(dtype=float) for column in ('open', 'high', 'low', 'close'))
+    direction, stop_loss, take_profit = signals(high, low, close, **params)
+    sim = simulate(open_, high, low, close, direction, stop_loss, take_profit, fee, fraction, max_bars, overlap)
+    entry_index, exit_index = sim['entry_index'], sim['exit_index']
+
+    index = df['timestamp'] if 'timestamp' in df else pd.RangeIndex(len(df))
+    index = np.asarray(index)
+    trades = pd.DataFrame({
+        'entry_time': index[entry_index],
+        'exit_time': index[exit_index],
+        'side': np.where(sim['side'] == LONG, 'BUY', 'SELL'),
+        'entry_price': sim['entry_price'],
+        'stop_loss': stop_loss[entry_index],
+        'take_profit': take_profit[entry_index],
+        'exit_price': sim['exit_price'],
+        'exit_reason': sim['exit_reason'],
+        'bars_held': exit_index - entry_index,
+        'return': sim['returns'],
+    })
+    return {
+        'trades': trades,
+        'equity': pd.Series(sim['equity'], index=index[exit_index], name='equity'),
+        'metrics': backtest_metrics(sim['returns'], sim['equity']),
+    }
+
+
+def print_report(result):
+    metrics = result['metrics']
+    print(f"Trades: {metrics['trades']}, win rate: {metrics['win_rate']:.1%}, "
+          f"total return: {metrics['total_return']:.2%}, max drawdown: {metrics['max_drawdown']:.2%}, "
+          f"profit factor: {metrics['profit_factor']:.2f}")
+
+
+def synthetic_bars(n, seed=0):
+    """Random-walk OHLC bars for benchmarking"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    open_ = np.r_[close[0], close[:-1]] * np.exp(rng.normal(0, 0.0005, n))
+    spread = np.abs(rng.normal(0, 0.0015, n)) * close
+    high = np.maximum(open_, close) + spread
+    low = np.minimum(open_, close) - spread
+    return pd.DataFrame({'open': open_, 'high': high, 'low': low, 'close': close})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest the Fibonacci premium/discount strategy")
+    parser.add_argument('csv', nargs='?', help="OHLCV CSV with open, high, low, close (and timestamp) columns")
+    parser.add_argument('--synthetic', type=int, help="backtest this many random-walk bars instead")
+    parser.add_argument('--lookback', type=int, default=100)
+    parser.add_argument('--fee', type=float, default=0.0)
+    parser.add_argument('--max-bars', type=int)
+    args = parser.parse_args()
+    if not args.csv and not args.synthetic:
+        parser.error("give a CSV file or --synthetic N")
+
+    df = synthetic_bars(args.synthetic) if args.synthetic else pd.read_csv(args.csv)
+    start = time.perf_counter()
+    result = run_backtest(df, fee=args.fee, max_bars=args.max_bars, lookback=args.lookback)
+    elapsed = time.perf_counter() - start
+    print_report(result)
+    print(f"{len(df)} bars in {elapsed:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
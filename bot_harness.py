@@ -0,0 +1,306 @@
+"""Side-by-side benchmark of the bot variants on identical cached candles.
+
+Each bot module is imported without starting Tk and its decision logic is run over the
+same 5m candle sets, replayed one analysis cycle at a time:
+
+  * trade21, tradewith, copilottrade, trade51 and TRADE5 call their own analyze_market(),
+    or analyze_market_async() where their GUI runs that (trade21 and tradewith);
+    their get_client(), get_store() and get_feed() are pointed at an in-process replay
+    that answers ticks_history requests with the candles up to the cycle's 5m bar (the
+    last candle of each timeframe still open, as Deriv returns it);
+  * tradeictfibrsi gets a headless TradingApp that receives the close of each cycle's
+    5m bar as a tick through on_message().
+
+Each cycle is timed with perf_counter, less the time the replay spent building replies;
+a second, shorter pass runs under tracemalloc for the memory peak of a cycle, which
+includes the replies the bot holds, as it would live. Every signal is then traded on
+the following 5m bars (backtest.resolve_exits), one position at a time per signal key,
+for the trading metrics.
+
+Replayed candles look stale next to the wall clock, so the candle caches refill whole
+windows every cycle instead of topping up the latest candles as they would live.
+
+    python bot_harness.py --synthetic --cycles 100
+    python bot_harness.py --symbols R_10,R_25,R_50,R_75,R_100 --every 12
+"""
+import argparse
+import asyncio
+import contextlib
+import importlib
+import io
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from backtest import LONG, SHORT, backtest_metrics, resolve_exits, select_trades, synthetic_bars
+from candle_store import CANDLE_COLUMNS, CandleStore
+
+BOTS = ['trade21', 'tradewith', 'copilottrade', 'trade51', 'TRADE5', 'tradeictfibrsi']
+BASE_GRANULARITY = 300
+# Base candles before the first cycle: 200 candles of the longest (1h) timeframe
+WARMUP = 200 * 3600 // BASE_GRANULARITY
+
+
+class ReplayMarket:
+    """5m candle sets per symbol, visible up to the current cycle's bar (``index``)"""
+
+    def __init__(self, base):
+        self.base = {symbol: frame[CANDLE_COLUMNS].reset_index(drop=True) for symbol, frame in base.items()}
+        self.index = 0
+        self.partials = {}
+        self.serving = 0.0  # Seconds spent answering the bots, left out of their cycle times
+
+    def __contains__(self, symbol):
+        return symbol in self.base
+
+    def epoch(self, symbol):
+        return int(self.base[symbol]['epoch'].iloc[self.index])
+
+    def price(self, symbol):
+        return float(self.base[symbol]['close'].iloc[self.index])
+
+    def _partial(self, symbol, granularity):
+        """Per base bar: its bucket and the still-open candle of that bucket as of the bar"""
+        key = (symbol, granularity)
+        if key not in self.partials:
+            base = self.base[symbol]
+            bucket = base['epoch'] - base['epoch'] % granularity
+            grouped = base.groupby(bucket)
+            self.partials[key] = pd.DataFrame({
+                'epoch': bucket,
+                'open': grouped['open'].transform('first'),
+                'high': grouped['high'].cummax(),
+                'low': grouped['low'].cummin(),
+                'close': base['close'],
+            })
+        return self.partials[key]
+
+    def candles(self, symbol, granularity, count):
+        """The last ``count`` candles at the current bar, or None for an unknown symbol"""
+        if symbol not in self.base:
+            return None
+        partial = self._partial(symbol, int(granularity))
+        upto = partial.iloc[:self.index + 1]
+        # A bucket's last row so far is its candle: closed for earlier buckets, still open for the current one
+        last_rows = upto[upto['epoch'].ne(upto['epoch'].shift(-1))]
+        return last_rows.tail(count).reset_index(drop=True)
+
+
+class ReplayClient:
+    """Answers the DerivClient calls the bots make from a ReplayMarket"""
+
+    def __init__(self, market):
+        self.market = market
+
+    def request(self, payload, timeout=None, priority=None):
+        start = time.perf_counter()
+        try:
+            return self._reply(payload)
+        finally:
+            self.market.serving += time.perf_counter() - start
+
+    def _reply(self, payload):
+        symbol = payload.get('ticks_history')
+        if symbol not in self.market:
+            return {'echo_req': payload,
+                    'error': {'code': 'InvalidSymbol', 'message': f"Symbol {symbol} is invalid."}}
+        if payload.get('style') == 'candles':
+            candles = self.market.candles(symbol, payload['granularity'], int(payload.get('count', 5000)))
+            return {'echo_req': payload, 'candles': candles.to_dict('records')}
+        return {'echo_req': payload,
+                'history': {'prices': [self.market.price(symbol)], 'times': [self.market.epoch(symbol)]}}
+
+    def request_many(self, payloads, timeout=None):
+        return [self.request(payload) for payload in payloads]
+
+    async def request_async(self, payload, timeout=None, priority=None):
+        return self.request(payload)
+
+
+class ReplayFeed:
+    """Stands in for candle_feed.CandleFeed"""
+
+    def __init__(self, market):
+        self.market = market
+
+    def candles(self, symbol, granularity, count=200, timeout=30):
+        start = time.perf_counter()
+        try:
+            return self.market.candles(symbol, granularity, count)
+        finally:
+            self.market.serving += time.perf_counter() - start
+
+
+def load_bot(name, market, cache_dir):
+    """Imports a bot and returns its cycle function, which returns {key: signal details}.
+
+    Keys are the bot's own "<name> - <timeframe>" labels, or the symbol for tradeictfibrsi.
+    """
+    module = importlib.import_module(name)
+    if name == 'tradeictfibrsi':
+        app = module.TradingApp(None, symbols=list(market.base))
+
+        def cycle():
+            signals = {}
+            for symbol in app.prices:
+                epoch = market.epoch(symbol)
+                message = json.dumps({'tick': {'symbol': symbol, 'epoch': epoch, 'quote': market.price(symbol)}})
+                app.on_message(symbol, None, message)
+                if app.last_signal_time[symbol] == epoch and app.signals[symbol]:
+                    signals[symbol] = app.signals[symbol]
+            return signals
+        return cycle
+
+    client = ReplayClient(market)
+    store = CandleStore(os.path.join(cache_dir, name))
+    feed = ReplayFeed(market)
+    for attribute, replacement in (('get_client', client), ('get_store', store), ('get_feed', feed)):
+        if hasattr(module, attribute):
+            setattr(module, attribute, lambda *args, value=replacement: value)
+
+    if hasattr(module, 'analyze_market_async'):
+        def analyze():
+            return asyncio.run(module.analyze_market_async())
+    else:
+        analyze = module.analyze_market
+
+    def cycle():
+        return {key: details for key, details in analyze().items() if isinstance(details, dict)}
+    return cycle
+
+
+def symbol_names():
+    """Display name -> symbol for the labels the candle bots use"""
+    import trade21
+    import tradewith
+    return {**trade21.SYMBOLS, **tradewith.SYMBOLS}
+
+
+def run_cycles(cycle, market, indices, trace=False):
+    """Runs one cycle per base bar index; returns (signals, seconds, peak bytes) per cycle"""
+    results = []
+    for index in indices:
+        market.index = index
+        with contextlib.redirect_stdout(io.StringIO()):
+            if trace:
+                tracemalloc.reset_peak()
+                before = tracemalloc.get_traced_memory()[0]
+            serving = market.serving
+            start = time.perf_counter()
+            signals = cycle()
+            elapsed = time.perf_counter() - start - (market.serving - serving)
+            peak = tracemalloc.get_traced_memory()[1] - before if trace else 0
+        results.append((signals, elapsed, peak))
+    return results
+
+
+def score_signals(market, signals, names):
+    """Trades every signal on the following base bars; one open position per signal key"""
+    rows = []
+    for index, cycle_signals in signals:
+        for key, details in cycle_signals.items():
+            symbol = key if key in market else names.get(key.rsplit(' - ', 1)[0])
+            if symbol in market:
+                rows.append((key, symbol, index, LONG if details['signal'] == 'Buy' else SHORT,
+                             details['entry_price'], details['stop_loss'], details['take_profit']))
+    trades = pd.DataFrame(rows, columns=['key', 'symbol', 'entry_index', 'direction', 'entry_price',
+                                         'stop_loss', 'take_profit'])
+    returns, exits = [], []
+    for (key, symbol), group in trades.groupby(['key', 'symbol']):
+        base = market.base[symbol]
+        arrays = [base[column].to_numpy(dtype=float) for column in ('open', 'high', 'low', 'close')]
+        entry_index = group['entry_index'].to_numpy()
+        exit_index, exit_price, _ = resolve_exits(*arrays, entry_index, group['direction'].to_numpy(),
+                                                  group['stop_loss'].to_numpy(), group['take_profit'].to_numpy())
+        taken = select_trades(entry_index, exit_index)
+        entry_price = group['entry_price'].to_numpy()[taken]
+        returns.append(group['direction'].to_numpy()[taken] * (exit_price[taken] - entry_price) / entry_price)
+        exits.append(exit_index[taken])
+    if not returns:
+        return backtest_metrics(np.array([]), np.array([]))
+    order = np.argsort(np.concatenate(exits), kind='stable')
+    returns = np.concatenate(returns)[order]
+    return backtest_metrics(returns, np.cumprod(1 + returns))
+
+
+def compare(base, bots=None, cycles=100, every=1, memory_cycles=10):
+    """Runs every bot over the same candle sets; returns the comparison table as a DataFrame"""
+    market = ReplayMarket(base)
+    length = min(len(frame) for frame in market.base.values())
+    indices = list(range(WARMUP, length, every))[:cycles]
+    if not indices:
+        raise ValueError(f"Need more than {WARMUP} base candles per symbol, got {length}")
+    names = symbol_names()
+
+    rows = []
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for name in bots or BOTS:
+            # Warm the ICT bot's tick window with the bars before the first cycle
+            cycle = load_bot(name, market, cache_dir)
+            if name == 'tradeictfibrsi':
+                run_cycles(cycle, market, range(max(indices[0] - 100, 0), indices[0]))
+            timed = run_cycles(cycle, market, indices)
+
+            tracemalloc.start()
+            try:
+                traced = run_cycles(load_bot(name, market, os.path.join(cache_dir, 'memory')), market,
+                                    indices[:memory_cycles], trace=True)
+            finally:
+                tracemalloc.stop()
+
+            seconds = np.array([elapsed for _, elapsed, _ in timed])
+            metrics = score_signals(market, [(index, signals) for index, (signals, _, _) in zip(indices, timed)],
+                                    names)
+            rows.append({
+                'bot': name,
+                'cycles': len(timed),
+                'mean_ms': seconds.mean() * 1000,
+                'p95_ms': np.percentile(seconds, 95) * 1000,
+                'peak_kib': max(peak for _, _, peak in traced) / 1024,
+                'signals': sum(len(signals) for signals, _, _ in timed),
+                'trades': metrics['trades'],
+                'win_rate': metrics['win_rate'],
+                'average_return': metrics['average_return'],
+                'profit_factor': metrics['profit_factor'],
+                'total_return': metrics['total_return'],
+            })
+    return pd.DataFrame(rows).set_index('bot')
+
+
+def synthetic_candles(symbols, count, start=1_700_000_100):
+    """Random-walk 5m candles for each symbol, seeded by its position"""
+    frames = {}
+    for seed, symbol in enumerate(symbols):
+        frame = synthetic_bars(count, seed)
+        frame.insert(0, 'epoch', start - start % BASE_GRANULARITY + BASE_GRANULARITY * np.arange(count))
+        frames[symbol] = frame
+    return frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the bot variants on the same cached candles")
+    parser.add_argument('--symbols', help="Comma-separated symbols (default: every symbol the bots trade)")
+    parser.add_argument('--count', type=int, default=5000, help="5m candles per symbol")
+    parser.add_argument('--synthetic', action='store_true', help="Use random-walk candles instead of Deriv's")
+    parser.add_argument('--bots', default=','.join(BOTS))
+    parser.add_argument('--cycles', type=int, default=100)
+    parser.add_argument('--every', type=int, default=1, help="5m bars between cycles")
+    parser.add_argument('--memory-cycles', type=int, default=10)
+    args = parser.parse_args()
+
+    symbols = args.symbols.split(',') if args.symbols else sorted(set(symbol_names().values()))
+    if args.synthetic:
+        base = synthetic_candles(symbols, args.count)
+    else:
+        from param_sweep import load_candles
+        base = load_candles(symbols, BASE_GRANULARITY, args.count)
+    table = compare(base, args.bots.split(','), args.cycles, args.every, args.memory_cycles)
+    with pd.option_context('display.float_format', '{:.4f}'.format, 'display.width', 200):
+        print(table.to_string())
+
+
+if __name__ == '__main__':
+    main()
@@ -6,6 +6,7 @@ import tkinter as tk
 from tkinter import scrolledtext
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import matplotlib.pyplot as plt
+from rate_limiter import PRIORITY_HISTORY, get_scheduler
 
 # Initialize Binance Exchange
 exchange = ccxt.binance()
@@ -24,6 +25,7 @@ def calculate_rsi(data, period=14):
 
 # Fetch Historical Data
 def fetch_data(pair='BTC/USDT', timeframe='1h', limit=100):
+    get_scheduler(exchange.id).acquire(PRIORITY_HISTORY)
     ohlcv = exchange.fetch_ohlcv(pair, timeframe=timeframe, limit=limit)
     df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
     df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
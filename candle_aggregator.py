@@ -0,0 +1,73 @@
+import threading
+from collections import deque
+
+
+class CandleAggregator:
+    """Folds a live tick stream into rolling OHLC candles for several granularities per symbol.
+
+    Ticks are bucketed by their own epoch (``epoch - epoch % granularity``), the same
+    alignment Deriv uses for its candles, so boundaries do not depend on the local clock
+    or on when a frame happened to be received.
+    """
+
+    def __init__(self, granularities=(300, 900, 1800, 3600), max_candles=500):
+        self.granularities = tuple(int(g) for g in granularities)
+        self.max_candles = max_candles
+        self.series = {}
+        self.last_epoch = {}
+        self.lock = threading.Lock()
+
+    def _series(self, symbol, granularity):
+        key = (symbol, granularity)
+        if key not in self.series:
+            self.series[key] = deque(maxlen=self.max_candles)
+        return self.series[key]
+
+    def add_tick(self, symbol, epoch, quote):
+        """Updates the open candle of every granularity, starting a new one when the tick crosses a boundary.
+
+        Returns ``{granularity: [epoch, open, high, low, close]}`` for each candle this tick closed.
+        """
+        epoch = int(epoch)
+        quote = float(quote)
+        closed = {}
+        with self.lock:
+            late = epoch < self.last_epoch.get(symbol, epoch)
+            if not late:
+                self.last_epoch[symbol] = epoch
+            for granularity in self.granularities:
+                bucket = epoch - epoch % granularity
+                series = self._series(symbol, granularity)
+                if series and series[-1][0] == bucket:
+                    candle = series[-1]
+                    candle[2] = max(candle[2], quote)
+                    candle[3] = min(candle[3], quote)
+                    if not late:
+                        candle[4] = quote
+                elif not series or bucket > series[-1][0]:
+                    if series:
+                        closed[granularity] = list(series[-1])
+                    series.append([bucket, quote, quote, quote, quote])
+                # A tick older than the open candle belongs to a closed candle and is dropped
+        return closed
+
+    def seed(self, symbol, granularity, candles):
+        """Loads history candles (Deriv ticks_history dicts) so the series is full from the start"""
+        with self.lock:
+            series = self._series(symbol, int(granularity))
+            live = list(series)
+            series.clear()
+            for candle in candles:
+                if live and int(candle['epoch']) >= live[0][0]:
+                    break
+                series.append([int(candle['epoch']), float(candle['open']), float(candle['high']),
+                               float(candle['low']), float(candle['close'])])
+            series.extend(live)
+
+    def candles(self, symbol, granularity, count=None):
+        """Returns Deriv-style candle dicts, oldest first; the last one is still open"""
+        with self.lock:
+            series = list(self.series.get((symbol, int(granularity)), ()))
+        if count is not None:
+            series = series[-count:]
+        return [{'epoch': c[0], 'open': c[1], 'high': c[2], 'low': c[3], 'close': c[4]} for c in series]
@@ -0,0 +1,159 @@
+import threading
+import pandas as pd
+from deriv_client import DERIV_API_URL, get_client
+
+
+class CandleFeed:
+    """Live candle series backed by Deriv ``ticks_history`` subscriptions.
+
+    Each (symbol, granularity) is seeded once from history and then kept current from
+    ``ohlc`` pushes instead of being re-requested on a timer. Consumers can register
+    ``on_update(symbol, granularity, candle)`` / ``on_close(symbol, granularity, candle)``
+    callbacks, or pass a queue that receives ``(event, symbol, granularity, candle)``
+    tuples with event ``'update'`` or ``'close'``.
+    """
+
+    def __init__(self, client=None, on_update=None, on_close=None, events=None):
+        self.client = client or get_client()
+        self.on_update = on_update
+        self.on_close = on_close
+        self.events = events
+        self.series = {}
+        self.counts = {}
+        self.ready = {}
+        self.req_ids = {}
+        self.lock = threading.Lock()
+
+    def subscribe(self, symbol, granularity, count=200):
+        """Starts streaming one series; does nothing if it is already subscribed"""
+        key = (symbol, int(granularity))
+        with self.lock:
+            if key in self.req_ids:
+                return self.ready[key]
+            self.counts[key] = count
+            self.ready[key] = threading.Event()
+            self.req_ids[key] = None
+        request = {
+            "ticks_history": symbol,
+            "adjust_start_time": 1,
+            "count": count,
+            "end": "latest",
+            "granularity": int(granularity),
+            "style": "candles"
+        }
+        ready = self.ready[key]
+        req_id = self.client.subscribe(request, lambda response: self._on_message(key, response))
+        with self.lock:
+            rejected = self.ready.get(key) is not ready  # Deriv already answered with an error
+            if not rejected:
+                self.req_ids[key] = req_id
+        if rejected:
+            self.client.unsubscribe(req_id)
+        return ready
+
+    def unsubscribe(self, symbol, granularity):
+        key = (symbol, int(granularity))
+        with self.lock:
+            req_id = self.req_ids.pop(key, None)
+            self.series.pop(key, None)
+            self.ready.pop(key, None)
+        if req_id is not None:
+            self.client.unsubscribe(req_id)
+
+    def close(self):
+        for symbol, granularity in list(self.req_ids):
+            self.unsubscribe(symbol, granularity)
+
+    def _on_message(self, key, response):
+        if key not in self.req_ids:
+            return  # Late push for a series that was unsubscribed
+        if 'error' in response:
+            self._reject(key, response['error'])
+            return
+        if 'candles' in response:
+            # Initial history, or a fresh snapshot after a reconnect
+            candles = [self._candle(c['epoch'], c) for c in response['candles']]
+            with self.lock:
+                self.series[key] = candles[-self.counts[key]:]
+        elif 'ohlc' in response:
+            self._apply(key, response['ohlc'])
+        if key in self.ready:
+            self.ready[key].set()
+
+    def _reject(self, key, error):
+        """Drops a subscription Deriv refused and wakes its waiters; the next candles() call seeds it again"""
+        print(f"Candle subscription error for {key[0]} ({key[1]}s): {error.get('message')}")
+        with self.lock:
+            req_id = self.req_ids.pop(key, None)
+            self.series.pop(key, None)
+            self.counts.pop(key, None)
+            ready = self.ready.pop(key, None)
+        if req_id is not None:
+            self.client.unsubscribe(req_id)
+        if ready is not None:
+            ready.error = error
+            ready.set()
+
+    @staticmethod
+    def _candle(epoch, values):
+        return {
+            'epoch': int(epoch),
+            'open': float(values['open']),
+            'high': float(values['high']),
+            'low': float(values['low']),
+            'close': float(values['close'])
+        }
+
+    def _apply(self, key, ohlc):
+        candle = self._candle(ohlc['open_time'], ohlc)
+        closed = None
+        with self.lock:
+            series = self.series.setdefault(key, [])
+            if series and series[-1]['epoch'] == candle['epoch']:
+                series[-1] = candle
+            elif not series or candle['epoch'] > series[-1]['epoch']:
+                if series:
+                    closed = series[-1]
+                series.append(candle)
+                del series[:-self.counts[key]]
+            else:
+                return  # Push for a candle that has already closed
+        if closed is not None:
+            self._emit('close', key, closed)
+        self._emit('update', key, candle)
+
+    def _emit(self, event, key, candle):
+        callback = self.on_close if event == 'close' else self.on_update
+        if callback is not None:
+            callback(key[0], key[1], candle)
+        if self.events is not None:
+            self.events.put((event, key[0], key[1], candle))
+
+    def candles(self, symbol, granularity, count=200, timeout=30):
+        """Returns the current series as a DataFrame, subscribing and waiting for the seed on first use.
+
+        Raises RuntimeError if Deriv rejects the subscription.
+        """
+        ready = self.subscribe(symbol, granularity, count)
+        if not ready.wait(timeout):
+            return None
+        error = getattr(ready, 'error', None)
+        if error is not None:
+            raise RuntimeError(f"Candle subscription for {symbol} ({granularity}s) failed: {error.get('message')}")
+        with self.lock:
+            series = list(self.series.get((symbol, int(granularity)), ()))
+        if not series:
+            return None
+        return pd.DataFrame(series[-count:])
+
+
+# One shared feed per endpoint for the whole process
+_feeds = {}
+_feeds_lock = threading.Lock()
+
+
+def get_feed(url=DERIV_API_URL):
+    with _feeds_lock:
+        if url not in _feeds:
+            _feeds[url] = CandleFeed(get_client(url))
+        return _feeds[url]
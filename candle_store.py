@@ -0,0 +1,124 @@
+import os
+import threading
+import time
+import pandas as pd
+
+CANDLE_CACHE_DIR = os.getenv("CANDLE_CACHE_DIR", "candle_cache")
+CANDLE_COLUMNS = ['epoch', 'open', 'high', 'low', 'close']
+
+
+class CandleStore:
+    """On-disk candle cache keyed by (symbol, granularity).
+
+    Remembers the last candle epoch it has seen and asks Deriv only for candles from
+    that epoch onwards, so each refresh downloads one or two candles instead of the
+    whole window. The still-open last candle is always re-requested and replaced.
+    """
+
+    def __init__(self, directory=CANDLE_CACHE_DIR, max_candles=5000):
+        self.directory = directory
+        self.max_candles = max_candles
+        self.frames = {}
+        self.lock = threading.Lock()
+
+    def _path(self, symbol, granularity):
+        return os.path.join(self.directory, f"{symbol}_{granularity}.csv")
+
+    def load(self, symbol, granularity):
+        """Returns the cached candles, warm-starting from disk on first use"""
+        with self.lock:
+            return self._load(symbol, granularity)
+
+    def _load(self, symbol, granularity):
+        key = (symbol, granularity)
+        if key not in self.frames:
+            path = self._path(symbol, granularity)
+            self.frames[key] = pd.read_csv(path) if os.path.exists(path) else None
+        return self.frames[key]
+
+    def last_epoch(self, symbol, granularity):
+        frame = self.load(symbol, granularity)
+        if frame is None or frame.empty:
+            return None
+        return int(frame['epoch'].iloc[-1])
+
+    def request_for(self, symbol, granularity, count):
+        """Builds the ticks_history request for whatever the cache is missing"""
+        frame = self.load(symbol, granularity)
+        last_epoch = self.last_epoch(symbol, granularity)
+        request = {
+            "ticks_history": symbol,
+            "count": count,
+            "end": "latest",
+            "granularity": int(granularity),
+            "style": "candles"
+        }
+        if last_epoch is None or len(frame) < count or time.time() - last_epoch > count * granularity:
+            request["adjust_start_time"] = 1
+        else:
+            request["start"] = last_epoch
+        return request
+
+    def merge(self, symbol, granularity, candles):
+        """Folds new candles in, replacing any cached candle from the first new epoch onwards.
+
+        The cache is only kept if it reaches the first new candle, as it does for the
+        replies to request_for()'s top-ups; after a full refetch of a stale cache the old
+        candles are dropped rather than left in front of a gap.
+        """
+        new = pd.DataFrame(candles)
+        if new.empty or not all(col in new.columns for col in CANDLE_COLUMNS):
+            return
+        new = new[CANDLE_COLUMNS]
+        # Read, merge and write under one lock so concurrent updates of a series keep each other's candles
+        with self.lock:
+            frame = self._load(symbol, granularity)
+            first = new['epoch'].iloc[0]
+            if frame is not None and not frame.empty and frame['epoch'].iloc[-1] >= first:
+                frame = frame[frame['epoch'] < first]
+                new = pd.concat([frame, new], ignore_index=True)
+            new = new.tail(self.max_candles).reset_index(drop=True)
+            self.frames[(symbol, granularity)] = new
+            self._write(new, self._path(symbol, granularity))
+
+    def _write(self, frame, path):
+        """Writes through a temp file and os.replace(), so bots sharing the directory never read half a CSV"""
+        os.makedirs(self.directory, exist_ok=True)
+        temp = f"{path}.{os.getpid()}.tmp"
+        frame.to_csv(temp, index=False)
+        os.replace(temp, path)
+
+    def candles(self, symbol, granularity, count):
+        """Returns a copy of the last ``count`` cached candles, or None if nothing is cached"""
+        frame = self.load(symbol, granularity)
+        if frame is None or frame.empty:
+            return None
+        return frame.tail(count).reset_index(drop=True)
+
+    def update(self, symbol, granularity, response, count):
+        """Merges a ticks_history reply built from request_for() and returns the refreshed candles.
+
+        A reply without candles (an error or rate limit) falls back to the cached candles.
+        """
+        if 'candles' not in response:
+            error = response.get('error', {}).get('message', 'no candles in reply')
+            print(f"Error updating {symbol} candles ({granularity}s), using the cache: {error}")
+            return self.candles(symbol, granularity, count)
+        self.merge(symbol, granularity, response['candles'])
+        return self.candles(symbol, granularity, count)
+
+    def fetch(self, client, symbol, granularity, count):
+        return self.update(symbol, granularity, client.request(self.request_for(symbol, granularity, count)), count)
+
+
+# One shared store for the whole process
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = CandleStore()
+        return _store
@@ -0,0 +1,273 @@
+import asyncio
+import concurrent.futures
+import itertools
+import json
+import os
+import threading
+import time
+import websocket
+from rate_limiter import PRIORITY_HISTORY, PRIORITY_LIVE, get_scheduler
+
+# Point at a local stand-in (see deriv_server.py) with e.g. DERIV_API_URL=ws://127.0.0.1:8765/websockets/v3
+DERIV_API_URL = os.getenv("DERIV_API_URL", "wss://ws.derivws.com/websockets/v3?app_id=1089")
+
+# Deriv drops idle sockets after about two minutes, so reconnect before that
+IDLE_TIMEOUT = 100
+
+
+def request_priority(payload):
+    """History backfills yield to everything else (live prices, trades, account calls)"""
+    if 'ticks_history' in payload and payload.get('count') != 1:
+        return PRIORITY_HISTORY
+    return PRIORITY_LIVE
+
+
+def latest_tick_request(symbol):
+    """One-off query for the latest tick; a plain {"ticks": symbol} opens a stream on Deriv"""
+    return {"ticks_history": symbol, "count": 1, "end": "latest", "style": "ticks"}
+
+
+def latest_tick_quote(response):
+    """Quote from a latest_tick_request() reply, or None"""
+    prices = response.get('history', {}).get('prices')
+    return float(prices[-1]) if prices else None
+
+
+class DerivClient:
+    """Keeps one long-lived Deriv WebSocket and routes every request over it.
+
+    Each request is tagged with a Deriv ``req_id`` and answered through a Future,
+    so many requests can be in flight at once and replies may arrive in any order.
+    Subscriptions keep their req_id for life: every push is handed to the subscriber's
+    callback, and they are re-sent automatically if the connection drops.
+    Every outgoing request first takes a slot from the shared ``deriv`` rate limiter.
+    """
+
+    def __init__(self, url=DERIV_API_URL, timeout=30):
+        self.url = url
+        self.timeout = timeout
+        self.ws = None
+        self.last_used = 0
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.subscriptions = {}
+        self.req_ids = itertools.count(1)
+        self.resubscribing = False
+        self.scheduler = get_scheduler('deriv')
+
+    def connect(self):
+        """Opens the socket if it is closed or has been idle for too long (caller holds the lock)"""
+        if self.ws is not None and self.ws.connected:
+            if self.pending or self.subscriptions or time.time() - self.last_used < IDLE_TIMEOUT:
+                return
+        self._disconnect("reconnecting")
+        ws = websocket.create_connection(self.url, timeout=self.timeout)
+        ws.settimeout(None)  # The reader blocks between replies; per-request timeouts live on the futures
+        self.ws = ws
+        self.last_used = time.time()
+        threading.Thread(target=self._read_loop, args=(ws,), daemon=True).start()
+
+    def _close(self):
+        if self.ws is not None:
+            try:
+                self.ws.close()
+            except Exception:
+                pass
+            self.ws = None
+
+    def _disconnect(self, error, resubscribe=True):
+        """Drops the socket (caller holds the lock); every close of a live client goes through here.
+
+        Requests still waiting on the old socket fail with ConnectionError, so request()
+        retries them on a new one, and live subscriptions are re-sent in the background.
+        """
+        self._close()
+        pending, self.pending = self.pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError(f"Deriv connection lost: {error}"))
+        if resubscribe and self.subscriptions and not self.resubscribing:
+            self.resubscribing = True
+            threading.Thread(target=self._resubscribe, daemon=True).start()
+
+    def close(self):
+        with self.lock:
+            self._disconnect("client closed", resubscribe=False)
+
+    def _read_loop(self, ws):
+        """Matches each incoming frame to its pending request by req_id"""
+        while True:
+            try:
+                message = ws.recv()
+                if not message:
+                    raise websocket.WebSocketConnectionClosedException("Connection closed by server")
+                response = json.loads(message)
+            except (websocket.WebSocketException, OSError, ValueError) as e:
+                self._fail(ws, e)
+                return
+            req_id = response.get('req_id')
+            with self.lock:
+                self.last_used = time.time()
+                future = self.pending.pop(req_id, None)
+                subscription = self.subscriptions.get(req_id)
+                if subscription is not None and 'subscription' in response:
+                    subscription['id'] = response['subscription']['id']
+            if future is not None and not future.done():
+                future.set_result(response)
+            elif subscription is not None:
+                try:
+                    subscription['callback'](response)
+                except Exception as e:
+                    print(f"Error in Deriv subscription callback: {e}")
+
+    def _fail(self, ws, error):
+        with self.lock:
+            if self.ws is ws:
+                self._disconnect(error)
+
+    def _resubscribe(self, delay=1):
+        """Reconnects and re-sends every live subscription under its original req_id"""
+        while True:
+            try:
+                with self.lock:
+                    if self.subscriptions:
+                        self.connect()
+                        for req_id, subscription in self.subscriptions.items():
+                            subscription['id'] = None
+                            self.ws.send(json.dumps(dict(subscription['payload'], subscribe=1, req_id=req_id)))
+                    # Cleared under the lock, so a drop after this point starts a new pass
+                    self.resubscribing = False
+                return
+            except (websocket.WebSocketException, OSError) as e:
+                print(f"Deriv reconnect failed, retrying in {delay}s: {e}")
+                with self.lock:
+                    self._disconnect(e, resubscribe=False)
+                time.sleep(delay)
+                delay = min(delay * 2, 60)
+
+    def send(self, payload, priority=None):
+        """Sends one request without waiting for the reply and returns a Future for it"""
+        self.scheduler.acquire(request_priority(payload) if priority is None else priority)
+        return self._send(payload)
+
+    def _send(self, payload):
+        future = concurrent.futures.Future()
+        with self.lock:
+            self.connect()
+            req_id = next(self.req_ids)
+            self.pending[req_id] = future
+            try:
+                self.ws.send(json.dumps(dict(payload, req_id=req_id)))
+            except (websocket.WebSocketException, OSError) as e:
+                self.pending.pop(req_id, None)
+                self._disconnect(e)
+                raise
+        future.req_id = req_id
+        return future
+
+    def subscribe(self, payload, callback):
+        """Starts a Deriv subscription; the first reply and every push go to ``callback(response)``.
+
+        Returns the req_id that identifies the subscription for unsubscribe().
+        """
+        self.scheduler.acquire(request_priority(payload))
+        with self.lock:
+            self.connect()
+            req_id = next(self.req_ids)
+            self.subscriptions[req_id] = {'payload': payload, 'callback': callback, 'id': None}
+            try:
+                self.ws.send(json.dumps(dict(payload, subscribe=1, req_id=req_id)))
+            except (websocket.WebSocketException, OSError) as e:
+                self._disconnect(e)  # Re-sends this subscription with the others
+        return req_id
+
+    def unsubscribe(self, req_id):
+        """Stops routing pushes for a subscription and asks Deriv to forget it"""
+        with self.lock:
+            subscription = self.subscriptions.pop(req_id, None)
+        if subscription is not None and subscription['id']:
+            try:
+                self.request({"forget": subscription['id']})
+            except Exception as e:
+                print(f"Error forgetting Deriv subscription {subscription['id']}: {e}")
+
+    def _abandon(self, future):
+        """Gives up on a request whose reply never came; that usually means a dead socket"""
+        with self.lock:
+            self.pending.pop(future.req_id, None)
+            self._disconnect("request timed out")
+
+    def _wait(self, future, timeout):
+        try:
+            return future.result(timeout or self.timeout)
+        except concurrent.futures.TimeoutError:
+            self._abandon(future)
+            raise
+
+    def request(self, payload, timeout=None, priority=None):
+        """Sends one request and returns the decoded reply, retrying once on a dropped socket"""
+        for attempt in range(2):
+            try:
+                return self._wait(self.send(payload, priority), timeout)
+            except concurrent.futures.TimeoutError:
+                raise  # An OSError since Python 3.11, but a slow reply is not a dropped socket
+            except (ConnectionError, websocket.WebSocketException, OSError):
+                if attempt:
+                    raise
+
+    async def request_async(self, payload, timeout=None, priority=None):
+        """Awaitable request() for asyncio callers, retrying once on a dropped socket.
+
+        Sending takes the client lock and may reconnect, so it runs on the default executor
+        rather than stalling the event loop; replies are still matched on the reader thread.
+        """
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            try:
+                await self.scheduler.acquire_async(request_priority(payload) if priority is None else priority)
+                future = await loop.run_in_executor(None, self._send, payload)
+                try:
+                    return await asyncio.wait_for(asyncio.wrap_future(future), timeout or self.timeout)
+                except asyncio.TimeoutError:
+                    await loop.run_in_executor(None, self._abandon, future)
+                    raise
+            except asyncio.TimeoutError:
+                raise  # Likewise not retried
+            except (ConnectionError, websocket.WebSocketException, OSError):
+                if attempt:
+                    raise
+
+    def request_many(self, payloads, timeout=None):
+        """Pipelines a whole batch of requests and returns the replies in request order.
+
+        A request that fails comes back as a Deriv-style ``{'error': ...}`` reply
+        so one bad symbol does not sink the rest of the batch.
+        """
+        futures = []
+        for payload in payloads:
+            try:
+                futures.append(self.send(payload))
+            except Exception as e:
+                futures.append(e)  # Requests already sent are still collected below
+        deadline = time.time() + (timeout or self.timeout)
+        responses = []
+        for future in futures:
+            try:
+                if isinstance(future, Exception):
+                    raise future
+                responses.append(self._wait(future, max(deadline - time.time(), 0.001)))
+            except Exception as e:
+                responses.append({'error': {'code': 'ClientError', 'message': str(e)}})
+        return responses
+
+
+# One shared client per endpoint for the whole process
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(url=DERIV_API_URL):
+    with _clients_lock:
+        if url not in _clients:
+            _clients[url] = DerivClient(url)
+        return _clients[url]
@@ -0,0 +1,400 @@
+"""Local stand-in for the Deriv WebSocket API, for load testing and CI.
+
+Speaks the subset of the protocol the bots use: ``ticks``, ``ticks_history`` (ticks and
+candles, optionally subscribed), ``active_symbols``, ``authorize``, ``buy``, ``forget``,
+``forget_all`` and ``ping``. Prices are synthetic random walks generated at each symbol's
+real tick interval divided by ``--speed``, so ``--speed 100`` streams 100x real tick rates.
+
+    python deriv_server.py --port 8765 --speed 10
+    DERIV_API_URL=ws://127.0.0.1:8765/websockets/v3 python app.py
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import random
+import time
+from bisect import bisect_left
+from collections import deque
+import numpy as np
+from aiohttp import WSMsgType, web
+
+SECONDS_PER_YEAR = 365 * 24 * 3600
+
+# symbol: (display name, market, tick interval in seconds, start price, annual volatility, decimals)
+# Step indices move by a fixed step instead; their "volatility" column is the step size.
+SYMBOLS = {
+    'R_10': ('Volatility 10 Index', 'synthetic_index', 2, 6500.0, 0.10, 3),
+    'R_25': ('Volatility 25 Index', 'synthetic_index', 2, 3000.0, 0.25, 3),
+    'R_50': ('Volatility 50 Index', 'synthetic_index', 2, 200.0, 0.50, 4),
+    'R_75': ('Volatility 75 Index', 'synthetic_index', 2, 40000.0, 0.75, 4),
+    'R_100': ('Volatility 100 Index', 'synthetic_index', 2, 1500.0, 1.00, 2),
+    '1HZ10V': ('Volatility 10 (1s) Index', 'synthetic_index', 1, 9000.0, 0.10, 2),
+    '1HZ25V': ('Volatility 25 (1s) Index', 'synthetic_index', 1, 700000.0, 0.25, 2),
+    '1HZ50V': ('Volatility 50 (1s) Index', 'synthetic_index', 1, 150000.0, 0.50, 2),
+    '1HZ75V': ('Volatility 75 (1s) Index', 'synthetic_index', 1, 5000.0, 0.75, 2),
+    '1HZ100V': ('Volatility 100 (1s) Index', 'synthetic_index', 1, 1200.0, 1.00, 2),
+    'stpRNG': ('Step Index 100', 'synthetic_index', 1, 8000.0, 0.1, 1),
+    'stpRNG2': ('Step Index 200', 'synthetic_index', 1, 8000.0, 0.2, 1),
+    'stpRNG3': ('Step Index 300', 'synthetic_index', 1, 8000.0, 0.3, 1),
+    'stpRNG4': ('Step Index 400', 'synthetic_index', 1, 8000.0, 0.4, 1),
+    'stpRNG5': ('Step Index 500', 'synthetic_index', 1, 8000.0, 0.5, 1),
+    'frxXAUUSD': ('Gold/USD', 'commodities', 1, 2000.0, 0.15, 2),
+    'frxUSOIL': ('Oil/USD', 'commodities', 1, 75.0, 0.30, 2),
+    'frxEURUSD': ('EUR/USD', 'forex', 1, 1.08, 0.07, 5),
+    'frxGBPUSD': ('GBP/USD', 'forex', 1, 1.27, 0.08, 5),
+    'frxUSDJPY': ('USD/JPY', 'forex', 1, 150.0, 0.09, 3),
+    'frxBTCUSD': ('BTC/USD', 'cryptocurrency', 1, 60000.0, 0.60, 2),
+    'cryBTCUSD': ('BTC/USD', 'cryptocurrency', 1, 60000.0, 0.60, 2),
+}
+
+
+class Market:
+    """Synthetic price path for one symbol: one-minute history bars plus a live tick stream"""
+
+    def __init__(self, symbol, speed=1.0, history_days=30, max_ticks=10000, seed=None):
+        self.symbol = symbol
+        self.display_name, self.market, self.interval, price, self.volatility, self.decimals = SYMBOLS[symbol]
+        self.step_index = symbol.startswith('stpRNG')
+        self.speed = speed
+        self.rng = random.Random(seed)
+        self.sigma = self.volatility * math.sqrt(self.interval / SECONDS_PER_YEAR)
+        self.ticks = deque(maxlen=max_ticks)
+        self.listeners = set()
+        self.tick_ids = itertools.count(1)
+
+        # Closed one-minute bars: epoch, open, high, low, close
+        self.minutes = [[], [], [], [], []]
+        self.minute = None
+        now = int(time.time())
+        self.epoch = now - history_days * 86400
+        self.epoch -= self.epoch % 60
+        self.price = price
+        self._backfill(now - max_ticks * self.interval)
+        while self.epoch <= now:
+            self.ticks.append(self._next_tick())
+
+    def _move(self, price):
+        if self.step_index:
+            return price + (self.volatility if self.rng.random() < 0.5 else -self.volatility)
+        return price * math.exp(self.rng.gauss(0, self.sigma))
+
+    def _backfill(self, until):
+        """Generates closed minute bars in bulk; each minute is sampled at a few sub-steps, not every tick"""
+        minutes = max((until - self.epoch) // 60, 0)
+        if not minutes:
+            return
+        ticks_per_minute = max(60 // self.interval, 1)
+        steps = min(ticks_per_minute, 12)
+        rng = np.random.default_rng(self.rng.getrandbits(32))
+        if self.step_index:
+            moves = rng.normal(0, self.volatility * math.sqrt(ticks_per_minute / steps), size=minutes * steps)
+            path = (self.price + np.cumsum(moves)).reshape(minutes, steps)
+        else:
+            moves = rng.normal(0, self.sigma * math.sqrt(ticks_per_minute / steps), size=minutes * steps)
+            path = (self.price * np.exp(np.cumsum(moves))).reshape(minutes, steps)
+        opens = np.concatenate([[self.price], path[:-1, -1]])
+        epochs = self.epoch + 60 * np.arange(minutes)
+        self.minutes = [
+            epochs.tolist(),
+            opens.tolist(),
+            np.maximum(path.max(axis=1), opens).tolist(),
+            np.minimum(path.min(axis=1), opens).tolist(),
+            path[:, -1].tolist(),
+        ]
+        self.epoch += 60 * minutes
+        self.price = float(path[-1, -1])
+
+    def _next_tick(self):
+        self.price = self._move(self.price)
+        epoch, quote = self.epoch, round(self.price, self.decimals)
+        self.epoch += self.interval
+
+        bucket = epoch - epoch % 60
+        if self.minute is not None and self.minute[0] != bucket:
+            for column, value in zip(self.minutes, self.minute):
+                column.append(value)
+            self.minute = None
+        if self.minute is None:
+            self.minute = [bucket, quote, quote, quote, quote]
+        else:
+            self.minute[2] = max(self.minute[2], quote)
+            self.minute[3] = min(self.minute[3], quote)
+            self.minute[4] = quote
+        return epoch, quote
+
+    async def run(self):
+        """Emits ticks at the symbol's real interval divided by the speed-up factor"""
+        start_wall = time.monotonic()
+        start_epoch = self.epoch
+        while True:
+            due = start_wall + (self.epoch - start_epoch) / self.speed
+            delay = due - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            epoch, quote = self._next_tick()
+            self.ticks.append((epoch, quote))
+            for listener in list(self.listeners):
+                listener(self, epoch, quote)
+
+    def tick_message(self, epoch, quote):
+        return {
+            'ask': quote, 'bid': quote, 'epoch': epoch, 'id': f"{self.symbol}-{next(self.tick_ids)}",
+            'pip_size': self.decimals, 'quote': quote, 'symbol': self.symbol
+        }
+
+    def tick_history(self, count, start=None, end=None):
+        ticks = [t for t in self.ticks if (start is None or t[0] >= start) and (end is None or t[0] <= end)]
+        ticks = ticks[-count:]
+        return {'prices': [q for _, q in ticks], 'times': [e for e, _ in ticks]}
+
+    def candles(self, granularity, count, start=None, end=None):
+        """Aggregates the minute bars (plus the open minute) into candles aligned to ``granularity``"""
+        epochs = self.minutes[0]
+        last = self.minute[0] if self.minute is not None else (epochs[-1] if epochs else None)
+        if last is None:
+            return []
+        if end is not None:
+            last = min(last, end)
+        first = last - last % granularity - (count - 1) * granularity
+        if start is not None:
+            first = max(first, start - start % granularity)
+        # Only convert the minutes that can fall inside the requested window
+        index = bisect_left(epochs, first)
+        columns = [column[index:] for column in self.minutes]
+        if self.minute is not None:
+            columns = [column + [value] for column, value in zip(columns, self.minute)]
+        columns = [np.asarray(column, dtype=float) for column in columns]
+        epochs, opens, highs, lows, closes = columns
+        buckets = (epochs.astype(np.int64) // granularity) * granularity
+        keep = buckets >= first
+        if end is not None:
+            keep &= buckets <= end
+        buckets, opens, highs, lows, closes = buckets[keep], opens[keep], highs[keep], lows[keep], closes[keep]
+        if not len(buckets):
+            return []
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        stops = np.r_[starts[1:], len(buckets)] - 1
+        return [
+            {'epoch': int(e), 'open': round(float(o), self.decimals), 'high': round(float(h), self.decimals),
+             'low': round(float(lo), self.decimals), 'close': round(float(c), self.decimals)}
+            for e, o, h, lo, c in zip(buckets[starts], opens[starts], np.maximum.reduceat(highs, starts),
+                                      np.minimum.reduceat(lows, starts), closes[stops])
+        ][-count:]
+
+    def ohlc_message(self, granularity, epoch, subscription_id):
+        candle = self.candles(granularity, 1)[-1]
+        return {
+            'close': f"{candle['close']:.{self.decimals}f}", 'epoch': epoch, 'granularity': granularity,
+            'high': f"{candle['high']:.{self.decimals}f}", 'id': subscription_id,
+            'low': f"{candle['low']:.{self.decimals}f}", 'open': f"{candle['open']:.{self.decimals}f}",
+            'open_time': candle['epoch'], 'pip_size': self.decimals, 'symbol': self.symbol
+        }
+
+
+class Connection:
+    """Per-client state: outgoing queue, subscriptions and authorization"""
+
+    def __init__(self, server, ws):
+        self.server = server
+        self.ws = ws
+        self.outbox = asyncio.Queue()
+        self.subscriptions = {}
+        self.authorized = None
+
+    def send(self, message):
+        self.outbox.put_nowait(json.dumps(message))
+
+    async def writer(self):
+        while True:
+            await self.ws.send_str(await self.outbox.get())
+
+    def reply(self, request, msg_type, body, subscription_id=None):
+        message = {'echo_req': request, 'msg_type': msg_type, **body}
+        if subscription_id:
+            message['subscription'] = {'id': subscription_id}
+        if 'req_id' in request:
+            message['req_id'] = request['req_id']
+        self.send(message)
+
+    def error(self, request, code, text):
+        msg_type = next(iter(request), 'error')
+        self.reply(request, msg_type, {'error': {'code': code, 'message': text}})
+
+    def subscribe(self, request, symbol, kind, granularity=None):
+        market = self.server.markets[symbol]
+        for sub in self.subscriptions.values():
+            if sub['symbol'] == symbol and sub['kind'] == kind and sub['granularity'] == granularity:
+                return None
+        subscription_id = self.server.new_id()
+
+        def listener(market, epoch, quote):
+            if kind == 'ticks':
+                self.reply(request, 'tick', {'tick': market.tick_message(epoch, quote)}, subscription_id)
+            else:
+                self.reply(request, 'ohlc', {'ohlc': market.ohlc_message(granularity, epoch, subscription_id)},
+                           subscription_id)
+
+        self.subscriptions[subscription_id] = {'symbol': symbol, 'kind': kind, 'granularity': granularity,
+                                               'listener': listener}
+        market.listeners.add(listener)
+        return subscription_id
+
+    def forget(self, subscription_id):
+        sub = self.subscriptions.pop(subscription_id, None)
+        if sub is None:
+            return 0
+        self.server.markets[sub['symbol']].listeners.discard(sub['listener'])
+        return 1
+
+    def close(self):
+        for subscription_id in list(self.subscriptions):
+            self.forget(subscription_id)
+
+    def handle(self, request):
+        if 'ticks' in request:
+            self.handle_ticks(request)
+        elif 'ticks_history' in request:
+            self.handle_ticks_history(request)
+        elif 'active_symbols' in request:
+            self.reply(request, 'active_symbols', {'active_symbols': [
+                {'symbol': m.symbol, 'display_name': m.display_name, 'market': m.market,
+                 'pip': 10 ** -m.decimals, 'exchange_is_open': 1, 'is_trading_suspended': 0}
+                for m in self.server.markets.values()
+            ]})
+        elif 'authorize' in request:
+            self.authorized = {'loginid': 'VRTC0000001', 'balance': 10000.0, 'currency': 'USD',
+                               'email': 'standin@example.com', 'is_virtual': 1}
+            self.reply(request, 'authorize', {'authorize': self.authorized})
+        elif 'buy' in request:
+            self.handle_buy(request)
+        elif 'forget' in request:
+            self.reply(request, 'forget', {'forget': self.forget(request['forget'])})
+        elif 'forget_all' in request:
+            forgotten = list(self.subscriptions)
+            for subscription_id in forgotten:
+                self.forget(subscription_id)
+            self.reply(request, 'forget_all', {'forget_all': forgotten})
+        elif 'ping' in request:
+            self.reply(request, 'ping', {'ping': 'pong'})
+        else:
+            self.error(request, 'UnrecognisedRequest', 'Unrecognised request.')
+
+    def handle_ticks(self, request):
+        # Deriv streams ticks for a plain {"ticks": symbol} request
+        symbol = request['ticks']
+        if symbol not in self.server.markets:
+            return self.error(request, 'InvalidSymbol', f"Symbol {symbol} is invalid.")
+        subscription_id = self.subscribe(request, symbol, 'ticks')
+        if subscription_id is None:
+            return self.error(request, 'AlreadySubscribed', f"You are already subscribed to {symbol}.")
+        market = self.server.markets[symbol]
+        epoch, quote = market.ticks[-1]
+        self.reply(request, 'tick', {'tick': market.tick_message(epoch, quote)}, subscription_id)
+
+    def handle_ticks_history(self, request):
+        symbol = request['ticks_history']
+        if symbol not in self.server.markets:
+            return self.error(request, 'InvalidSymbol', f"Symbol {symbol} is invalid.")
+        market = self.server.markets[symbol]
+        count = int(request.get('count', 5000))
+        end = None if request.get('end', 'latest') == 'latest' else int(request['end'])
+        start = int(request['start']) if 'start' in request else None
+        subscribe = request.get('subscribe') == 1
+
+        if request.get('style') == 'candles':
+            granularity = int(request.get('granularity', 60))
+            subscription_id = self.subscribe(request, symbol, 'candles', granularity) if subscribe else None
+            if subscribe and subscription_id is None:
+                return self.error(request, 'AlreadySubscribed', f"You are already subscribed to {symbol}.")
+            self.reply(request, 'candles', {'candles': market.candles(granularity, count, start, end),
+                                            'pip_size': market.decimals}, subscription_id)
+        else:
+            subscription_id = self.subscribe(request, symbol, 'ticks') if subscribe else None
+            if subscribe and subscription_id is None:
+                return self.error(request, 'AlreadySubscribed', f"You are already subscribed to {symbol}.")
+            self.reply(request, 'history', {'history': market.tick_history(count, start, end),
+                                            'pip_size': market.decimals}, subscription_id)
+
+    def handle_buy(self, request):
+        if self.authorized is None:
+            return self.error(request, 'AuthorizationRequired', 'Please log in.')
+        price = float(request.get('price', 0) or 0)
+        self.authorized['balance'] = round(self.authorized['balance'] - price, 2)
+        contract_id = self.server.new_contract_id()
+        self.reply(request, 'buy', {'buy': {
+            'balance_after': self.authorized['balance'], 'buy_price': price, 'contract_id': contract_id,
+            'longcode': 'Stand-in contract', 'shortcode': f"STANDIN_{contract_id}",
+            'start_time': int(time.time()), 'transaction_id': contract_id * 2
+        }})
+
+
+class DerivStandIn:
+    def __init__(self, symbols=None, speed=1.0, history_days=30, seed=None):
+        rng = random.Random(seed)
+        self.markets = {symbol: Market(symbol, speed, history_days, seed=rng.getrandbits(32))
+                        for symbol in (symbols or SYMBOLS)}
+        self.ids = itertools.count(1)
+        self.contract_ids = itertools.count(100000001)
+
+    def new_id(self):
+        return f"standin-{next(self.ids):012d}"
+
+    def new_contract_id(self):
+        return next(self.contract_ids)
+
+    async def handle(self, request):
+        ws = web.WebSocketResponse(max_msg_size=0)
+        await ws.prepare(request)
+        connection = Connection(self, ws)
+        writer = asyncio.ensure_future(connection.writer())
+        try:
+            async for message in ws:
+                if message.type != WSMsgType.TEXT:
+                    continue
+                try:
+                    payload = json.loads(message.data)
+                except ValueError:
+                    connection.send({'error': {'code': 'InputValidationFailed', 'message': 'Invalid JSON'}})
+                    continue
+                connection.handle(payload)
+        finally:
+            connection.close()
+            writer.cancel()
+        return ws
+
+    async def start_markets(self, app):
+        app['market_tasks'] = [asyncio.ensure_future(market.run()) for market in self.markets.values()]
+
+    async def stop_markets(self, app):
+        for task in app['market_tasks']:
+            task.cancel()
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get('/', self.handle)
+        app.router.add_get('/websockets/v3', self.handle)
+        app.on_startup.append(self.start_markets)
+        app.on_cleanup.append(self.stop_markets)
+        return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Deriv WebSocket API")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--speed', type=float, default=1.0, help="tick-rate multiplier over real Deriv rates")
+    parser.add_argument('--symbols', help="comma-separated symbols (default: all known)")
+    parser.add_argument('--history-days', type=int, default=30)
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    symbols = args.symbols.split(',') if args.symbols else None
+    server = DerivStandIn(symbols, args.speed, args.history_days, args.seed)
+    print(f"Deriv stand-in on ws://{args.host}:{args.port}/websockets/v3 at {args.speed}x tick rate")
+    web.run_app(server.app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,11 @@
+import os
+import sys
+import json
 import time
 import requests
+import websocket
+from rate_limiter import PRIORITY_HISTORY, get_scheduler
+from streaming_rsi import CandleRSI
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
@@ -8,6 +14,10 @@ from datetime import datetime
 # Binance API base URL
 base_url = 'https://api.binance.com'
 
+# Binance market-data WebSocket; point BINANCE_WS_URL at a stand-in server for local testing
+BINANCE_WS_URL = os.getenv("BINANCE_WS_URL", "wss://stream.binance.com:9443")
+KLINE_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
 # Function to fetch data for any trading pair and timeframe
 
 def fetch_data(pair='ETHUSDT', timeframe='1h', limit=100):
@@ -17,21 +27,46 @@ def fetch_data(pair='ETHUSDT', timeframe='1h', limit=100):
         'interval': timeframe,
         'limit': limit
     }
+    get_scheduler('binance').acquire(PRIORITY_HISTORY)
     response = requests.get(endpoint, params=params)
     data = response.json()
 
-    df = pd.DataFrame([{
-        'timestamp': int(candle[0]),
-        'open': float(candle[1]),
-        'high': float(candle[2]),
-        'low': float(candle[3]),
-        'close': float(candle[4]),
-        'volume': float(candle[5])
-    } for candle in data])
+    return klines_to_frame(np.array([candle[:6] for candle in data], dtype=float).reshape(-1, 6))
+
+# Build the analysis DataFrame straight from an (n, 6) kline array
 
-    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+def klines_to_frame(klines):
+    df = pd.DataFrame(klines, columns=KLINE_COLUMNS)
+    df['timestamp'] = pd.to_datetime(df['timestamp'].astype('int64'), unit='ms')
     return df
 
+# Last N klines of one interval kept as a compact float array
+
+class KlineBuffer:
+    def __init__(self, limit=100):
+        self.limit = limit
+        self.klines = np.empty((0, 6))
+
+    def __len__(self):
+        return len(self.klines)
+
+    def load(self, df):
+        timestamps = (df['timestamp'] - pd.Timestamp(0)) // pd.Timedelta(milliseconds=1)
+        self.klines = np.column_stack([timestamps, df[KLINE_COLUMNS[1:]].to_numpy(dtype=float)])[-self.limit:]
+
+    def update(self, kline):
+        """Applies one kline payload from the stream; returns True when it closed the bar"""
+        row = [kline['t'], kline['o'], kline['h'], kline['l'], kline['c'], kline['v']]
+        row = np.array(row, dtype=float)
+        if len(self.klines) and self.klines[-1, 0] == row[0]:
+            self.klines[-1] = row
+        elif not len(self.klines) or row[0] > self.klines[-1, 0]:
+            self.klines = np.vstack([self.klines, row])[-self.limit:]
+        return bool(kline['x'])
+
+    def frame(self):
+        return klines_to_frame(self.klines)
+
 # Function to identify support and resistance levels
 
 def identify_support_resistance(df):
@@ -39,18 +74,12 @@ def identify_support_resistance(df):
     resistances = df['high'].rolling(window=20).max()
     return supports, resistances
 
-# Function to calculate RSI
-def calculate_rsi(df, period=14):
-    delta = df['close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
+# RSI per timeframe, updated only with the klines closed since the last analysis
+rsi = CandleRSI(period=14)
 
 # Function to analyze data and provide signals with entry, stop loss, and take profit
 
-def analyze_market(df):
+def analyze_market(df, timeframe):
     swing_high = df['high'].max()
     swing_low = df['low'].min()
 
@@ -65,7 +94,6 @@ def analyze_market(df):
     }
 
     supports, resistances = identify_support_resistance(df)
-    rsi = calculate_rsi(df)
 
     premium_zone = fib_levels['50.0%'] + (swing_high - fib_levels['50.0%']) / 2
     discount_zone = fib_levels['50.0%'] - (fib_levels['50.0%'] - swing_low) / 2
@@ -73,7 +101,7 @@ def analyze_market(df):
     latest_price = df['close'].iloc[-1]
     latest_support = supports.iloc[-1]
     latest_resistance = resistances.iloc[-1]
-    latest_rsi = rsi.iloc[-1]
+    latest_rsi = rsi.latest(timeframe, df['timestamp'], df['close'])
     signal = ""
     entry_price = latest_price
     stop_loss = take_profit = 0
@@ -118,12 +146,41 @@ def real_time_monitoring(pair='ETHUSDT', timeframes=['1h', '30m', '15m'], interv
             for timeframe in timeframes:
                 print(f"Analyzing timeframe: {timeframe}")
                 df = fetch_data(pair, timeframe)
-                analyze_market(df)
+                analyze_market(df, timeframe)
             time.sleep(interval)  # Wait before fetching new data every 15 minutes
         except Exception as e:
             print(f"Error occurred: {e}. Retrying in 90 seconds...")
             time.sleep(90)  # Wait before retrying
 
-# Start real-time monitoring
-real_time_monitoring(pair='ETHUSDT', timeframes=['1h', '30m', '15m'], interval=900)
+# Streaming mode: subscribe to the combined kline streams and analyze only when a kline closes
+
+def stream_monitoring(pair='ETHUSDT', timeframes=['1h', '30m', '15m'], limit=100, url=BINANCE_WS_URL):
+    buffers = {timeframe: KlineBuffer(limit) for timeframe in timeframes}
+    for timeframe, buffer in buffers.items():
+        try:
+            buffer.load(fetch_data(pair, timeframe, limit))
+        except Exception as e:
+            print(f"Could not seed {timeframe} history, filling from the stream instead: {e}")
+
+    def on_message(ws, message):
+        kline = json.loads(message).get('data', {}).get('k')
+        if not kline or kline['i'] not in buffers:
+            return
+        buffer = buffers[kline['i']]
+        if buffer.update(kline) and len(buffer) >= 20:
+            print(f"Analyzing timeframe: {kline['i']}")
+            analyze_market(buffer.frame(), kline['i'])
+
+    def on_error(ws, error):
+        print(f"WebSocket Error: {error}")
+
+    streams = '/'.join(f"{pair.lower()}@kline_{timeframe}" for timeframe in timeframes)
+    ws = websocket.WebSocketApp(f"{url}/stream?streams={streams}", on_message=on_message, on_error=on_error)
+    ws.run_forever(reconnect=5)
+
+# Start real-time monitoring (pass --stream to use the WebSocket kline feed)
+if '--stream' in sys.argv:
+    stream_monitoring(pair='ETHUSDT', timeframes=['1h', '30m', '15m'])
+else:
+    real_time_monitoring(pair='ETHUSDT', timeframes=['1h', '30m', '15m'], interval=900)
 6
\ No newline at end of file
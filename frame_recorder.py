@@ -0,0 +1,157 @@
+"""Record raw WebSocket frames and replay them through the same on_message handlers.
+
+A recording is a flat binary file (gzip-compressed when the name ends in ``.gz``):
+a short magic header followed by one record per frame, each being the receive time
+(float64 seconds), a frame type (1 text, 2 binary), the payload length (uint32) and
+the payload bytes. Set ``RECORD_FRAMES`` to a directory to make app.py, trade3.py and
+tradeictfibrsi.py record every frame they receive.
+
+    python frame_recorder.py recordings/app_20250101T000000.frames --speed 10
+    python frame_recorder.py recordings/app_20250101T000000.frames --speed 0 --handler app:on_message
+"""
+import argparse
+import atexit
+import datetime
+import gzip
+import importlib
+import os
+import struct
+import threading
+import time
+
+MAGIC = b'WSFRAMES1\n'
+RECORD_HEADER = struct.Struct('<dBI')
+FRAME_TEXT = 1
+FRAME_BINARY = 2
+
+
+def _open(path, mode):
+    return gzip.open(path, mode) if str(path).endswith('.gz') else open(path, mode)
+
+
+class FrameRecorder:
+    """Appends raw frames with their receive timestamps to a recording file"""
+
+    def __init__(self, path, flush_every=100):
+        self.path = path
+        self.flush_every = flush_every
+        self.frames = 0
+        self.lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = _open(path, 'wb')
+        self.file.write(MAGIC)
+
+    def record(self, message, received=None):
+        received = time.time() if received is None else received
+        if isinstance(message, str):
+            frame_type, payload = FRAME_TEXT, message.encode('utf-8')
+        else:
+            frame_type, payload = FRAME_BINARY, bytes(message)
+        with self.lock:
+            if self.file is None:
+                return
+            self.file.write(RECORD_HEADER.pack(received, frame_type, len(payload)))
+            self.file.write(payload)
+            self.frames += 1
+            if self.frames % self.flush_every == 0:
+                self.file.flush()
+
+    def wrap(self, handler):
+        """Returns an ``on_message(ws, message)`` callback that records each frame before handling it"""
+        def on_message(ws, message):
+            self.record(message)
+            handler(ws, message)
+        return on_message
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+
+def recorder_from_env(name, env='RECORD_FRAMES'):
+    """FrameRecorder writing to ``$RECORD_FRAMES/<name>_<utc time>.frames``, or None when recording is off"""
+    directory = os.getenv(env)
+    if not directory:
+        return None
+    stamp = datetime.datetime.utcnow().strftime('%Y%m%dT%H%M%S')
+    recorder = FrameRecorder(os.path.join(directory, f"{name}_{stamp}.frames"))
+    atexit.register(recorder.close)
+    return recorder
+
+
+def read_frames(path):
+    """Yields ``(received, message)`` for every frame in a recording, text frames as str"""
+    with _open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a frame recording")
+        while True:
+            header = f.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                return  # End of file, or a record cut short by a crash
+            received, frame_type, length = RECORD_HEADER.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length:
+                return
+            yield received, payload.decode('utf-8') if frame_type == FRAME_TEXT else payload
+
+
+def replay(path, handler, speed=1.0, ws=None):
+    """Feeds a recording through ``handler(ws, message)``.
+
+    ``speed`` scales the recorded gaps between frames: 1 is real time, 10 is ten times
+    faster, and 0 (or None) sends frames as fast as the handler can take them.
+    Returns throughput statistics for the run.
+    """
+    frames = 0
+    payload_bytes = 0
+    handler_time = 0.0
+    first = None
+    start = time.perf_counter()
+    for received, message in read_frames(path):
+        if first is None:
+            first = received
+        if speed:
+            delay = start + (received - first) / speed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        began = time.perf_counter()
+        handler(ws, message)
+        handler_time += time.perf_counter() - began
+        frames += 1
+        payload_bytes += len(message)
+    elapsed = time.perf_counter() - start
+    return {
+        'frames': frames,
+        'bytes': payload_bytes,
+        'elapsed': elapsed,
+        'recorded_span': (received - first) if frames else 0.0,
+        'frames_per_second': frames / elapsed if elapsed else 0.0,
+        'mean_handler_us': handler_time / frames * 1e6 if frames else 0.0,
+    }
+
+
+def load_handler(spec):
+    """Resolves ``module:function`` (e.g. ``app:on_message``) to a callable"""
+    module_name, _, attribute = spec.partition(':')
+    return getattr(importlib.import_module(module_name), attribute or 'on_message')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded WebSocket feed through an on_message handler")
+    parser.add_argument('path')
+    parser.add_argument('--speed', type=float, default=1.0, help="replay speed multiplier; 0 for as fast as possible")
+    parser.add_argument('--handler', default='app:on_message', help="module:function taking (ws, message)")
+    args = parser.parse_args()
+
+    stats = replay(args.path, load_handler(args.handler), args.speed)
+    print(f"Replayed {stats['frames']} frames ({stats['bytes']} bytes) in {stats['elapsed']:.3f}s "
+          f"(recorded span {stats['recorded_span']:.3f}s)")
+    print(f"{stats['frames_per_second']:.0f} frames/s, {stats['mean_handler_us']:.1f} us per frame in the handler")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,8 +4,7 @@ import requests
 import random
 import datetime
 import numpy as np
-import websocket
-import json
+from deriv_client import get_client, latest_tick_request
 
 # Constants for ICT concepts
 KILL_ZONES = [(2, 5), (13, 16)]  # Example time ranges for kill zones (UTC)
@@ -29,19 +28,14 @@ class TradingApp:
 
     def fetch_market_data(self, pair):
         try:
-            ws = websocket.create_connection("wss://ws.derivws.com/websockets/v3?app_id=1089")
-            request = {"ticks": pair}
-            ws.send(json.dumps(request))
-            response = json.loads(ws.recv())
-            ws.close()
-            return response if 'tick' in response else None
+            response = get_client().request(latest_tick_request(pair))
+            return response if 'history' in response else None
         except Exception as e:
             print(f"Error fetching market data: {e}")
             return None
 
     def fetch_candlestick_data(self, pair, timeframe="1h", count=100):
         try:
-            ws = websocket.create_connection("wss://ws.derivws.com/websockets/v3?app_id=1089")
             request = {
                 "ticks_history": pair,
                 "adjust_start_time": 1,
@@ -50,9 +44,7 @@ class TradingApp:
                 "granularity": 3600 if timeframe == "1h" else 1800,
                 "style": "candles"
             }
-            ws.send(json.dumps(request))
-            response = json.loads(ws.recv())
-            ws.close()
+            response = get_client().request(request)
             return response['candles'] if 'candles' in response else None
         except Exception as e:
             print(f"Error fetching candlestick data: {e}")
@@ -112,7 +104,6 @@ class TradingApp:
         return None, None, None, None
 
     def execute_trade(self, trade, entry, sl, tp):
-        ws = websocket.create_connection("wss://ws.derivws.com/websockets/v3?app_id=1089")
         trade_request = {
             "authorize": DERIV_API_KEY,
             "buy": 1 if trade == "Buy" else -1,
@@ -121,9 +112,7 @@ class TradingApp:
             "stop_loss": sl,
             "take_profit": tp
         }
-        ws.send(json.dumps(trade_request))
-        response = json.loads(ws.recv())
-        ws.close()
+        response = get_client().request(trade_request)
         return response
 
     def update_signals(self):
@@ -1,3 +1,4 @@
+import asyncio
 import time
 
 try:
@@ -6,6 +7,8 @@ try:
     import numpy as np
     import matplotlib.pyplot as plt
     from datetime import datetime
+    from ohlcv_ingest import OHLCVIngestor
+    from rate_limiter import PRIORITY_HISTORY, get_scheduler
 except ModuleNotFoundError as e:
     missing_module = str(e).split("No module named '")[1].split("'")[0]
     print(f"Error: The required module '{missing_module}' is not installed.")
@@ -13,17 +16,19 @@ except ModuleNotFoundError as e:
     raise SystemExit
 
 # Initialize exchange with a longer timeout for FXCM
-exchange = ccxt.fxcm({
+EXCHANGE_CONFIG = {
     'rateLimit': 1200,  # API rate limit
     'timeout': 90000,  # Set timeout to 90 seconds
     'enableRateLimit': True  # Enable automatic rate limiting
-})
+}
+exchange = ccxt.fxcm(EXCHANGE_CONFIG)
 
 # Function to fetch data for any trading pair and timeframe
 def fetch_data(pair='XAU/USD', timeframe='1h', limit=100):
     retries = 7
     for attempt in range(retries):
         try:
+            get_scheduler(exchange.id).acquire(PRIORITY_HISTORY)
             data = exchange.fetch_ohlcv(pair, timeframe=timeframe, limit=limit)
             df = pd.DataFrame(data, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
             df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
@@ -85,18 +90,26 @@ def analyze_market(df):
         log_df = pd.DataFrame([log_entry])
     log_df.to_csv('trade_logs.csv', index=False)
 
-# Continuous monitoring loop for multiple timeframes
-def real_time_monitoring(pair='XAU/USD', timeframes=['1h', '30m', '15m'], interval=60):
-    while True:
-        try:
-            for timeframe in timeframes:
-                print(f"Analyzing timeframe: {timeframe}")
-                df = fetch_data(pair, timeframe)
-                analyze_market(df)
-            time.sleep(interval)  # Wait before fetching new data
-        except Exception as e:
-            print(f"Error occurred: {e}. Retrying in 90 seconds...")
-            time.sleep(90)  # Wait before retrying
+# Continuous monitoring loop for multiple pairs and timeframes; every pair/timeframe is fetched
+# concurrently on one shared exchange session, and only bars newer than the last cycle are pulled
+async def monitor_pairs(pairs, timeframes, interval):
+    ingestor = OHLCVIngestor('fxcm', EXCHANGE_CONFIG)
+    try:
+        while True:
+            try:
+                frames = await ingestor.refresh(pairs, timeframes)
+                for (pair, timeframe), df in frames.items():
+                    print(f"Analyzing {pair} timeframe: {timeframe}")
+                    analyze_market(df)
+                await asyncio.sleep(interval)  # Wait before fetching new data
+            except Exception as e:
+                print(f"Error occurred: {e}. Retrying in 90 seconds...")
+                await asyncio.sleep(90)  # Wait before retrying
+    finally:
+        await ingestor.close()
+
+def real_time_monitoring(pair='XAU/USD', timeframes=['1h', '30m', '15m'], interval=60, pairs=None):
+    asyncio.run(monitor_pairs(pairs or [pair], timeframes, interval))
 
 # Start real-time monitoring
 real_time_monitoring(pair='XAU/USD', timeframes=['1h', '30m', '15m'], interval=60)
@@ -0,0 +1,252 @@
+"""Bulk history downloads into a columnar archive on disk.
+
+Deriv ticks and candles are paged backward with ``ticks_history`` (``end`` plus
+``count``) and ccxt OHLCV is paged forward with ``since``. Each (symbol, day) is one
+task on a thread pool, so many pages are in flight at once while the shared rate
+limiter keeps the total request rate within budget.
+
+The archive holds one directory per source, symbol, series and day, with one .npy file
+per column:
+
+    history/deriv/R_100/ticks/2024-01-05/epoch.npy, quote.npy
+    history/binance/BTC-USDT/ohlcv_1h/2024-01-05/epoch.npy, open.npy, ..., volume.npy
+
+A day is written to a temporary directory and renamed into place once complete, so
+a rerun skips the days already there and resumes with the rest. Only whole days up to
+yesterday (UTC) are archived, and a day that comes back empty is not archived at all:
+it may be a closed market (frx weekends) or a gap the source fills in later, and is
+asked for again on the next run.
+
+    python history_downloader.py deriv R_100,R_75 --start 2024-01-01 --end 2024-02-01
+    python history_downloader.py deriv R_100 --style candles --granularity 60 --start 2023-01-01
+    python history_downloader.py binance BTC/USDT,ETH/USDT --timeframe 1h --start 2023-01-01
+"""
+import argparse
+import datetime
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+from rate_limiter import PRIORITY_HISTORY, get_scheduler
+
+HISTORY_DIR = os.getenv("HISTORY_DIR", "history")
+DAY = 86400
+# Deriv's ticks_history returns at most this many rows per request
+PAGE_SIZE = 5000
+
+COLUMNS = {
+    'ticks': ('epoch', 'quote'),
+    'candles': ('epoch', 'open', 'high', 'low', 'close'),
+    'ohlcv': ('epoch', 'open', 'high', 'low', 'close', 'volume'),
+}
+
+
+def _dtype(column):
+    return np.int64 if column == 'epoch' else np.float64
+
+
+def _to_date(value):
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.date.fromisoformat(value)
+
+
+def day_range(start, end=None):
+    """UTC days from ``start`` up to but excluding ``end``, never past yesterday"""
+    today = datetime.datetime.now(datetime.timezone.utc).date()
+    start = _to_date(start)
+    end = min(_to_date(end), today) if end is not None else today
+    return [start + datetime.timedelta(days=i) for i in range((end - start).days)]
+
+
+def day_epoch(day):
+    return int(datetime.datetime(day.year, day.month, day.day, tzinfo=datetime.timezone.utc).timestamp())
+
+
+class HistoryArchive:
+    """Columnar store of daily partitions; see the module docstring for the layout"""
+
+    def __init__(self, root=HISTORY_DIR):
+        self.root = root
+
+    def series_path(self, source, symbol, series):
+        return os.path.join(self.root, source, symbol.replace('/', '-'), series)
+
+    def day_path(self, source, symbol, series, day):
+        return os.path.join(self.series_path(source, symbol, series), day.isoformat())
+
+    def has_day(self, source, symbol, series, day):
+        return os.path.isdir(self.day_path(source, symbol, series, day))
+
+    def days(self, source, symbol, series):
+        path = self.series_path(source, symbol, series)
+        if not os.path.isdir(path):
+            return []
+        return sorted(datetime.date.fromisoformat(name) for name in os.listdir(path) if '.' not in name)
+
+    def write_day(self, source, symbol, series, day, columns):
+        """Writes one day's {column: array}; the partition appears only once every column is on disk"""
+        path = self.day_path(source, symbol, series, day)
+        tmp = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        os.makedirs(tmp, exist_ok=True)
+        for column, values in columns.items():
+            np.save(os.path.join(tmp, f"{column}.npy"), np.asarray(values, dtype=_dtype(column)))
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        os.replace(tmp, path)
+
+    def read_day(self, source, symbol, series, day, mmap=True):
+        path = self.day_path(source, symbol, series, day)
+        return {column: np.load(os.path.join(path, f"{column}.npy"), mmap_mode='r' if mmap else None)
+                for column in COLUMNS[series.split('_')[0]]}
+
+    def read(self, source, symbol, series, start=None, end=None):
+        """All archived rows of a series between two days (end exclusive) as a DataFrame"""
+        days = [day for day in self.days(source, symbol, series)
+                if (start is None or day >= _to_date(start)) and (end is None or day < _to_date(end))]
+        parts = [self.read_day(source, symbol, series, day) for day in days]
+        if not parts:
+            return pd.DataFrame(columns=COLUMNS[series.split('_')[0]])
+        return pd.DataFrame({column: np.concatenate([part[column] for part in parts]) for column in parts[0]})
+
+
+def _deriv_page(response, style):
+    """{column: list} of one ticks_history reply, oldest first"""
+    if 'error' in response:
+        raise RuntimeError(response['error'].get('message', response['error']))
+    if style == 'candles':
+        candles = response.get('candles', [])
+        return {column: [candle[column] for candle in candles] for column in COLUMNS['candles']}
+    history = response.get('history', {})
+    return {'epoch': history.get('times', []), 'quote': history.get('prices', [])}
+
+
+def fetch_deriv_day(client, symbol, day, style='ticks', granularity=60):
+    """One UTC day of Deriv ticks or candles, paging backward from the end of the day"""
+    day_start = day_epoch(day)
+    end = day_start + DAY - 1
+    count = PAGE_SIZE if style == 'ticks' else min(PAGE_SIZE, DAY // granularity + 1)
+    pages = []
+    while end >= day_start:
+        request = {"ticks_history": symbol, "end": end, "count": count, "style": style}
+        if style == 'candles':
+            request["granularity"] = granularity
+        page = _deriv_page(client.request(request), style)
+        epochs = page['epoch']
+        if not epochs:
+            break
+        pages.append(page)
+        if len(epochs) < count or epochs[0] <= day_start:
+            break
+        end = epochs[0] - 1
+
+    columns = COLUMNS[style]
+    if not pages:
+        return {column: np.empty(0, dtype=_dtype(column)) for column in columns}
+    data = {column: np.concatenate([np.asarray(page[column], dtype=_dtype(column)) for page in reversed(pages)])
+            for column in columns}
+    keep = (data['epoch'] >= day_start) & (data['epoch'] < day_start + DAY)
+    return {column: values[keep] for column, values in data.items()}
+
+
+def fetch_ccxt_day(exchange, pair, timeframe, day, limit=1000):
+    """One UTC day of ccxt OHLCV bars, paging forward with ``since`` (epochs in seconds)"""
+    day_start = day_epoch(day) * 1000
+    day_end = day_start + DAY * 1000
+    scheduler = get_scheduler(exchange.id)
+    since, bars = day_start, []
+    while since < day_end:
+        scheduler.acquire(PRIORITY_HISTORY)
+        page = [bar for bar in exchange.fetch_ohlcv(pair, timeframe=timeframe, since=since, limit=limit)
+                if day_start <= bar[0] < day_end]
+        if not page:
+            break
+        bars.extend(page)
+        since = page[-1][0] + 1
+    values = np.asarray(bars, dtype=float).reshape(-1, len(COLUMNS['ohlcv']))
+    data = {column: values[:, i] for i, column in enumerate(COLUMNS['ohlcv'])}
+    data['epoch'] = (data['epoch'] // 1000).astype(np.int64)
+    return data
+
+
+class HistoryDownloader:
+    """Downloads missing days into a HistoryArchive on a thread pool"""
+
+    def __init__(self, archive=None, workers=8):
+        self.archive = archive or HistoryArchive()
+        self.workers = workers
+
+    def _run(self, source, series, symbols, days, fetch):
+        """Runs ``fetch(symbol, day)`` for every missing (symbol, day); returns a summary dict"""
+        tasks = [(symbol, day) for symbol in symbols for day in days
+                 if not self.archive.has_day(source, symbol, series, day)]
+        summary = {'downloaded': 0, 'rows': 0, 'skipped': len(symbols) * len(days) - len(tasks),
+                   'empty': 0, 'failed': []}
+        if not tasks:
+            return summary
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(fetch, symbol, day): (symbol, day) for symbol, day in tasks}
+            for future in as_completed(futures):
+                symbol, day = futures[future]
+                try:
+                    columns = future.result()
+                    if not len(columns['epoch']):
+                        summary['empty'] += 1
+                        continue
+                    self.archive.write_day(source, symbol, series, day, columns)
+                except Exception as e:
+                    print(f"Error downloading {symbol} {day}: {e}")
+                    summary['failed'].append((symbol, day.isoformat()))
+                    continue
+                summary['downloaded'] += 1
+                summary['rows'] += len(columns['epoch'])
+        return summary
+
+    def download_deriv(self, symbols, start, end=None, style='ticks', granularity=60, client=None):
+        if client is None:
+            from deriv_client import get_client
+            client = get_client()
+        series = 'ticks' if style == 'ticks' else f'candles_{granularity}'
+        return self._run('deriv', series, symbols, day_range(start, end),
+                         lambda symbol, day: fetch_deriv_day(client, symbol, day, style, granularity))
+
+    def download_ccxt(self, exchange_id, pairs, start, end=None, timeframe='1h', config=None):
+        import ccxt
+        # ccxt exchanges are not thread-safe, so each worker thread gets its own instance
+        local = threading.local()
+
+        def fetch(pair, day):
+            if not hasattr(local, 'exchange'):
+                local.exchange = getattr(ccxt, exchange_id)(config or {})
+            return fetch_ccxt_day(local.exchange, pair, timeframe, day)
+        return self._run(exchange_id, f'ohlcv_{timeframe}', pairs, day_range(start, end), fetch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Download deep history into the local archive")
+    parser.add_argument('source', help="'deriv' or a ccxt exchange id such as binance")
+    parser.add_argument('symbols', help="Comma-separated symbols or pairs")
+    parser.add_argument('--start', required=True, help="First day, YYYY-MM-DD")
+    parser.add_argument('--end', help="Day after the last one, YYYY-MM-DD (default: today)")
+    parser.add_argument('--style', choices=['ticks', 'candles'], default='ticks')
+    parser.add_argument('--granularity', type=int, default=60)
+    parser.add_argument('--timeframe', default='1h')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--root', default=HISTORY_DIR)
+    args = parser.parse_args()
+
+    downloader = HistoryDownloader(HistoryArchive(args.root), args.workers)
+    symbols = args.symbols.split(',')
+    if args.source == 'deriv':
+        summary = downloader.download_deriv(symbols, args.start, args.end, args.style, args.granularity)
+    else:
+        summary = downloader.download_ccxt(args.source, symbols, args.start, args.end, args.timeframe)
+    print(f"Downloaded {summary['downloaded']} days ({summary['rows']} rows), "
+          f"skipped {summary['skipped']} already archived, {summary['empty']} empty, "
+          f"{len(summary['failed'])} failed")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,21 +1,14 @@
 import pandas as pd
 import numpy as np
 import tkinter as tk
-import websocket
-import json
+from candle_feed import get_feed
+from deriv_client import DERIV_API_URL
+from streaming_rsi import CandleRSI
+# Vectorized FVG, order block and liquidity grab detectors (one pass, NumPy arrays of intervals)
+from ict_patterns import detect_fvg, detect_order_blocks, detect_liquidity_grabs
 
-# Initialize WebSocket for Deriv
-DERIV_API_URL = "wss://ws.derivws.com/websockets/v3?app_id=1089"
-
-# RSI Calculation
-def calculate_rsi(data, period=14):
-    delta = data['close'].diff()
-    gain = np.where(delta > 0, delta, 0)
-    loss = np.where(delta < 0, -delta, 0)
-    avg_gain = pd.Series(gain).rolling(window=period).mean()
-    avg_loss = pd.Series(loss).rolling(window=period).mean()
-    rs = avg_gain / avg_loss
-    return 100 - (100 / (1 + rs))
+# RSI per symbol, updated only with the candles closed since the last analysis
+rsi = CandleRSI(period=14)
 
 # Fibonacci Retracement Levels
 def calculate_fibonacci_levels(high, low):
@@ -32,38 +25,6 @@ def calculate_support_resistance(data):
     resistance = data['high'].max()
     return support, resistance
 
-# Detect Fair Value Gaps (FVG)
-def detect_fvg(data):
-    fvgs = []
-    for i in range(1, len(data) - 1):
-        prev_candle = data.iloc[i - 1]
-        current_candle = data.iloc[i]
-        next_candle = data.iloc[i + 1]
-        if prev_candle['high'] < next_candle['low']:
-            fvgs.append((prev_candle['high'], next_candle['low']))
-    return fvgs
-
-# Detect Order Blocks
-def detect_order_blocks(data):
-    order_blocks = []
-    for i in range(1, len(data) - 1):
-        current_candle = data.iloc[i]
-        next_candle = data.iloc[i + 1]
-        if current_candle['close'] < current_candle['open'] and next_candle['close'] > next_candle['open']:
-            order_blocks.append((current_candle['low'], current_candle['high']))  # Bullish Order Block
-        elif current_candle['close'] > current_candle['open'] and next_candle['close'] < next_candle['open']:
-            order_blocks.append((current_candle['low'], current_candle['high']))  # Bearish Order Block
-    return order_blocks
-
-# Detect Liquidity Grabs
-def detect_liquidity_grabs(data):
-    grabs = []
-    for i in range(1, len(data) - 1):
-        current_candle = data.iloc[i]
-        if current_candle['high'] > data['high'].max() or current_candle['low'] < data['low'].min():
-            grabs.append((current_candle['low'], current_candle['high']))
-    return grabs
-
 # Generate Buy or Sell Signal Based on Strategies
 def generate_trade_signal(rsi_value, price, fib_levels, support, resistance, fvgs, order_blocks, liquidity_grabs):
     if rsi_value < 30 and price <= fib_levels["61.8%"] and price <= support:
@@ -78,26 +39,13 @@ def generate_trade_signal(rsi_value, price, fib_levels, support, resistance, fvg
         return f"SELL SIGNAL\nEntry: {entry:.2f}\nStop Loss: {stop_loss:.2f}\nTake Profit: {take_profit:.2f}"
     return "NO SIGNAL"
 
-# Fetch Historical Candle Data
+# Fetch Historical Candle Data (seeded once, then kept live by the candle subscription)
 def fetch_candle_data(symbol, granularity=3600, count=100):
     try:
-        ws = websocket.create_connection(DERIV_API_URL)
-        req = json.dumps({
-            "ticks_history": symbol,
-            "end": "latest",
-            "count": count,
-            "style": "candles",
-            "granularity": granularity
-        })
-        ws.send(req)
-        response = json.loads(ws.recv())
-        ws.close()
-        if 'candles' in response:
-            data = pd.DataFrame(response['candles'])
+        data = get_feed(DERIV_API_URL).candles(symbol, granularity, count)
+        if data is not None:
             data['epoch'] = pd.to_datetime(data['epoch'], unit='s')
-            return data
-        else:
-            return None
+        return data
     except Exception as e:
         print(f"Error fetching historical data for {symbol}: {e}")
         return None
@@ -107,7 +55,7 @@ def analyze_market(symbol):
     data = fetch_candle_data(symbol)
     if data is not None:
         current_price = data['close'].iloc[-1]
-        rsi_value = calculate_rsi(data).iloc[-1]
+        rsi_value = rsi.latest(symbol, data['epoch'], data['close'])
         high = data['high'].max()
         low = data['low'].min()
         fib_levels = calculate_fibonacci_levels(high, low)
@@ -0,0 +1,87 @@
+import numpy as np
+
+
+def _columns(data, *names):
+    return [np.asarray(data[name], dtype=float) for name in names]
+
+
+def detect_fvg(data):
+    """Fair value gaps as an (n, 2) array of (gap low, gap high), oldest first.
+
+    A gap is left when the candle before a bar has a lower high than the low of the
+    candle after it.
+    """
+    high, low = _columns(data, 'high', 'low')
+    gap = high[:-2] < low[2:]
+    return np.column_stack((high[:-2][gap], low[2:][gap]))
+
+
+def detect_order_blocks(data):
+    """Order blocks as an (n, 2) array of the (low, high) of each candle whose direction the next candle reverses"""
+    open_, high, low, close = _columns(data, 'open', 'high', 'low', 'close')
+    bearish = close < open_
+    bullish = close > open_
+    block = (bearish[1:-1] & bullish[2:]) | (bullish[1:-1] & bearish[2:])
+    return np.column_stack((low[1:-1][block], high[1:-1][block]))
+
+
+def detect_liquidity_grabs(data):
+    """Liquidity grabs as an (n, 2) array of the (low, high) of each candle that swept every earlier high or low"""
+    high, low = _columns(data, 'high', 'low')
+    if len(high) < 3:
+        return np.empty((0, 2))
+    prior_high = np.maximum.accumulate(high)[:-2]
+    prior_low = np.minimum.accumulate(low)[:-2]
+    grab = (high[1:-1] > prior_high) | (low[1:-1] < prior_low)
+    return np.column_stack((low[1:-1][grab], high[1:-1][grab]))
+
+
+class ICTDetector:
+    """Incremental version of the detectors above for a live candle stream.
+
+    add() takes each closed candle once and does O(1) work: the new candle completes the
+    gap centred on the previous bar, the order block of the previous bar and its grab
+    check. After n candles, fvgs/order_blocks/liquidity_grabs equal the batch results
+    for those n candles.
+    """
+
+    def __init__(self):
+        self.window = []  # The last three (open, high, low, close) candles
+        self.prior_high = None  # Extremes of every candle before window[-2]
+        self.prior_low = None
+        self.events = {'fvg': [], 'order_block': [], 'liquidity_grab': []}
+
+    def add(self, open_, high, low, close):
+        """Adds a closed candle; returns the patterns it completed as {name: (low, high)}"""
+        self.window.append((float(open_), float(high), float(low), float(close)))
+        if len(self.window) > 3:
+            del self.window[0]
+        found = {}
+        if len(self.window) == 3:
+            before, middle, last = self.window
+            if before[1] < last[2]:
+                found['fvg'] = (before[1], last[2])
+            if (middle[3] < middle[0] and last[3] > last[0]) or (middle[3] > middle[0] and last[3] < last[0]):
+                found['order_block'] = (middle[2], middle[1])
+            self.prior_high = before[1] if self.prior_high is None else max(self.prior_high, before[1])
+            self.prior_low = before[2] if self.prior_low is None else min(self.prior_low, before[2])
+            if middle[1] > self.prior_high or middle[2] < self.prior_low:
+                found['liquidity_grab'] = (middle[2], middle[1])
+        for name, interval in found.items():
+            self.events[name].append(interval)
+        return found
+
+    def _array(self, name):
+        return np.array(self.events[name], dtype=float).reshape(-1, 2)
+
+    @property
+    def fvgs(self):
+        return self._array('fvg')
+
+    @property
+    def order_blocks(self):
+        return self._array('order_block')
+
+    @property
+    def liquidity_grabs(self):
+        return self._array('liquidity_grab')
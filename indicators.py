@@ -0,0 +1,92 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Every kernel takes (n_series, n_bars) float arrays, oldest bar first, and works on all
+# series at once. Short series are left-padded with NaN by stack_candles(); NaN never
+# counts as a price, so padding only ever produces NaN results.
+
+FIB_RATIOS = (0.236, 0.382, 0.5, 0.618, 0.786)
+
+
+def stack_candles(frames, count=None, columns=('open', 'high', 'low', 'close')):
+    """Stacks candle DataFrames (or dicts of arrays) into one (n_series, n_bars) array per column.
+
+    ``frames`` maps a key (e.g. (symbol, timeframe)) to its candles; entries that are None are
+    skipped. Series are aligned on their latest bar and trimmed or padded to ``count`` bars.
+    Returns ``(keys, {column: array})``.
+    """
+    keys = [key for key, frame in frames.items() if frame is not None and len(frame)]
+    if count is None:
+        count = max((len(frames[key]) for key in keys), default=0)
+    stacked = {column: np.full((len(keys), count), np.nan) for column in columns}
+    for row, key in enumerate(keys):
+        frame = frames[key]
+        for column in columns:
+            values = np.asarray(frame[column], dtype=float)[-count:]
+            if len(values):
+                stacked[column][row, -len(values):] = values
+    return keys, stacked
+
+
+def _rolling(values, window, reduce):
+    out = np.full(values.shape, np.nan)
+    if values.shape[1] >= window:
+        with np.errstate(invalid='ignore'):
+            out[:, window - 1:] = reduce(sliding_window_view(values, window, axis=1), axis=-1)
+    return out
+
+
+def rolling_mean(values, window):
+    return _rolling(values, window, np.mean)
+
+
+def rolling_min(values, window):
+    """Lowest value of the last ``window`` bars at every bar"""
+    return _rolling(values, window, np.min)
+
+
+def rolling_max(values, window):
+    """Highest value of the last ``window`` bars at every bar"""
+    return _rolling(values, window, np.max)
+
+
+def rsi(close, period=14):
+    """SMA-smoothed RSI for every bar of every series; same values as the pandas calculate_rsi copies"""
+    close = np.asarray(close, dtype=float)
+    delta = np.diff(close, axis=1, prepend=np.nan)
+    # Like the pandas version, the first change of a series counts as no movement
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    padding = np.isnan(close)
+    gain[padding] = np.nan
+    loss[padding] = np.nan
+    avg_gain = rolling_mean(gain, period)
+    avg_loss = rolling_mean(loss, period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 100 - 100 / (1 + avg_gain / avg_loss)
+
+
+def swing_high_low(high, low, lookback=None):
+    """Highest high and lowest low of each series over the last ``lookback`` bars (all bars by default)"""
+    if lookback is not None:
+        high, low = high[:, -lookback:], low[:, -lookback:]
+    with np.errstate(invalid='ignore'):
+        return np.nanmax(high, axis=1), np.nanmin(low, axis=1)
+
+
+def fibonacci_levels(swing_high, swing_low, ratios=FIB_RATIOS):
+    """Retracement levels measured down from the swing high, shape (n_series, len(ratios))"""
+    swing_range = (swing_high - swing_low)[:, None]
+    return swing_high[:, None] - np.asarray(ratios)[None, :] * swing_range
+
+
+def liquidity_grabs(high, low, close):
+    """Bars that swept the previous high and closed back below it (up), or the mirror image (down)"""
+    prev_high = np.roll(high, 1, axis=1)
+    prev_low = np.roll(low, 1, axis=1)
+    prev_high[:, 0] = np.nan
+    prev_low[:, 0] = np.nan
+    with np.errstate(invalid='ignore'):
+        up = (high > prev_high) & (close < prev_high)
+        down = (low < prev_low) & (close > prev_low)
+    return up, down
@@ -0,0 +1,77 @@
+import asyncio
+import time
+import pandas as pd
+import ccxt.async_support as ccxt_async
+from rate_limiter import PRIORITY_HISTORY, get_scheduler
+
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+
+class OHLCVIngestor:
+    """Async ccxt OHLCV ingestion for many pairs and timeframes.
+
+    One exchange instance (and so one HTTP session) is shared by every fetch, and each
+    call also takes a slot from the process-wide scheduler for that exchange. Bars are
+    kept in an in-memory buffer per (pair, timeframe); after the first fill, each refresh
+    asks only for bars ``since`` the last buffered one, which is re-fetched because it is
+    usually still open.
+    """
+
+    def __init__(self, exchange_id='binance', config=None, limit=100, retries=7):
+        self.exchange = getattr(ccxt_async, exchange_id)(config or {})
+        self.limit = limit
+        self.retries = retries
+        self.scheduler = get_scheduler(self.exchange.id)
+        self.buffers = {}
+
+    async def _fetch_ohlcv(self, pair, timeframe, since):
+        for attempt in range(self.retries):
+            try:
+                await self.scheduler.acquire_async(PRIORITY_HISTORY)
+                return await self.exchange.fetch_ohlcv(pair, timeframe=timeframe, since=since, limit=self.limit)
+            except (ccxt_async.RequestTimeout, ccxt_async.NetworkError, ccxt_async.ExchangeError) as e:
+                print(f"Error fetching {pair} {timeframe}: {e}. Retrying {attempt + 1}/{self.retries}...")
+                await asyncio.sleep(3 ** attempt)  # Exponential backoff
+        raise Exception(f"Failed to fetch {pair} {timeframe} after multiple retries.")
+
+    async def fetch(self, pair, timeframe):
+        """Brings one buffer up to date and returns it as a DataFrame"""
+        key = (pair, timeframe)
+        buffer = self.buffers.get(key, [])
+        since = buffer[-1][0] if buffer else None
+        timeframe_ms = self.exchange.parse_timeframe(timeframe) * 1000
+        if since is not None and time.time() * 1000 - since >= self.limit * timeframe_ms:
+            since = None  # Too far behind for one page; refill the whole window
+
+        bars = await self._fetch_ohlcv(pair, timeframe, since)
+        if since is None:
+            buffer = []
+        if bars:
+            first = bars[0][0]
+            buffer = [bar for bar in buffer if bar[0] < first] + bars
+        self.buffers[key] = buffer[-self.limit:]
+
+        df = pd.DataFrame(self.buffers[key], columns=OHLCV_COLUMNS)
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        return df
+
+    async def fetch_all(self, pair, timeframes):
+        """Fetches every timeframe of one pair concurrently"""
+        frames = await asyncio.gather(*(self.fetch(pair, timeframe) for timeframe in timeframes))
+        return dict(zip(timeframes, frames))
+
+    async def refresh(self, pairs, timeframes):
+        """Fetches every (pair, timeframe) concurrently and returns {(pair, timeframe): DataFrame}"""
+        keys = [(pair, timeframe) for pair in pairs for timeframe in timeframes]
+        frames = await asyncio.gather(*(self.fetch(pair, timeframe) for pair, timeframe in keys),
+                                      return_exceptions=True)
+        results = {}
+        for key, frame in zip(keys, frames):
+            if isinstance(frame, Exception):
+                print(f"Error fetching {key[0]} {key[1]}: {frame}")
+            else:
+                results[key] = frame
+        return results
+
+    async def close(self):
+        await self.exchange.close()
@@ -0,0 +1,208 @@
+"""Parallel parameter sweep for the trade21 RSI/Fibonacci rules.
+
+Every combination of RSI period, oversold/overbought thresholds, Fibonacci ratio and
+reward/risk multiple is backtested on every symbol with backtest.simulate(). The candle
+arrays are copied once into a shared memory block that the worker processes map
+directly, so only parameter tuples and metric dicts cross process boundaries.
+
+    python param_sweep.py --symbols R_100,R_75,1HZ100V --granularity 300 --count 5000
+"""
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+import indicators
+from backtest import backtest_metrics, rsi_fib_levels, simulate
+
+DEFAULT_GRID = {
+    'rsi_period': [7, 14, 21],
+    'oversold': [20, 25, 30, 35],  # overbought defaults to 100 - oversold
+    'fib_ratio': [0.5, 0.618, 0.786],
+    'reward_ratio': [1.5, 2.0, 3.0],
+}
+PARAMETERS = ('rsi_period', 'oversold', 'overbought', 'fib_ratio', 'reward_ratio', 'window')
+DEFAULTS = {'rsi_period': 14, 'oversold': 30, 'overbought': 70, 'fib_ratio': 0.618, 'reward_ratio': 2.0,
+            'window': 200}
+OHLC = ('open', 'high', 'low', 'close')
+# Bump when the rules, the backtest or the metrics change what a sweep returns;
+# walk_forward.py keys its cached folds on it
+SWEEP_VERSION = 1
+
+
+class SharedCandles:
+    """OHLC arrays of many series packed into one shared memory block.
+
+    The block is a (4, total_bars) float64 array; ``layout`` maps each key to its
+    (start, length) slice. Workers call attach() with the handle to get zero-copy views.
+    """
+
+    def __init__(self, frames):
+        self.layout = {}
+        total = 0
+        for key, frame in frames.items():
+            self.layout[key] = (total, len(frame))
+            total += len(frame)
+        self.shape = (len(OHLC), max(total, 1))
+        self.shm = shared_memory.SharedMemory(create=True, size=int(np.prod(self.shape)) * 8)
+        data = np.ndarray(self.shape, dtype=np.float64, buffer=self.shm.buf)
+        for key, frame in frames.items():
+            start, length = self.layout[key]
+            for row, column in enumerate(OHLC):
+                data[row, start:start + length] = np.asarray(frame[column], dtype=float)
+
+    @property
+    def handle(self):
+        return self.shm.name, self.shape, self.layout
+
+    @staticmethod
+    def attach(handle):
+        """Maps a block created in another process; returns (shm, {key: {column: array}})"""
+        name, shape, layout = handle
+        # Pool workers share the creating process's resource tracker, which unlinks the block
+        # only if close() never ran
+        shm = shared_memory.SharedMemory(name=name)
+        data = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        series = {key: {column: data[row, start:start + length] for row, column in enumerate(OHLC)}
+                  for key, (start, length) in layout.items()}
+        return shm, series
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+def expand_grid(grid=None):
+    """Every parameter combination of a {name: [values]} grid, with the defaults filled in"""
+    grid = dict(DEFAULT_GRID if grid is None else grid)
+    names = list(grid)
+    combos = []
+    for values in itertools.product(*(grid[name] for name in names)):
+        params = dict(DEFAULTS, **dict(zip(names, values)))
+        if 'overbought' not in grid:
+            params['overbought'] = 100 - params['oversold']
+        combos.append(params)
+    return combos
+
+
+def evaluate_params(series, combos, fee=0.0, max_bars=None, start=0, stop=None):
+    """Backtests each parameter combination on one OHLC series; returns a list of metric dicts.
+
+    Indicators are computed once per RSI period and window and shared by every combination
+    that uses them. Only trades entered in bars[start:stop] count; the bars before ``start``
+    serve as indicator warm-up.
+    """
+    open_, high, low, close = (series[column] for column in OHLC)
+    stop = len(close) if stop is None else stop
+    rsi_cache, level_cache = {}, {}
+    results = []
+    for params in combos:
+        period, window = params['rsi_period'], params['window']
+        if period not in rsi_cache:
+            rsi_cache[period] = indicators.rsi(close[None, :stop], period)[0]
+        if window not in level_cache:
+            level_cache[window] = (indicators.rolling_min(low[None, :stop], window)[0],
+                                   indicators.rolling_max(high[None, :stop], window)[0])
+        support, resistance = level_cache[window]
+        direction, stop_loss, take_profit = rsi_fib_levels(
+            close[:stop], rsi_cache[period], support, resistance, params['oversold'], params['overbought'],
+            params['fib_ratio'], params['reward_ratio'])
+        direction[:start] = 0
+        sim = simulate(open_[:stop], high[:stop], low[:stop], close[:stop], direction, stop_loss, take_profit,
+                       fee=fee, max_bars=max_bars)
+        results.append(dict(params, **backtest_metrics(sim['returns'], sim['equity'])))
+    return results
+
+
+# Worker-process state: the attached shared block and its series views
+_shm = None
+_series = None
+
+
+def _init_worker(handle):
+    global _shm, _series
+    _shm, _series = SharedCandles.attach(handle)
+
+
+def _run_task(key, combos, fee, max_bars, start, stop):
+    results = evaluate_params(_series[key], combos, fee, max_bars, start, stop)
+    return [dict(result, symbol=key) for result in results]
+
+
+def run_sweep(frames, grid=None, fee=0.0, max_bars=None, workers=None, ranges=None):
+    """Sweeps the grid over every series in ``frames`` ({symbol: OHLC DataFrame}) in a process pool.
+
+    Work is split into one task per symbol and RSI period. ``ranges`` optionally maps a
+    symbol to the (start, stop) bars to trade in. Returns one row per symbol and combination.
+    """
+    combos = expand_grid(grid)
+    by_period = {}
+    for params in combos:
+        by_period.setdefault(params['rsi_period'], []).append(params)
+
+    shared = SharedCandles(frames)
+    try:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_init_worker,
+                                 initargs=(shared.handle,)) as pool:
+            futures = [
+                pool.submit(_run_task, key, chunk, fee, max_bars, *(ranges or {}).get(key, (0, None)))
+                for key in frames for chunk in by_period.values()
+            ]
+            rows = [row for future in futures for row in future.result()]
+    finally:
+        shared.close()
+    columns = ['symbol', *PARAMETERS]
+    frame = pd.DataFrame(rows)
+    return frame[columns + [column for column in frame.columns if column not in columns]]
+
+
+def rank(results, metric='total_return', by_params=True, min_trades=1):
+    """Ranks sweep results by ``metric``, best first.
+
+    With ``by_params`` the metric is averaged over symbols so each parameter set gets one
+    row; otherwise every (symbol, parameters) row is ranked on its own.
+    """
+    results = results[results['trades'] >= min_trades]
+    if by_params:
+        grouped = results.groupby(list(PARAMETERS))
+        results = grouped[metric].mean().to_frame(metric)
+        results['symbols'] = grouped['symbol'].nunique()
+        results['trades'] = grouped['trades'].sum()
+        results = results.reset_index()
+    return results.sort_values(metric, ascending=False).reset_index(drop=True)
+
+
+def load_candles(symbols, granularity, count):
+    """Candles for each symbol through the shared Deriv client and candle cache"""
+    from candle_store import get_store
+    from deriv_client import get_client
+    frames = {}
+    for symbol in symbols:
+        frame = get_store().fetch(get_client(), symbol, granularity, count)
+        if frame is None or frame.empty:
+            print(f"No candles for {symbol}; skipping")
+            continue
+        frames[symbol] = frame
+    return frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel parameter sweep for the RSI/Fibonacci strategy")
+    parser.add_argument('--symbols', default='R_10,R_25,R_50,R_75,R_100')
+    parser.add_argument('--granularity', type=int, default=300)
+    parser.add_argument('--count', type=int, default=5000)
+    parser.add_argument('--metric', default='total_return')
+    parser.add_argument('--fee', type=float, default=0.0)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    frames = load_candles(args.symbols.split(','), args.granularity, args.count)
+    results = run_sweep(frames, fee=args.fee, workers=args.workers)
+    print(rank(results, args.metric).head(args.top).to_string())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+
+# Lower numbers are served first
+PRIORITY_LIVE = 0
+PRIORITY_HISTORY = 1
+PRIORITY_NAMES = {PRIORITY_LIVE: 'live', PRIORITY_HISTORY: 'history'}
+
+# Request budgets per upstream: (requests per second, burst size)
+DEFAULT_LIMITS = {
+    'deriv': (20, 40),
+    'binance': (10, 20),
+}
+FALLBACK_LIMIT = (5, 10)
+
+
+class RequestScheduler:
+    """Process-wide token bucket that hands out request slots in priority order.
+
+    Waiters queue by (priority, arrival), so a live-price request always goes ahead of
+    any history backfill that is still waiting for a token. Both blocking threads and
+    asyncio tasks can wait on the same bucket.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst or rate)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.cond = threading.Condition()
+        self.waiters = []
+        self.seq = itertools.count()
+        self.counters = {}
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _take(self, entry):
+        """Takes a token for ``entry`` if it is at the head of the queue; otherwise returns how long to wait"""
+        self._refill()
+        if self.waiters[0] == entry and self.tokens >= 1:
+            heapq.heappop(self.waiters)
+            self.tokens -= 1
+            self.cond.notify_all()
+            return None
+        if self.waiters[0] == entry:
+            return (1 - self.tokens) / self.rate
+        return 1 / self.rate
+
+    def _record(self, priority, waited):
+        counter = self.counters.setdefault(priority, {'requests': 0, 'total_wait': 0.0, 'max_wait': 0.0})
+        counter['requests'] += 1
+        counter['total_wait'] += waited
+        counter['max_wait'] = max(counter['max_wait'], waited)
+
+    def _discard(self, entry):
+        if entry in self.waiters:
+            self.waiters.remove(entry)
+            heapq.heapify(self.waiters)
+            self.cond.notify_all()
+
+    def acquire(self, priority=PRIORITY_HISTORY):
+        """Blocks until a request slot is free; returns the seconds spent waiting"""
+        start = time.monotonic()
+        with self.cond:
+            entry = (priority, next(self.seq))
+            heapq.heappush(self.waiters, entry)
+            try:
+                while True:
+                    delay = self._take(entry)
+                    if delay is None:
+                        break
+                    self.cond.wait(delay)
+            except BaseException:
+                self._discard(entry)
+                raise
+            waited = time.monotonic() - start
+            self._record(priority, waited)
+        return waited
+
+    async def acquire_async(self, priority=PRIORITY_HISTORY):
+        """Same as acquire() for asyncio code, without blocking the event loop"""
+        start = time.monotonic()
+        with self.cond:
+            entry = (priority, next(self.seq))
+            heapq.heappush(self.waiters, entry)
+        try:
+            while True:
+                with self.cond:
+                    delay = self._take(entry)
+                if delay is None:
+                    break
+                await asyncio.sleep(delay)
+        except BaseException:
+            with self.cond:
+                self._discard(entry)
+            raise
+        waited = time.monotonic() - start
+        with self.cond:
+            self._record(priority, waited)
+        return waited
+
+    def stats(self):
+        """Queue depth and wait-time statistics, for sizing the budget"""
+        with self.cond:
+            self._refill()
+            waiting = {}
+            for priority, _ in self.waiters:
+                name = PRIORITY_NAMES.get(priority, str(priority))
+                waiting[name] = waiting.get(name, 0) + 1
+            by_priority = {}
+            for priority, counter in self.counters.items():
+                by_priority[PRIORITY_NAMES.get(priority, str(priority))] = {
+                    'requests': counter['requests'],
+                    'mean_wait': counter['total_wait'] / counter['requests'],
+                    'max_wait': counter['max_wait'],
+                }
+            return {
+                'rate': self.rate,
+                'burst': self.burst,
+                'tokens': round(self.tokens, 3),
+                'queue_depth': len(self.waiters),
+                'waiting': waiting,
+                'by_priority': by_priority,
+            }
+
+
+# One scheduler per upstream for the whole process
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(name):
+    with _schedulers_lock:
+        if name not in _schedulers:
+            _schedulers[name] = RequestScheduler(*DEFAULT_LIMITS.get(name, FALLBACK_LIMIT))
+        return _schedulers[name]
+
+
+def scheduler_stats():
+    with _schedulers_lock:
+        schedulers = dict(_schedulers)
+    return {name: scheduler.stats() for name, scheduler in schedulers.items()}
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+CANDLE_COLUMNS = ['epoch', 'open', 'high', 'low', 'close']
+
+
+def _aggregate(epochs, opens, highs, lows, closes, granularity, complete_from=None):
+    """Groups rows into candles starting at ``epoch - epoch % granularity``.
+
+    A leading bucket whose first row starts after ``complete_from`` (the bucket start by
+    default) is missing data and is dropped, so the first candle is never a partial one.
+    The last candle may still be open, like the latest candle Deriv returns.
+    """
+    if not len(epochs):
+        return pd.DataFrame(columns=CANDLE_COLUMNS)
+    buckets = epochs - epochs % granularity
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    stops = np.r_[starts[1:], len(epochs)] - 1
+    candles = pd.DataFrame({
+        'epoch': buckets[starts],
+        'open': opens[starts],
+        'high': np.maximum.reduceat(highs, starts),
+        'low': np.minimum.reduceat(lows, starts),
+        'close': closes[stops],
+    })
+    first_start = buckets[0] if complete_from is None else complete_from
+    if epochs[0] > first_start:
+        candles = candles.iloc[1:]
+    return candles.reset_index(drop=True)
+
+
+def resample_candles(candles, granularity):
+    """Builds ``granularity``-second candles from a finer candle series (e.g. 5m -> 1h).
+
+    ``candles`` is a DataFrame (or dict of arrays) with epoch/open/high/low/close, oldest
+    first, whose granularity divides ``granularity``.
+    """
+    epochs = np.asarray(candles['epoch'], dtype=np.int64)
+    columns = [np.asarray(candles[name], dtype=float) for name in ('open', 'high', 'low', 'close')]
+    return _aggregate(epochs, *columns, int(granularity))
+
+
+def ticks_to_candles(epochs, quotes, granularity):
+    """Builds candles from raw ticks; every bucket that has ticks becomes a candle"""
+    epochs = np.asarray(epochs, dtype=np.int64)
+    quotes = np.asarray(quotes, dtype=float)
+    if not len(epochs):
+        return pd.DataFrame(columns=CANDLE_COLUMNS)
+    granularity = int(granularity)
+    # A tick stream can start anywhere inside a bucket, so the first candle is always kept
+    return _aggregate(epochs, quotes, quotes, quotes, quotes, granularity, complete_from=epochs[0])
+
+
+def derive_timeframes(base, timeframes, count=None):
+    """Returns {timeframe: candles} for every timeframe, built from one base candle series.
+
+    Timeframes are in seconds (int or str); one equal to the base granularity gets the
+    base series itself. ``count`` trims each result to its latest candles.
+    """
+    epochs = np.asarray(base['epoch'], dtype=np.int64)
+    base_granularity = int(np.min(np.diff(epochs))) if len(epochs) > 1 else None
+    derived = {}
+    for timeframe in timeframes:
+        granularity = int(timeframe)
+        if granularity == base_granularity:
+            candles = pd.DataFrame({name: np.asarray(base[name]) for name in CANDLE_COLUMNS})
+        else:
+            candles = resample_candles(base, granularity)
+        derived[timeframe] = candles if count is None else candles.tail(count).reset_index(drop=True)
+    return derived
@@ -0,0 +1,70 @@
+import numpy as np
+
+
+class RingBuffer:
+    """Fixed-capacity window of the latest values, backed by one NumPy array.
+
+    Each value is written twice, at ``pos`` and ``pos + capacity`` in a buffer of twice
+    the capacity, so the latest ``n`` values always sit next to each other and view()
+    can return them as a contiguous slice without copying. append() costs the same at
+    a capacity of 100 or 100k. Indexing and slicing work like a list of the values,
+    oldest first, but return NumPy scalars and views.
+
+    Views alias the buffer, so they are only valid until the next append(), which
+    overwrites them in place. Copy a view that is kept longer than that.
+    """
+
+    __slots__ = ('capacity', 'data', 'pos', 'size')
+
+    def __init__(self, capacity, dtype=float):
+        self.capacity = int(capacity)
+        self.data = np.zeros(2 * self.capacity, dtype=dtype)
+        self.pos = 0
+        self.size = 0
+
+    def append(self, value):
+        pos = self.pos
+        self.data[pos] = value
+        self.data[pos + self.capacity] = value
+        pos += 1
+        self.pos = 0 if pos == self.capacity else pos
+        if self.size < self.capacity:
+            self.size += 1
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=self.data.dtype)[-self.capacity:]
+        for value in values:
+            self.append(value)
+
+    def view(self, n=None):
+        """The latest ``n`` values (all of them by default), oldest first, as a read-only view.
+
+        Valid until the next append(); copy it to keep it.
+        """
+        n = self.size if n is None else min(n, self.size)
+        end = self.pos + self.capacity
+        window = self.data[end - n:end]
+        window.flags.writeable = False
+        return window
+
+    def clear(self):
+        self.pos = 0
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, key):
+        return self.view()[key]
+
+    def __iter__(self):
+        return iter(self.view())
+
+    def __array__(self, dtype=None, copy=None):
+        """np.array() gets its own copy; np.asarray() gets the read-only view, valid until the next append()"""
+        window = self.view()
+        if dtype is not None and np.dtype(dtype) != window.dtype:
+            if copy is False:
+                raise ValueError(f"Converting the buffer to {np.dtype(dtype)} needs a copy")
+            return window.astype(dtype)
+        return window.copy() if copy else window
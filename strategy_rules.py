@@ -0,0 +1,224 @@
+"""Entry rules written as expressions and compiled to vectorized evaluators.
+
+A strategy is a dict of Python expressions over the market variables below, evaluated
+over whole arrays (one element per symbol/timeframe series) in a single pass:
+
+    'buy' / 'sell'                           entry conditions (sell only where buy is false)
+    'buy_stop_loss' / 'buy_take_profit'      exit levels for a buy
+    'sell_stop_loss' / 'sell_take_profit'    exit levels for a sell
+
+Expressions may use numbers, the variables, + - * / and unary minus, comparisons (chains
+included), and/or/not, and abs/min/max. Anything else is rejected when the rule is
+compiled, so strategies can be loaded from JSON files without running arbitrary code.
+"""
+import ast
+import json
+import operator
+import numpy as np
+import indicators
+
+SIGNAL_NONE = 0
+SIGNAL_BUY = 1
+SIGNAL_SELL = -1
+
+# Variables available to rules; market_variables() computes them for a stacked candle grid
+VARIABLES = (
+    'price', 'open', 'high', 'low', 'close', 'rsi', 'support', 'resistance',
+    'swing_high', 'swing_low', 'fib_236', 'fib_382', 'fib_5', 'fib_618', 'fib_786',
+    'grab_up', 'grab_down',
+)
+
+RULE_FIELDS = ('buy', 'sell', 'buy_stop_loss', 'buy_take_profit', 'sell_stop_loss', 'sell_take_profit')
+
+_BINARY = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv}
+_COMPARE = {ast.Lt: operator.lt, ast.LtE: operator.le, ast.Gt: operator.gt, ast.GtE: operator.ge,
+            ast.Eq: operator.eq, ast.NotEq: operator.ne}
+_FUNCTIONS = {'abs': np.abs, 'min': np.minimum, 'max': np.maximum}
+
+# The entry rules of the existing bots. Only tradewith runs its entry live, in both of its analysis
+# cycles; the others are transcriptions of rules those bots still code by hand, for running them
+# through tradewith.evaluate_grid(strategy=...) on the same candles
+STRATEGIES = {
+    # tradewith.py: Fibonacci/RSI entry confirmed by a liquidity grab, 1:2 risk from support/resistance
+    'tradewith': {
+        'buy': "rsi < 30 and price <= fib_618 and price > support and grab_down",
+        'sell': "rsi > 70 and price >= fib_618 and price < resistance and grab_up",
+        'buy_stop_loss': "support",
+        'buy_take_profit': "price + 2 * abs(price - support)",
+        'sell_stop_loss': "resistance",
+        'sell_take_profit': "price - 2 * abs(price - resistance)",
+    },
+    # trade21.py, copilottrade.py, trade51.py: the same without the liquidity grab
+    'trade21': {
+        'buy': "rsi < 30 and price <= fib_618 and price > support",
+        'sell': "rsi > 70 and price >= fib_618 and price < resistance",
+        'buy_stop_loss': "support",
+        'buy_take_profit': "price + 2 * abs(price - support)",
+        'sell_stop_loss': "resistance",
+        'sell_take_profit': "price - 2 * abs(price - resistance)",
+    },
+    # TRADE5.py: take profit at the next Fibonacci level, stop at half that distance
+    'TRADE5': {
+        'buy': "rsi < 30 and price <= fib_618 and price > support",
+        'sell': "rsi > 70 and price >= fib_618 and price < resistance",
+        'buy_stop_loss': "price - (fib_382 - price) / 2",
+        'buy_take_profit': "fib_382",
+        'sell_stop_loss': "price + (price - fib_786) / 2",
+        'sell_take_profit': "fib_786",
+    },
+    # deriv.py / ict.py generate_trade_signal: breakouts through support/resistance
+    'ict': {
+        'buy': "rsi < 30 and price <= fib_618 and price <= support",
+        'sell': "rsi > 70 and price >= fib_382 and price >= resistance",
+        'buy_stop_loss': "support",
+        'buy_take_profit': "resistance",
+        'sell_stop_loss': "resistance",
+        'sell_take_profit': "support",
+    },
+    # trade6.py: plain RSI extremes with fixed 50/100 pip exits
+    'trade6': {
+        'buy': "rsi < 30",
+        'sell': "rsi > 70",
+        'buy_stop_loss': "price - 0.0050",
+        'buy_take_profit': "price + 0.0100",
+        'sell_stop_loss': "price + 0.0050",
+        'sell_take_profit': "price - 0.0100",
+    },
+}
+STRATEGIES['copilottrade'] = STRATEGIES['trade51'] = STRATEGIES['trade21']
+
+
+def _all(values):
+    result = values[0]
+    for value in values[1:]:
+        result = np.logical_and(result, value)
+    return result
+
+
+def _any(values):
+    result = values[0]
+    for value in values[1:]:
+        result = np.logical_or(result, value)
+    return result
+
+
+def _compile_node(node, source):
+    """Turns one whitelisted AST node into a function of the variables dict"""
+    if isinstance(node, ast.Expression):
+        return _compile_node(node.body, source)
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        value = node.value
+        return lambda env: value
+    if isinstance(node, ast.Name):
+        if node.id not in VARIABLES:
+            raise ValueError(f"Unknown variable '{node.id}' in rule: {source}")
+        name = node.id
+        return lambda env: env[name]
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY:
+        op, left, right = _BINARY[type(node.op)], _compile_node(node.left, source), _compile_node(node.right, source)
+        return lambda env: op(left(env), right(env))
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        operand = _compile_node(node.operand, source)
+        return lambda env: -operand(env)
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+        operand = _compile_node(node.operand, source)
+        return lambda env: np.logical_not(operand(env))
+    if isinstance(node, ast.BoolOp):
+        combine = _all if isinstance(node.op, ast.And) else _any
+        values = [_compile_node(value, source) for value in node.values]
+        return lambda env: combine([value(env) for value in values])
+    if isinstance(node, ast.Compare) and all(type(op) in _COMPARE for op in node.ops):
+        operands = [_compile_node(operand, source) for operand in [node.left] + node.comparators]
+        ops = [_COMPARE[type(op)] for op in node.ops]
+
+        def compare(env):
+            values = [operand(env) for operand in operands]
+            with np.errstate(invalid='ignore'):
+                return _all([op(values[i], values[i + 1]) for i, op in enumerate(ops)])
+        return compare
+    if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in _FUNCTIONS
+            and not node.keywords):
+        function = _FUNCTIONS[node.func.id]
+        args = [_compile_node(arg, source) for arg in node.args]
+        if node.func.id == 'abs' and len(args) != 1 or node.func.id != 'abs' and len(args) != 2:
+            raise ValueError(f"Wrong number of arguments to {node.func.id}() in rule: {source}")
+        return lambda env: function(*(arg(env) for arg in args))
+    raise ValueError(f"Unsupported {type(node).__name__} in rule: {source}")
+
+
+def compile_rule(source):
+    """Compiles one expression into a function of the variables dict"""
+    try:
+        tree = ast.parse(source, mode='eval')
+    except SyntaxError as e:
+        raise ValueError(f"Invalid rule '{source}': {e.msg}")
+    return _compile_node(tree, source)
+
+
+class Strategy:
+    """A compiled strategy; evaluate() scores every series of a variables dict at once"""
+
+    def __init__(self, name, rules):
+        missing = [field for field in RULE_FIELDS if field not in rules]
+        if missing:
+            raise ValueError(f"Strategy {name} is missing {', '.join(missing)}")
+        self.name = name
+        self.rules = dict(rules)
+        self.compiled = {field: compile_rule(rules[field]) for field in RULE_FIELDS}
+
+    def evaluate(self, variables):
+        """Returns arrays: signal (1 buy, -1 sell, 0 none), entry_price, stop_loss and take_profit"""
+        price = np.asarray(variables['price'], dtype=float)
+        buy = np.broadcast_to(self.compiled['buy'](variables), price.shape).astype(bool)
+        sell = np.broadcast_to(self.compiled['sell'](variables), price.shape).astype(bool) & ~buy
+        with np.errstate(invalid='ignore', divide='ignore'):
+            stop_loss = np.where(buy, self.compiled['buy_stop_loss'](variables),
+                                 self.compiled['sell_stop_loss'](variables))
+            take_profit = np.where(buy, self.compiled['buy_take_profit'](variables),
+                                   self.compiled['sell_take_profit'](variables))
+        signal = np.where(buy, SIGNAL_BUY, np.where(sell, SIGNAL_SELL, SIGNAL_NONE))
+        return {
+            'signal': signal,
+            'entry_price': price,
+            'stop_loss': np.where(signal != SIGNAL_NONE, stop_loss, np.nan),
+            'take_profit': np.where(signal != SIGNAL_NONE, take_profit, np.nan),
+        }
+
+
+def get_strategy(name):
+    return Strategy(name, STRATEGIES[name])
+
+
+def load_strategies(path):
+    """Reads {name: rules} from a JSON file and compiles each strategy"""
+    with open(path) as f:
+        return {name: Strategy(name, rules) for name, rules in json.load(f).items()}
+
+
+def market_variables(stacked, prices, rsi_period=14):
+    """Rule variables for a stack_candles() grid, evaluated at the latest bar of each series.
+
+    ``prices`` holds the live price of each row (NaN where unknown); support and resistance
+    and the swing points span the whole window, as in the bots.
+    """
+    high, low, close = stacked['high'], stacked['low'], stacked['close']
+    swing_high, swing_low = indicators.swing_high_low(high, low)
+    fibs = indicators.fibonacci_levels(swing_high, swing_low, indicators.FIB_RATIOS)
+    grab_up, grab_down = indicators.liquidity_grabs(high, low, close)
+    variables = {
+        'price': np.asarray(prices, dtype=float),
+        'open': stacked['open'][:, -1] if 'open' in stacked else close[:, -1],
+        'high': high[:, -1],
+        'low': low[:, -1],
+        'close': close[:, -1],
+        'rsi': indicators.rsi(close, rsi_period)[:, -1],
+        'support': swing_low,
+        'resistance': swing_high,
+        'swing_high': swing_high,
+        'swing_low': swing_low,
+        'grab_up': grab_up[:, -1],
+        'grab_down': grab_down[:, -1],
+    }
+    for column, name in enumerate(('fib_236', 'fib_382', 'fib_5', 'fib_618', 'fib_786')):
+        variables[name] = fibs[:, column]
+    return variables
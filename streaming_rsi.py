@@ -0,0 +1,171 @@
+import threading
+import numpy as np
+
+
+class RSIState:
+    """Incremental RSI that costs O(1) per new price.
+
+    ``smoothing='sma'`` averages the last ``period`` gains and losses, the same as the
+    ``rolling(window=period).mean()`` copies of calculate_rsi. ``smoothing='wilder'``
+    uses Wilder's recursive average, seeded with the SMA of the first ``period`` changes.
+    Feed it one closing price at a time with update(), or a history with seed().
+    """
+
+    __slots__ = ('period', 'smoothing', 'last', 'count', 'gains', 'losses', 'index',
+                 'sum_gain', 'sum_loss', 'avg_gain', 'avg_loss')
+
+    def __init__(self, period=14, smoothing='sma'):
+        if smoothing not in ('sma', 'wilder'):
+            raise ValueError(f"Unknown RSI smoothing: {smoothing}")
+        self.period = period
+        self.smoothing = smoothing
+        self.last = None
+        self.count = 0  # Price changes seen so far
+        self.gains = [0.0] * period
+        self.losses = [0.0] * period
+        self.index = 0
+        self.sum_gain = 0.0
+        self.sum_loss = 0.0
+        self.avg_gain = None
+        self.avg_loss = None
+
+    @property
+    def ready(self):
+        return self.avg_gain is not None
+
+    @staticmethod
+    def _rsi(avg_gain, avg_loss):
+        if avg_loss == 0:
+            return 100.0 if avg_gain > 0 else 50.0
+        return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+    def _averages(self, gain, loss):
+        """Averages after one more change, without storing it"""
+        period = self.period
+        if self.smoothing == 'wilder' and self.avg_gain is not None:
+            return ((self.avg_gain * (period - 1) + gain) / period,
+                    (self.avg_loss * (period - 1) + loss) / period)
+        if self.count + 1 < period:
+            return None, None
+        # The oldest change in the window drops out once the window is full
+        dropped_gain = self.gains[self.index] if self.count >= period else 0.0
+        dropped_loss = self.losses[self.index] if self.count >= period else 0.0
+        return ((self.sum_gain - dropped_gain + gain) / period,
+                (self.sum_loss - dropped_loss + loss) / period)
+
+    def update(self, price):
+        """Adds the next closing price; returns the RSI, or None while warming up"""
+        price = float(price)
+        if self.last is None:
+            self.last = price
+            return None
+        change = price - self.last
+        gain, loss = max(change, 0.0), max(-change, 0.0)
+        self.last = price
+        self.avg_gain, self.avg_loss = self._averages(gain, loss)
+
+        period = self.period
+        if self.smoothing == 'sma' or self.count < period:
+            self.sum_gain += gain - self.gains[self.index]
+            self.sum_loss += loss - self.losses[self.index]
+            self.gains[self.index] = gain
+            self.losses[self.index] = loss
+            self.index += 1
+            if self.index == period:
+                self.index = 0
+                # Re-add from scratch once per pass so the running sums cannot drift
+                self.sum_gain = sum(self.gains)
+                self.sum_loss = sum(self.losses)
+        self.count += 1
+        return self.value()
+
+    def value(self):
+        if self.avg_gain is None:
+            return None
+        return self._rsi(self.avg_gain, self.avg_loss)
+
+    def preview(self, price):
+        """RSI if ``price`` were the next close (e.g. the live price of an open candle); state is unchanged"""
+        if self.last is None:
+            return None
+        change = float(price) - self.last
+        avg_gain, avg_loss = self._averages(max(change, 0.0), max(-change, 0.0))
+        if avg_gain is None:
+            return None
+        return self._rsi(avg_gain, avg_loss)
+
+    def seed(self, prices):
+        """Warms the state up from historical closes; returns the latest RSI"""
+        for price in prices:
+            self.update(price)
+        return self.value()
+
+
+class RSIStreams:
+    """One RSIState per key (symbol, or symbol and timeframe), created on first use"""
+
+    def __init__(self, period=14, smoothing='sma'):
+        self.period = period
+        self.smoothing = smoothing
+        self.states = {}
+        self.lock = threading.Lock()
+
+    def state(self, key):
+        with self.lock:
+            if key not in self.states:
+                self.states[key] = RSIState(self.period, self.smoothing)
+            return self.states[key]
+
+    def update(self, key, price):
+        return self.state(key).update(price)
+
+    def preview(self, key, price):
+        return self.state(key).preview(price)
+
+    def value(self, key):
+        state = self.states.get(key)
+        return state.value() if state else None
+
+
+class CandleRSI:
+    """RSI at the last candle of live candle series, such as CandleFeed frames or kline buffers.
+
+    Every candle but the last is treated as closed and fed to the key's RSIState once; the
+    last (still open, or just closed) candle is only previewed, so a refresh costs O(1) per
+    new candle instead of a full rolling pass. If the series no longer holds the last candle
+    fed in (after a gap, a reconnect or a replay), the state is seeded again from the series.
+    """
+
+    def __init__(self, period=14, smoothing='sma'):
+        self.streams = RSIStreams(period, smoothing)
+        self.fed = {}  # Epoch of the last closed candle fed in, per key
+        self.lock = threading.Lock()
+
+    def latest(self, key, epochs, closes):
+        """RSI at the last of ``closes`` (NaN while warming up, like the rolling copies)"""
+        epochs = np.asarray(epochs)
+        closes = np.asarray(closes, dtype=float)
+        if not len(closes):
+            return np.nan
+        with self.lock:
+            state = self.streams.state(key)
+            closed = epochs[:-1]
+            last = self.fed.get(key)
+            start = int(np.searchsorted(closed, last)) if last is not None else len(closed)
+            if start < len(closed) and closed[start] == last:
+                start += 1
+            else:
+                state = self.streams.states[key] = RSIState(self.streams.period, self.streams.smoothing)
+                start = 0
+            state.seed(closes[start:-1])
+            if len(closes) > 1:
+                self.fed[key] = epochs[-2]
+            value = state.preview(closes[-1])
+        return np.nan if value is None else value
+
+
+def rsi_series(prices, period=14, smoothing='sma'):
+    """RSI for a whole price history as an array (NaN while warming up)"""
+    state = RSIState(period, smoothing)
+    values = [state.update(price) for price in prices]
+    return np.array([np.nan if v is None else v for v in values])
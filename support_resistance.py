@@ -0,0 +1,99 @@
+import threading
+from collections import deque
+
+
+class RollingExtremes:
+    """Lowest low and highest high of the last ``window`` values in amortized O(1) per update.
+
+    Keeps two monotonic deques of (index, value): candidates for the maximum in
+    decreasing order and candidates for the minimum in increasing order. A value that
+    can no longer be the extreme of any future window is dropped as soon as it is
+    beaten, so each value is pushed and popped at most once.
+    """
+
+    __slots__ = ('window', 'index', 'highs', 'lows')
+
+    def __init__(self, window):
+        self.window = window
+        self.index = 0
+        self.highs = deque()
+        self.lows = deque()
+
+    def update(self, high, low=None):
+        """Adds the next bar (or tick, with ``low`` omitted); returns (support, resistance)"""
+        low = high if low is None else low
+        index = self.index
+        self.index += 1
+
+        highs, lows = self.highs, self.lows
+        while highs and highs[-1][1] <= high:
+            highs.pop()
+        highs.append((index, high))
+        while lows and lows[-1][1] >= low:
+            lows.pop()
+        lows.append((index, low))
+
+        expired = index - self.window
+        if highs[0][0] <= expired:
+            highs.popleft()
+        if lows[0][0] <= expired:
+            lows.popleft()
+        return lows[0][1], highs[0][1]
+
+    @property
+    def ready(self):
+        return self.index >= self.window
+
+    @property
+    def support(self):
+        return self.lows[0][1] if self.lows else None
+
+    @property
+    def resistance(self):
+        return self.highs[0][1] if self.highs else None
+
+
+class SupportResistanceTracker:
+    """Rolling support/resistance per symbol for one or more window lengths.
+
+    Every update that moves a level emits ``(symbol, window, kind, old, new)`` with kind
+    ``'support'`` or ``'resistance'``, either to ``on_change(symbol, window, kind, old, new)``
+    or to an ``events`` queue, the same way CandleFeed reports candles.
+    """
+
+    def __init__(self, windows=(20,), on_change=None, events=None):
+        self.windows = tuple(windows)
+        self.on_change = on_change
+        self.events = events
+        self.extremes = {}
+        self.lock = threading.Lock()
+
+    def update(self, symbol, high, low=None):
+        """Feeds one bar or tick; returns the level changes it caused"""
+        changes = []
+        with self.lock:
+            for window in self.windows:
+                key = (symbol, window)
+                if key not in self.extremes:
+                    self.extremes[key] = RollingExtremes(window)
+                extremes = self.extremes[key]
+                old = (extremes.support, extremes.resistance)
+                new = extremes.update(high, low)
+                if new[0] != old[0]:
+                    changes.append((symbol, window, 'support', old[0], new[0]))
+                if new[1] != old[1]:
+                    changes.append((symbol, window, 'resistance', old[1], new[1]))
+        for change in changes:
+            if self.on_change is not None:
+                self.on_change(*change)
+            if self.events is not None:
+                self.events.put(change)
+        return changes
+
+    def levels(self, symbol, window=None):
+        """Current (support, resistance) for a symbol, or (None, None) before its first update"""
+        with self.lock:
+            extremes = self.extremes.get((symbol, window or self.windows[0]))
+            if extremes is None:
+                return None, None
+            return extremes.support, extremes.resistance
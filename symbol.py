@@ -1,16 +1,11 @@
-import websocket
-import json
+from deriv_client import get_client
 
 def get_active_symbols():
-    ws = websocket.create_connection("wss://ws.binaryws.com/websockets/v3?app_id=1089")
     request = {
         "active_symbols": "brief",
         "product_type": "basic"
     }
-    ws.send(json.dumps(request))
-    response = json.loads(ws.recv())
-    ws.close()
-    return response
+    return get_client().request(request)
 
 # Fetch active symbols
 symbols_response = get_active_symbols()
@@ -0,0 +1,287 @@
+"""Tick-level backtester for the ICT tick detectors of tradeictfibrsi.TradingApp.
+
+Replays stored ticks with the bot's own rules:
+  * perform_ict_analysis runs on every tick but gets past its throttle only when the tick
+    epoch is at least 60 s after the last tick that did (the first tick always does);
+  * those ticks need at least 10 prices in the window, else nothing is signalled;
+  * the first detector that fires decides: fair value gap -> BUY, order block -> SELL,
+    liquidity grab -> BUY;
+  * the entry is the tick price rounded to 2 decimals, with take profit and stop loss
+    2.0 away from it.
+Each trade is entered at its signal tick and closed by the first later tick at or through
+its take profit or stop loss, filled at that tick's price.
+
+Only the ticks that pass the throttle are evaluated: their last 10 prices are gathered into
+one (signals, 10) array and all three detectors run on it at once. First touches are found
+for all trades together in a pyramid of block maxima and minima, so the cost per trade
+grows with log(ticks) rather than with how long the trade stays open.
+
+    python tick_backtest.py 1HZ100V --start 2024-01-01 --end 2024-02-01
+    python tick_backtest.py --synthetic 10000000
+"""
+import argparse
+import datetime
+import time
+import numpy as np
+import pandas as pd
+from backtest import EXIT_END, EXIT_STOP, EXIT_TARGET, LONG, SHORT, backtest_metrics, select_trades
+
+THROTTLE = 60  # Seconds between analyses
+MIN_TICKS = 10  # Prices perform_ict_analysis needs before it signals
+TARGET = 2.0  # Take profit and stop loss distance from the entry
+LEAF = 16  # Ticks per block at the bottom of the first_touch() pyramid
+
+PATTERNS = np.array(['', 'fair_value_gap', 'order_block', 'liquidity_grab'])
+
+
+def throttle_points(epochs, interval=THROTTLE, batch=4096):
+    """Indices of the ticks that get past perform_ict_analysis's throttle.
+
+    Each point is the first tick at least ``interval`` after the previous one. With a
+    tick every second, the next ``batch`` points usually sit exactly on
+    epoch + k * interval, so they are found with one searchsorted and kept up to the first
+    that lands elsewhere (a gap in the ticks), which becomes the start of the next batch.
+    """
+    epochs = np.asarray(epochs)
+    n = len(epochs)
+    if not n:
+        return np.array([], dtype=np.int64)
+    steps = interval * np.arange(1, batch + 1)
+    points = [np.zeros(1, dtype=np.int64)]
+    i = 0
+    while True:
+        expected = epochs[i] + steps
+        index = np.searchsorted(epochs, expected)
+        inside = index < n
+        exact = inside & (epochs[np.minimum(index, n - 1)] == expected)
+        # Points up to the first inexact one are right; that one still is if it lies inside the data
+        k = batch - 1 if exact.all() else int(np.argmin(exact))
+        points.append(index[:k + 1][inside[:k + 1]])
+        if not inside[k]:
+            break
+        i = index[k]
+    return np.concatenate(points).astype(np.int64)
+
+
+def ict_tick_signals(quotes, points):
+    """Direction and pattern (index into PATTERNS) of the detectors at each throttle point.
+
+    Mirrors detect_fvg, detect_order_block and detect_liquidity_grab on the last 10 ticks.
+    A liquidity grab (a new 10-tick high) is always also a 5-tick high, so the order
+    block check before it catches it first and the grab never fires, as in the bot.
+    Returns (index, direction, pattern) for the points with enough ticks.
+    """
+    points = np.asarray(points, dtype=np.int64)
+    points = points[points >= MIN_TICKS - 1]
+    windows = np.asarray(quotes)[points[:, None] + np.arange(1 - MIN_TICKS, 1)]
+    last = windows[:, -1]
+    fvg = np.abs(windows[:, -3] - last) > 2 * np.abs(windows[:, -2] - last)
+    recent = windows[:, -5:]
+    order_block = (last <= recent.min(axis=1)) | (last >= recent.max(axis=1))
+    grab = last > windows[:, :-1].max(axis=1)
+    direction = np.select([fvg, order_block, grab], [LONG, SHORT, LONG], 0)
+    pattern = np.select([fvg, order_block, grab], [1, 2, 3], 0)
+    signalled = direction != 0
+    return points[signalled], direction[signalled], pattern[signalled]
+
+
+def _pyramid(quotes):
+    """Maxima and minima of aligned blocks of LEAF, 2 * LEAF, 4 * LEAF, ... ticks"""
+    blocks = -(-len(quotes) // LEAF)
+    highs = np.full(blocks * LEAF, -np.inf)
+    lows = np.full(blocks * LEAF, np.inf)
+    highs[:len(quotes)] = quotes
+    lows[:len(quotes)] = quotes
+    highs, lows = [highs.reshape(-1, LEAF).max(axis=1)], [lows.reshape(-1, LEAF).min(axis=1)]
+    while len(highs[-1]) > 1:
+        high, low = highs[-1], lows[-1]
+        if len(high) % 2:
+            high, low = np.r_[high, -np.inf], np.r_[low, np.inf]
+        highs.append(high.reshape(-1, 2).max(axis=1))
+        lows.append(low.reshape(-1, 2).min(axis=1))
+    return highs, lows
+
+
+def _first_in_leaf(quotes, block, first, last, lower, upper):
+    """First tick of each leaf block within [first, last] at or outside (lower, upper), or -1"""
+    ticks = block[:, None] * LEAF + np.arange(LEAF)
+    window = quotes[np.minimum(ticks, len(quotes) - 1)]
+    hit = (window >= upper[:, None]) | (window <= lower[:, None])
+    hit &= (ticks >= first[:, None]) & (ticks <= last[:, None])
+    return np.where(hit.any(axis=1), ticks[np.arange(len(block)), hit.argmax(axis=1)], -1)
+
+
+def first_touch(quotes, entry_index, lower, upper, max_ticks=None, pyramid=None):
+    """Index of the first tick after each entry that is at or below ``lower`` or at or above ``upper``.
+
+    Trades that are not touched by the last tick (or within ``max_ticks``) get -1. The
+    remainder of the entry's leaf block is checked directly; after that each trade climbs
+    the pyramid block by block until a block's range reaches a level, then descends into it.
+    """
+    quotes = np.asarray(quotes, dtype=float)
+    entry_index = np.asarray(entry_index, dtype=np.int64)
+    lower = np.asarray(lower, dtype=float)
+    upper = np.asarray(upper, dtype=float)
+    highs, lows = pyramid or _pyramid(quotes)
+    last = np.full(len(entry_index), len(quotes) - 1)
+    if max_ticks is not None:
+        last = np.minimum(entry_index + max_ticks, last)
+    first = entry_index + 1
+    result = _first_in_leaf(quotes, first // LEAF, first, last, lower, upper)
+
+    # Climb: check block b at level k; if it has no touch, move on to b + 1, and step up a
+    # level whenever that block starts a block of the level above
+    active = np.flatnonzero((result < 0) & (first <= last))
+    block = first[active] // LEAF + 1
+    level = np.zeros(len(active), dtype=np.int64)
+    sizes = np.array([len(high) for high in highs])
+    found_trade, found_block, found_level = [], [], []
+    while len(active):
+        start = (block << level) * LEAF
+        alive = (start <= last[active]) & (block < sizes[level])
+        active, block, level = active[alive], block[alive], level[alive]
+        if not len(active):
+            break
+        high = np.empty(len(active))
+        low = np.empty(len(active))
+        for k in np.unique(level):
+            at = level == k
+            high[at], low[at] = highs[k][block[at]], lows[k][block[at]]
+        touched = (high >= upper[active]) | (low <= lower[active])
+        found_trade.append(active[touched])
+        found_block.append(block[touched])
+        found_level.append(level[touched])
+        active, block, level = active[~touched], block[~touched] + 1, level[~touched]
+        up = (block % 2 == 0) & (level < len(highs) - 1)
+        block = np.where(up, block // 2, block)
+        level = level + up
+
+    # Descend into the touched blocks: the touch is in the left child if that child reaches a level
+    trades = np.concatenate(found_trade) if found_trade else np.array([], dtype=np.int64)
+    block = np.concatenate(found_block) if found_block else np.array([], dtype=np.int64)
+    level = np.concatenate(found_level) if found_level else np.array([], dtype=np.int64)
+    for k in range(int(level.max()) if len(level) else 0, 0, -1):
+        at = np.flatnonzero(level == k)
+        left = block[at] * 2
+        touched = (highs[k - 1][left] >= upper[trades[at]]) | (lows[k - 1][left] <= lower[trades[at]])
+        block[at] = np.where(touched, left, left + 1)
+        level[at] = k - 1
+    if len(trades):
+        result[trades] = _first_in_leaf(quotes, block, first[trades], last[trades], lower[trades], upper[trades])
+    return result
+
+
+def resolve_tick_exits(quotes, entry_index, direction, stop_loss, take_profit, max_ticks=None):
+    """(exit_index, exit_price, exit_reason) of each trade, like backtest.resolve_exits with ticks as bars"""
+    quotes = np.asarray(quotes, dtype=float)
+    lower = np.minimum(stop_loss, take_profit)
+    upper = np.maximum(stop_loss, take_profit)
+    touch = first_touch(quotes, entry_index, lower, upper, max_ticks)
+    end = np.full(len(entry_index), len(quotes) - 1)
+    if max_ticks is not None:
+        end = np.minimum(entry_index + max_ticks, end)
+    exit_index = np.where(touch >= 0, touch, end)
+    exit_price = quotes[exit_index]
+    stopped = np.where(direction == LONG, exit_price <= stop_loss, exit_price >= stop_loss)
+    exit_reason = np.where(touch < 0, EXIT_END, np.where(stopped, EXIT_STOP, EXIT_TARGET)).astype(object)
+    return exit_index, exit_price, exit_reason
+
+
+def run_tick_backtest(epochs, quotes, interval=THROTTLE, target=TARGET, max_ticks=None, overlap=False):
+    """Backtests the ICT tick signals over sorted (epoch, quote) arrays, e.g. TickSeries.slice().
+
+    With ``overlap=False`` only one position is open at a time, and signals are skipped
+    until it exits. Returns {'trades': DataFrame, 'metrics': dict}; metrics include the
+    profit in price points next to the usual per-trade return figures.
+    """
+    epochs = np.asarray(epochs)
+    quotes = np.asarray(quotes, dtype=float)
+    entry_index, direction, pattern = ict_tick_signals(quotes, throttle_points(epochs, interval))
+    entry = np.round(quotes[entry_index], 2)
+    take_profit = entry + direction * target
+    stop_loss = entry - direction * target
+    exit_index, exit_price, exit_reason = resolve_tick_exits(quotes, entry_index, direction, stop_loss, take_profit,
+                                                             max_ticks)
+    if not overlap:
+        taken = select_trades(entry_index, exit_index)
+        entry_index, exit_index, direction, pattern = (entry_index[taken], exit_index[taken], direction[taken],
+                                                       pattern[taken])
+        take_profit, stop_loss = take_profit[taken], stop_loss[taken]
+        exit_price, exit_reason = exit_price[taken], exit_reason[taken]
+
+    entry_price = quotes[entry_index]
+    points = direction * (exit_price - entry_price)
+    returns = points / entry_price
+    trades = pd.DataFrame({
+        'entry_time': epochs[entry_index],
+        'exit_time': epochs[exit_index],
+        'side': np.where(direction == LONG, 'BUY', 'SELL'),
+        'pattern': PATTERNS[pattern],
+        'entry_price': entry_price,
+        'take_profit': take_profit,
+        'stop_loss': stop_loss,
+        'exit_price': exit_price,
+        'exit_reason': exit_reason,
+        'ticks_held': exit_index - entry_index,
+        'points': points,
+        'return': returns,
+    })
+    metrics = backtest_metrics(returns, np.cumprod(1 + returns))
+    metrics['total_points'] = float(points.sum())
+    metrics['ticks'] = len(quotes)
+    return {'trades': trades, 'metrics': metrics}
+
+
+def print_tick_report(result):
+    metrics, trades = result['metrics'], result['trades']
+    print(f"Ticks: {metrics['ticks']}, trades: {metrics['trades']}, win rate: {metrics['win_rate']:.1%}, "
+          f"total points: {metrics['total_points']:.2f}, total return: {metrics['total_return']:.2%}, "
+          f"max drawdown: {metrics['max_drawdown']:.2%}")
+    if len(trades):
+        summary = trades.groupby('pattern').agg(trades=('points', 'size'), points=('points', 'sum'),
+                                                win_rate=('points', lambda points: (points > 0).mean()))
+        print(summary.to_string())
+
+
+def synthetic_ticks(n, seed=0, start=1_700_000_000):
+    """1-second random-walk ticks priced like the 1HZ100V index (100% annual volatility)"""
+    rng = np.random.default_rng(seed)
+    quotes = np.round(1000 * np.exp(np.cumsum(rng.normal(0, 1 / np.sqrt(365 * 86400), n))), 2)
+    return start + np.arange(n, dtype=np.int64), quotes
+
+
+def _day_epoch(day):
+    if day is None:
+        return None
+    return int(datetime.datetime.fromisoformat(day).replace(tzinfo=datetime.timezone.utc).timestamp())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tick-level backtest of the tradeictfibrsi ICT signals")
+    parser.add_argument('symbol', nargs='?', help="Symbol in the tick store")
+    parser.add_argument('--start', help="First day, YYYY-MM-DD")
+    parser.add_argument('--end', help="Day after the last one, YYYY-MM-DD")
+    parser.add_argument('--root', help="Tick store directory")
+    parser.add_argument('--synthetic', type=int, help="Backtest this many random-walk ticks instead")
+    parser.add_argument('--max-ticks', type=int)
+    parser.add_argument('--overlap', action='store_true', help="Take every signal, even with a trade open")
+    args = parser.parse_args()
+    if not args.symbol and not args.synthetic:
+        parser.error("give a symbol or --synthetic N")
+
+    if args.synthetic:
+        epochs, quotes = synthetic_ticks(args.synthetic)
+    else:
+        from tick_store import TICK_STORE_DIR, TickStore
+        series = TickStore(args.root or TICK_STORE_DIR).open(args.symbol)
+        epochs, quotes = series.slice(_day_epoch(args.start), _day_epoch(args.end))
+
+    start = time.perf_counter()
+    result = run_tick_backtest(epochs, quotes, max_ticks=args.max_ticks, overlap=args.overlap)
+    elapsed = time.perf_counter() - start
+    print_tick_report(result)
+    print(f"{len(quotes)} ticks in {elapsed:.2f}s ({len(quotes) / max(elapsed, 1e-9) / 1e6:.1f}M ticks/s)")
+
+
+if __name__ == '__main__':
+    main()
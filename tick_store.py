@@ -0,0 +1,189 @@
+"""Tick store of fixed-width binary columns, read through numpy.memmap.
+
+Each symbol has a directory with three files:
+
+    epoch.bin   int64 epochs, little-endian, one per tick, ascending
+    quote.bin   float64 quotes, row for row with epoch.bin
+    index.bin   (day start epoch, first row) int64 pairs, one per UTC day with ticks
+
+A year of 1-second ticks is about 31.5M rows (500 MB). Reading it never parses
+anything: TickSeries maps both columns and slice() turns an epoch range into row
+bounds with the day index plus a binary search inside that day, then returns views of
+the mapped arrays. Only the pages that are actually touched are read from disk.
+
+    python tick_store.py import 1HZ100V --history history
+    python tick_store.py info 1HZ100V
+"""
+import argparse
+import datetime
+import os
+import threading
+import numpy as np
+
+TICK_STORE_DIR = os.getenv("TICK_STORE_DIR", "tick_store")
+DAY = 86400
+EPOCH_DTYPE = np.dtype('<i8')
+QUOTE_DTYPE = np.dtype('<f8')
+
+
+class TickSeries:
+    """Read-only memory-mapped view of one symbol's ticks as of when it was opened"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        rows = _rows(directory)
+        self.epochs = _map(os.path.join(directory, 'epoch.bin'), EPOCH_DTYPE, rows)
+        self.quotes = _map(os.path.join(directory, 'quote.bin'), QUOTE_DTYPE, rows)
+        index = _read_index(directory)
+        index = index[index[:, 1] < rows]
+        self.day_epochs = index[:, 0]
+        self.offsets = index[:, 1]
+
+    def __len__(self):
+        return len(self.epochs)
+
+    def bound(self, epoch):
+        """Row of the first tick at or after ``epoch``"""
+        day = np.searchsorted(self.day_epochs, epoch - epoch % DAY, side='right') - 1
+        if day < 0:
+            return 0
+        lo = int(self.offsets[day])
+        hi = int(self.offsets[day + 1]) if day + 1 < len(self.offsets) else len(self)
+        return lo + int(np.searchsorted(self.epochs[lo:hi], epoch))
+
+    def slice(self, start=None, end=None):
+        """(epochs, quotes) views of the ticks with start <= epoch < end"""
+        lo = 0 if start is None else self.bound(int(start))
+        hi = len(self) if end is None else self.bound(int(end))
+        return self.epochs[lo:hi], self.quotes[lo:hi]
+
+    def day(self, date):
+        start = _day_epoch(date)
+        return self.slice(start, start + DAY)
+
+    @property
+    def days(self):
+        return [datetime.datetime.fromtimestamp(int(epoch), datetime.timezone.utc).date()
+                for epoch in self.day_epochs]
+
+
+def _day_epoch(date):
+    return int(datetime.datetime(date.year, date.month, date.day, tzinfo=datetime.timezone.utc).timestamp())
+
+
+def _size(path):
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+def _rows(directory):
+    """Complete rows: quote.bin is written before epoch.bin, so a torn append shows up as extra quotes"""
+    return min(_size(os.path.join(directory, 'epoch.bin')), _size(os.path.join(directory, 'quote.bin'))) // 8
+
+
+def _map(path, dtype, rows):
+    if not rows:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', shape=(rows,))
+
+
+def _read_index(directory):
+    path = os.path.join(directory, 'index.bin')
+    if not os.path.exists(path):
+        return np.empty((0, 2), dtype=EPOCH_DTYPE)
+    index = np.fromfile(path, dtype=EPOCH_DTYPE)
+    return index[:len(index) // 2 * 2].reshape(-1, 2)
+
+
+class TickStore:
+    """Appends ticks to per-symbol binary columns and opens them as TickSeries"""
+
+    def __init__(self, root=TICK_STORE_DIR):
+        self.root = root
+        self.lock = threading.Lock()
+
+    def path(self, symbol):
+        return os.path.join(self.root, symbol)
+
+    def symbols(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root) if os.path.isdir(self.path(name)))
+
+    def open(self, symbol):
+        return TickSeries(self.path(symbol))
+
+    def _repair(self, directory):
+        """Drops the tail of an append that was interrupted; returns (rows, last epoch)"""
+        rows = _rows(directory)
+        for name in ('epoch.bin', 'quote.bin'):
+            path = os.path.join(directory, name)
+            if _size(path) > rows * 8:
+                os.truncate(path, rows * 8)
+        index = _read_index(directory)
+        if len(index) and index[-1, 1] >= rows:
+            index[index[:, 1] < rows].tofile(os.path.join(directory, 'index.bin'))
+        if not rows:
+            return 0, None
+        with open(os.path.join(directory, 'epoch.bin'), 'rb') as f:
+            f.seek((rows - 1) * 8)
+            return rows, int(np.frombuffer(f.read(8), dtype=EPOCH_DTYPE)[0])
+
+    def append(self, symbol, epochs, quotes):
+        """Appends the ticks newer than the last stored one; returns how many were written"""
+        epochs = np.asarray(epochs, dtype=EPOCH_DTYPE)
+        quotes = np.asarray(quotes, dtype=QUOTE_DTYPE)
+        order = np.argsort(epochs, kind='stable')
+        epochs, quotes = epochs[order], quotes[order]
+        directory = self.path(symbol)
+        with self.lock:
+            os.makedirs(directory, exist_ok=True)
+            rows, last = self._repair(directory)
+            if last is not None:
+                newer = epochs > last
+                epochs, quotes = epochs[newer], quotes[newer]
+            if not len(epochs):
+                return 0
+
+            days = epochs - epochs % DAY
+            starts = np.flatnonzero(np.r_[last is None or days[0] != last - last % DAY, days[1:] != days[:-1]])
+            index = np.column_stack([days[starts], rows + starts]).astype(EPOCH_DTYPE)
+            for name, values in (('quote.bin', quotes), ('epoch.bin', epochs), ('index.bin', index)):
+                with open(os.path.join(directory, name), 'ab') as f:
+                    f.write(values.tobytes())
+        return len(epochs)
+
+    def import_archive(self, archive, symbol, start=None, end=None):
+        """Appends the ticks of a history_downloader archive, one day at a time"""
+        written = 0
+        for day in archive.days('deriv', symbol, 'ticks'):
+            if (start is not None and day < start) or (end is not None and day >= end):
+                continue
+            columns = archive.read_day('deriv', symbol, 'ticks', day)
+            written += self.append(symbol, columns['epoch'], columns['quote'])
+        return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory-mapped tick store")
+    parser.add_argument('command', choices=['import', 'info'])
+    parser.add_argument('symbols', help="Comma-separated symbols")
+    parser.add_argument('--root', default=TICK_STORE_DIR)
+    parser.add_argument('--history', help="history_downloader archive to import from")
+    args = parser.parse_args()
+
+    store = TickStore(args.root)
+    for symbol in args.symbols.split(','):
+        if args.command == 'import':
+            from history_downloader import HISTORY_DIR, HistoryArchive
+            written = store.import_archive(HistoryArchive(args.history or HISTORY_DIR), symbol)
+            print(f"{symbol}: imported {written} ticks")
+        series = store.open(symbol)
+        if len(series):
+            first, last = series.days[0], series.days[-1]
+            print(f"{symbol}: {len(series)} ticks over {len(series.days)} days ({first} to {last})")
+        else:
+            print(f"{symbol}: no ticks")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,22 +1,18 @@
 import tkinter as tk
 from tkinter import ttk
-import websocket
-import json
+from deriv_client import get_client
 import numpy as np
 
 
 def fetch_historical_prices(symbol, count=50):
     try:
-        ws = websocket.create_connection("wss://ws.derivws.com/websockets/v3?app_id=1089")
         request = {
             "ticks_history": symbol,
             "count": count,
             "end": "latest",
             "style": "ticks"
         }
-        ws.send(json.dumps(request))
-        response = json.loads(ws.recv())
-        ws.close()
+        response = get_client().request(request)
 
         if 'history' in response and 'prices' in response['history']:
             return list(map(float, response['history']['prices']))
@@ -1,9 +1,12 @@
 try:
+    import argparse
     import ccxt
     import pandas as pd
     import numpy as np
     import matplotlib.pyplot as plt
     from datetime import datetime
+    from backtest import print_report, run_backtest
+    from rate_limiter import PRIORITY_HISTORY, get_scheduler
 except ModuleNotFoundError as e:
     missing_module = str(e).split("No module named '")[1].split("'")[0]
     print(f"Error: The required module '{missing_module}' is not installed.")
@@ -15,76 +18,115 @@ exchange = ccxt.binance()
 
 # Function to fetch data for any trading pair
 def fetch_data(pair='BTC/USDT', timeframe='1h', limit=100):
+    get_scheduler(exchange.id).acquire(PRIORITY_HISTORY)
     data = exchange.fetch_ohlcv(pair, timeframe=timeframe, limit=limit)
+    return ohlcv_frame(data)
+
+# Function to fetch every bar since a point in time, paging forward with `since`
+def fetch_history(pair='BTC/USDT', timeframe='1h', years=3, limit=1000):
+    since = exchange.milliseconds() - int(years * 365 * 24 * 3600 * 1000)
+    scheduler = get_scheduler(exchange.id)
+    data = []
+    while True:
+        scheduler.acquire(PRIORITY_HISTORY)
+        page = exchange.fetch_ohlcv(pair, timeframe=timeframe, since=since, limit=limit)
+        page = [bar for bar in page if not data or bar[0] > data[-1][0]]
+        if not page:
+            break
+        data.extend(page)
+        since = page[-1][0] + 1
+    return ohlcv_frame(data)
+
+# Function to turn raw OHLCV rows into the analysis DataFrame
+def ohlcv_frame(data):
     df = pd.DataFrame(data, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
     df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
     return df
 
-# Fetch trading pair data
-df = fetch_data(pair='BTC/USDT')
-
-# Calculate recent swing high and low
-swing_high = df['high'].max()
-swing_low = df['low'].min()
-
-# Fibonacci levels
-fib_levels = {
-    '0.0%': swing_high,
-    '23.6%': swing_high - 0.236 * (swing_high - swing_low),
-    '38.2%': swing_high - 0.382 * (swing_high - swing_low),
-    '50.0%': swing_high - 0.5 * (swing_high - swing_low),
-    '61.8%': swing_high - 0.618 * (swing_high - swing_low),
-    '100%': swing_low
-}
-
-# Define premium and discount zones
-premium_zone = fib_levels['50.0%'] + (swing_high - fib_levels['50.0%']) / 2
-discount_zone = fib_levels['50.0%'] - (fib_levels['50.0%'] - swing_low) / 2
-
-# Plotting price data with Fibonacci levels
-plt.figure(figsize=(12, 6))
-plt.plot(df['timestamp'], df['close'], label='Close Price', color='black')
-for level, price in fib_levels.items():
-    plt.hlines(price, df['timestamp'].min(), df['timestamp'].max(), label=level, linestyles='dashed')
-
-# Highlight premium and discount zones
-plt.axhline(premium_zone, color='red', linestyle='--', label='Premium Zone')
-plt.axhline(discount_zone, color='green', linestyle='--', label='Discount Zone')
-
-plt.title('Trading Pair Fibonacci Retracement Levels')
-plt.xlabel('Timestamp')
-plt.ylabel('Price')
-plt.legend()
-plt.show()
-
-# Identifying potential trade entries
-latest_price = df['close'].iloc[-1]
-signal = ""
-if latest_price >= premium_zone:
-    signal = 'SELL'
-    print('Potential SELL signal: Price is in the premium zone.')
-elif latest_price <= discount_zone:
-    signal = 'BUY'
-    print('Potential BUY signal: Price is in the discount zone.')
-else:
-    print('No clear trading signal. Wait for better entry.')
-
-# Save trade logs
-log_entry = {
-    'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-    'latest_price': latest_price,
-    'signal': signal
-}
-
-# Ensure existing log file handling
-try:
-    log_df = pd.read_csv('trade_logs.csv')
-    log_df = log_df.append(log_entry, ignore_index=True)
-except FileNotFoundError:
-    log_df = pd.DataFrame([log_entry])
+# Analyze the live window: plot the levels, print the signal and log it
+def live_signal(pair='BTC/USDT', limit=100):
+    # Fetch trading pair data
+    df = fetch_data(pair=pair, limit=limit)
+
+    # Calculate recent swing high and low
+    swing_high = df['high'].max()
+    swing_low = df['low'].min()
+
+    # Fibonacci levels
+    fib_levels = {
+        '0.0%': swing_high,
+        '23.6%': swing_high - 0.236 * (swing_high - swing_low),
+        '38.2%': swing_high - 0.382 * (swing_high - swing_low),
+        '50.0%': swing_high - 0.5 * (swing_high - swing_low),
+        '61.8%': swing_high - 0.618 * (swing_high - swing_low),
+        '100%': swing_low
+    }
+
+    # Define premium and discount zones
+    premium_zone = fib_levels['50.0%'] + (swing_high - fib_levels['50.0%']) / 2
+    discount_zone = fib_levels['50.0%'] - (fib_levels['50.0%'] - swing_low) / 2
+
+    # Plotting price data with Fibonacci levels
+    plt.figure(figsize=(12, 6))
+    plt.plot(df['timestamp'], df['close'], label='Close Price', color='black')
+    for level, price in fib_levels.items():
+        plt.hlines(price, df['timestamp'].min(), df['timestamp'].max(), label=level, linestyles='dashed')
+
+    # Highlight premium and discount zones
+    plt.axhline(premium_zone, color='red', linestyle='--', label='Premium Zone')
+    plt.axhline(discount_zone, color='green', linestyle='--', label='Discount Zone')
+
+    plt.title('Trading Pair Fibonacci Retracement Levels')
+    plt.xlabel('Timestamp')
+    plt.ylabel('Price')
+    plt.legend()
+    plt.show()
+
+    # Identifying potential trade entries
+    latest_price = df['close'].iloc[-1]
+    signal = ""
+    if latest_price >= premium_zone:
+        signal = 'SELL'
+        print('Potential SELL signal: Price is in the premium zone.')
+    elif latest_price <= discount_zone:
+        signal = 'BUY'
+        print('Potential BUY signal: Price is in the discount zone.')
+    else:
+        print('No clear trading signal. Wait for better entry.')
+
+    # Save trade logs
+    log_entry = {
+        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'latest_price': latest_price,
+        'signal': signal
+    }
+
+    # Ensure existing log file handling
+    try:
+        log_df = pd.read_csv('trade_logs.csv')
+        log_df = pd.concat([log_df, pd.DataFrame([log_entry])], ignore_index=True)
+    except FileNotFoundError:
+        log_df = pd.DataFrame([log_entry])
+
+    log_df.to_csv('trade_logs.csv', index=False)
+
+    print('Trade log saved.')
 
-log_df.to_csv('trade_logs.csv', index=False)
+# Backtest the same premium/discount rules bar by bar over years of history, using the
+# live window length for the swing high/low
+def backtest(pair='BTC/USDT', years=3, lookback=100):
+    history = fetch_history(pair=pair, years=years)
+    print(f"Backtesting {len(history)} bars from {history['timestamp'].iloc[0]} to {history['timestamp'].iloc[-1]}")
+    print_report(run_backtest(history, lookback=lookback))
 
-# Backtesting placeholder (logic to be expanded later)
-# Here, you could implement backtesting using historical data to validate the strategy.
-print('Trade log saved. Backtesting feature to be implemented.')
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Fibonacci premium/discount signal for a trading pair")
+    parser.add_argument('--pair', default='BTC/USDT')
+    parser.add_argument('--backtest', action='store_true', help="Backtest the rules instead of analyzing the live window")
+    parser.add_argument('--years', type=float, default=3, help="Years of history to backtest")
+    parser.add_argument('--lookback', type=int, default=100, help="Bars in the swing high/low window")
+    args = parser.parse_args()
+    if args.backtest:
+        backtest(args.pair, args.years, args.lookback)
+    else:
+        live_signal(args.pair, args.lookback)
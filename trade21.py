@@ -1,34 +1,19 @@
+import asyncio
 import tkinter as tk
 from tkinter import messagebox
 import pandas as pd
 import numpy as np
 import time
 import threading
-import websocket
-import json
+from candle_store import get_store
+from deriv_client import get_client, latest_tick_quote, latest_tick_request
+from resample import derive_timeframes
 
 
-# Function to fetch historical data using WebSocket
+# Function to fetch historical data using WebSocket; only candles newer than the local cache are requested
 def fetch_data(symbol, timeframe, count=200):
-    data = []
     try:
-        ws = websocket.create_connection("wss://ws.derivws.com/websockets/v3?app_id=1089")
-        request = {
-            "ticks_history": symbol,
-            "adjust_start_time": 1,
-            "count": count,
-            "end": "latest",
-            "granularity": int(timeframe),
-            "style": "candles"
-        }
-        ws.send(json.dumps(request))
-        response = json.loads(ws.recv())
-        ws.close()
-        if 'candles' in response:
-            candles = response['candles']
-            df = pd.DataFrame(candles)
-            if all(col in df.columns for col in ['open', 'close', 'high', 'low']):
-                return df
+        return get_store().fetch(get_client(), symbol, int(timeframe), count)
     except Exception as e:
         print(f"Error fetching data for {symbol} on timeframe {timeframe}: {e}")
     return None
@@ -37,18 +22,50 @@ def fetch_data(symbol, timeframe, count=200):
 # Function to fetch the latest price
 def fetch_latest_price(symbol):
     try:
-        ws = websocket.create_connection("wss://ws.derivws.com/websockets/v3?app_id=1089")
-        request = {"ticks": symbol}
-        ws.send(json.dumps(request))
-        response = json.loads(ws.recv())
-        ws.close()
-        if 'tick' in response:
-            return response['tick']['quote']
+        response = get_client().request(latest_tick_request(symbol))
+        if 'history' in response:
+            return latest_tick_quote(response)
     except Exception as e:
         print(f"Error fetching latest price for {symbol}: {e}")
     return None
 
 
+# Fetch one 5m series per symbol in a single pipelined batch and derive every timeframe and the latest price from it
+def fetch_market_batch(symbols, timeframes, count=200):
+    store = get_store()
+    symbols = list(symbols)
+    base_count = base_candle_count(timeframes, count)
+    requests = [store.request_for(symbol, BASE_GRANULARITY, base_count) for symbol in symbols]
+
+    prices, candles = {}, {}
+    try:
+        responses = get_client().request_many(requests)
+    except Exception as e:
+        print(f"Error fetching market batch: {e}")
+        return prices, candles
+
+    for symbol, response in zip(symbols, responses):
+        if 'error' in response:
+            print(f"Error fetching {symbol}: {response['error'].get('message')}")
+        base = store.update(symbol, BASE_GRANULARITY, response, base_count)
+        prices[symbol], derived = split_base_series(base, timeframes, count)
+        for tf, data in derived.items():
+            candles[(symbol, tf)] = data
+    return prices, candles
+
+
+# Enough base candles to fill ``count`` candles of the longest timeframe
+def base_candle_count(timeframes, count=200):
+    return count * max(int(tf) for tf in timeframes) // BASE_GRANULARITY
+
+
+# The latest price is the close of the still-open base candle
+def split_base_series(base, timeframes, count=200):
+    if base is None or base.empty:
+        return None, {}
+    return float(base['close'].iloc[-1]), derive_timeframes(base, timeframes, count)
+
+
 # RSI Calculation
 def calculate_rsi(data, period=14):
     delta = data['close'].diff()
@@ -82,65 +99,117 @@ def support_resistance_levels(data):
     return support, resistance
 
 
+# Symbols and timeframes covered by each analysis cycle
+SYMBOLS = {
+    'Gold': 'frxXAUUSD',
+    'USOIL': 'frxUSOIL',
+    'EURUSD': 'frxEURUSD',
+    'USDJPY': 'frxUSDJPY',
+    'GBPUSD': 'frxGBPUSD',
+    'V10 (1s)': '1HZ10V', 'V10': 'R_10',
+    'V25 (1s)': '1HZ25V', 'V25': 'R_25',
+    'V50 (1s)': '1HZ50V', 'V50': 'R_50',
+    'V75 (1s)': '1HZ75V', 'V75': 'R_75',
+    'V100 (1s)': '1HZ100V', 'V100': 'R_100',
+    'Step 100': 'stpRNG', 'Step 200': 'stpRNG2',
+    'Step 300': 'stpRNG3', 'Step 400': 'stpRNG4',
+    'Step 500': 'stpRNG5'
+}
+TIMEFRAMES = {'1h': '3600', '30m': '1800', '15m': '900', '5m': '300'}
+
+# Only 5m candles are fetched; the longer timeframes are resampled from them
+BASE_GRANULARITY = 300
+
+# Maximum number of Deriv requests in flight during an async analysis cycle
+MAX_CONCURRENT_REQUESTS = 20
+
+
+# Evaluate the combined ICT strategy on one candle set
+def evaluate_signal(symbol, data, current_price):
+    data['rsi'] = calculate_rsi(data)
+    fib_levels = fibonacci_levels(data)
+    support, resistance = support_resistance_levels(data)
+    rsi_value = data['rsi'].iloc[-1]
+
+    if rsi_value < 30 and current_price <= fib_levels['0.618'] and current_price > support:
+        signal = 'Buy'
+        entry_price = current_price
+        risk = abs(entry_price - support)
+        take_profit = entry_price + (2 * risk)
+        stop_loss = support
+    elif rsi_value > 70 and current_price >= fib_levels['0.618'] and current_price < resistance:
+        signal = 'Sell'
+        entry_price = current_price
+        risk = abs(entry_price - resistance)
+        take_profit = entry_price - (2 * risk)
+        stop_loss = resistance
+    else:
+        return None  # No clear Buy or Sell signal
+
+    decimal_places = 5 if symbol in ['frxEURUSD', 'frxGBPUSD', 'frxUSDJPY'] else 2
+    return {
+        'signal': signal,
+        'entry_price': round(float(entry_price), decimal_places),
+        'take_profit': round(float(take_profit), decimal_places),
+        'stop_loss': round(float(stop_loss), decimal_places),
+    }
+
+
 # Analyze market with combined ICT strategy
 def analyze_market():
-    symbols = {
-        'Gold': 'frxXAUUSD',
-        'USOIL': 'frxUSOIL',
-        'EURUSD': 'frxEURUSD',
-        'USDJPY': 'frxUSDJPY',
-        'GBPUSD': 'frxGBPUSD',
-        'V10 (1s)': '1HZ10V', 'V10': 'R_10',
-        'V25 (1s)': '1HZ25V', 'V25': 'R_25',
-        'V50 (1s)': '1HZ50V', 'V50': 'R_50',
-        'V75 (1s)': '1HZ75V', 'V75': 'R_75',
-        'V100 (1s)': '1HZ100V', 'V100': 'R_100',
-        'Step 100': 'stpRNG', 'Step 200': 'stpRNG2',
-        'Step 300': 'stpRNG3', 'Step 400': 'stpRNG4',
-        'Step 500': 'stpRNG5'
-    }
-    timeframes = {'1h': '3600', '30m': '1800', '15m': '900', '5m': '300'}
     signals = {}
+    prices, candles = fetch_market_batch(SYMBOLS.values(), TIMEFRAMES.values())
 
-    for name, symbol in symbols.items():
-        latest_price = fetch_latest_price(symbol)
-        for tf_label, tf in timeframes.items():
-            data = fetch_data(symbol, tf)
+    for name, symbol in SYMBOLS.items():
+        latest_price = prices.get(symbol)
+        for tf_label, tf in TIMEFRAMES.items():
+            data = candles.get((symbol, tf))
             if data is not None and latest_price:
-                data['rsi'] = calculate_rsi(data)
-                fib_levels = fibonacci_levels(data)
-                support, resistance = support_resistance_levels(data)
-                current_price = float(latest_price)
-                rsi_value = data['rsi'].iloc[-1]
-
-                if rsi_value < 30 and current_price <= fib_levels['0.618'] and current_price > support:
-                    signal = 'Buy'
-                    entry_price = current_price
-                    risk = abs(entry_price - support)
-                    take_profit = entry_price + (2 * risk)
-                    stop_loss = support
-                elif rsi_value > 70 and current_price >= fib_levels['0.618'] and current_price < resistance:
-                    signal = 'Sell'
-                    entry_price = current_price
-                    risk = abs(entry_price - resistance)
-                    take_profit = entry_price - (2 * risk)
-                    stop_loss = resistance
-                else:
-                    continue  # Skip if there's no clear Buy or Sell signal
-
-                decimal_places = 5 if symbol in ['frxEURUSD', 'frxGBPUSD', 'frxUSDJPY'] else 2
-                signals[f"{name} - {tf_label}"] = {
-                    'signal': signal,
-                    'entry_price': round(float(entry_price), decimal_places),
-                    'take_profit': round(float(take_profit), decimal_places),
-                    'stop_loss': round(float(stop_loss), decimal_places),
-                }
+                details = evaluate_signal(symbol, data, float(latest_price))
+                if details:
+                    signals[f"{name} - {tf_label}"] = details
+    return signals if signals else {'No Clear Trading Signal': 'No valid Buy or Sell signals found.'}
+
+
+# Send one request on the shared client without holding more than the allowed number in flight
+async def fetch_async(request, semaphore):
+    async with semaphore:
+        return await get_client().request_async(request)
+
+
+async def analyze_symbol_async(name, symbol, semaphore):
+    store = get_store()
+    base_count = base_candle_count(TIMEFRAMES.values())
+    try:
+        response = await fetch_async(store.request_for(symbol, BASE_GRANULARITY, base_count), semaphore)
+        base = store.update(symbol, BASE_GRANULARITY, response, base_count)
+    except Exception as e:
+        print(f"Error fetching data for {symbol}: {e}")
+        return []
+    latest_price, derived = split_base_series(base, TIMEFRAMES.values())
+    results = []
+    for tf_label, tf in TIMEFRAMES.items():
+        data = derived.get(tf)
+        if data is not None and latest_price:
+            details = evaluate_signal(symbol, data, latest_price)
+            if details:
+                results.append((f"{name} - {tf_label}", details))
+    return results
+
+
+# Analyze every symbol concurrently, one request each; returns the same signals dict as analyze_market
+async def analyze_market_async(concurrency=MAX_CONCURRENT_REQUESTS):
+    semaphore = asyncio.Semaphore(concurrency)
+    results = await asyncio.gather(*(
+        analyze_symbol_async(name, symbol, semaphore) for name, symbol in SYMBOLS.items()
+    ))
+    signals = dict(result for symbol_results in results for result in symbol_results)
     return signals if signals else {'No Clear Trading Signal': 'No valid Buy or Sell signals found.'}
 
 
 # GUI using Tkinter
 def update_signals():
-    signals = analyze_market()
+    signals = asyncio.run(analyze_market_async())
     output = ""
     last_update = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime())
     for pair, details in signals.items():
@@ -169,30 +238,31 @@ def scheduled_updates():
         time.sleep(300)  # Update every 5 minutes
 
 
-# Main Tkinter window
-app = tk.Tk()
-app.title("RELAX OO ")
-app.geometry("700x500")
+if __name__ == "__main__":
+    # Main Tkinter window
+    app = tk.Tk()
+    app.title("RELAX OO ")
+    app.geometry("700x500")
 
-label = tk.Label(app, text="HOW FAR", font=("Helvetica", 16))
-label.pack(pady=10)
+    label = tk.Label(app, text="HOW FAR", font=("Helvetica", 16))
+    label.pack(pady=10)
 
-# Frame for scrollbar
-frame = tk.Frame(app)
-frame.pack(pady=10, padx=10, fill=tk.BOTH, expand=True)
+    # Frame for scrollbar
+    frame = tk.Frame(app)
+    frame.pack(pady=10, padx=10, fill=tk.BOTH, expand=True)
 
-# Scrollbar
-scrollbar = tk.Scrollbar(frame)
-scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+    # Scrollbar
+    scrollbar = tk.Scrollbar(frame)
+    scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
-# Text widget
-signal_display = tk.Text(frame, font=("Helvetica", 10), wrap=tk.WORD, yscrollcommand=scrollbar.set)
-signal_display.pack(fill=tk.BOTH, expand=True)
-signal_display.config(state=tk.DISABLED)
+    # Text widget
+    signal_display = tk.Text(frame, font=("Helvetica", 10), wrap=tk.WORD, yscrollcommand=scrollbar.set)
+    signal_display.pack(fill=tk.BOTH, expand=True)
+    signal_display.config(state=tk.DISABLED)
 
-scrollbar.config(command=signal_display.yview)
+    scrollbar.config(command=signal_display.yview)
 
-# Run scheduled updates in a separate thread
-threading.Thread(target=scheduled_updates, daemon=True).start()
+    # Run scheduled updates in a separate thread
+    threading.Thread(target=scheduled_updates, daemon=True).start()
 
-app.mainloop()
+    app.mainloop()
@@ -6,10 +6,15 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import websocket  # For live data
 import json
 import threading
+from deriv_client import DERIV_API_URL
+from frame_recorder import recorder_from_env
+from rate_limiter import PRIORITY_LIVE, get_scheduler
+from ring_buffer import RingBuffer
 
 # Constants
 SYMBOL = "stpRNG"  # Step 100 Index on Deriv
-WS_URL = "wss://ws.derivws.com/websockets/v3?app_id=1089"
+WS_URL = DERIV_API_URL
+PRICE_WINDOW = 100  # Ticks kept for analysis; appends cost the same at 100k
 
 
 # Main Trading App Class
@@ -21,7 +26,7 @@ class TradingApp:
         self.root.configure(bg='#1e1e1e')
 
         # Price data for indicators
-        self.prices = []
+        self.prices = RingBuffer(PRICE_WINDOW)
 
         # UI Components
         self.signal_label = tk.Label(root, text="Signal: Analyzing...", font=("Helvetica", 14), fg="white",
@@ -36,30 +41,32 @@ class TradingApp:
         # Start WebSocket connection in a separate thread
         threading.Thread(target=self.start_websocket, daemon=True).start()
 
+    def on_message(self, ws, message):
+        data = json.loads(message)
+        if 'tick' in data:
+            price = float(data['tick']['quote'])
+            self.prices.append(price)
+            self.perform_analysis()
+
+    def on_error(self, ws, error):
+        messagebox.showerror("WebSocket Error", f"{error}")
+
+    def on_close(self, ws, close_status_code, close_msg):
+        print("WebSocket closed")
+
+    def on_open(self, ws):
+        subscribe_message = json.dumps({
+            "ticks": SYMBOL
+        })
+        get_scheduler('deriv').acquire(PRIORITY_LIVE)
+        ws.send(subscribe_message)
+
     def start_websocket(self):
-        def on_message(ws, message):
-            data = json.loads(message)
-            if 'tick' in data:
-                price = float(data['tick']['quote'])
-                self.prices.append(price)
-                if len(self.prices) > 100:
-                    self.prices.pop(0)
-                self.perform_analysis()
-
-        def on_error(ws, error):
-            messagebox.showerror("WebSocket Error", f"{error}")
-
-        def on_close(ws, close_status_code, close_msg):
-            print("WebSocket closed")
-
-        def on_open(ws):
-            subscribe_message = json.dumps({
-                "ticks": SYMBOL
-            })
-            ws.send(subscribe_message)
-
-        ws = websocket.WebSocketApp(WS_URL, on_message=on_message, on_error=on_error, on_close=on_close,
-                                    on_open=on_open)
+        # Set RECORD_FRAMES to a directory to capture the feed for frame_recorder.replay()
+        recorder = recorder_from_env('trade3')
+        on_message = recorder.wrap(self.on_message) if recorder else self.on_message
+        ws = websocket.WebSocketApp(WS_URL, on_message=on_message, on_error=self.on_error, on_close=self.on_close,
+                                    on_open=self.on_open)
         ws.run_forever()
 
     def perform_analysis(self):
@@ -68,7 +75,7 @@ class TradingApp:
 
         # Calculate simple moving average
         sma = np.mean(self.prices[-10:])
-        entry_price = round(self.prices[-1], 2)
+        entry_price = round(float(self.prices[-1]), 2)
         take_profit = round(entry_price + 1.5, 2)  # Example TP
         stop_loss = round(entry_price - 1.5, 2)  # Example SL
 
@@ -82,7 +89,8 @@ class TradingApp:
 
     def update_chart(self, entry_price, take_profit, stop_loss):
         self.ax.clear()
-        self.ax.plot(self.prices, color='cyan', label='Step 100 Index Price')
+        # Copy: the chart may hold on to its data for redraws, and the next tick overwrites the view
+        self.ax.plot(self.prices.view().copy(), color='cyan', label='Step 100 Index Price')
         self.ax.axhline(entry_price, color='green', linestyle='--', label=f'Entry: ${entry_price}')
         self.ax.axhline(take_profit, color='blue', linestyle='--', label=f'TP: ${take_profit}')
         self.ax.axhline(stop_loss, color='red', linestyle='--', label=f'SL: ${stop_loss}')
@@ -4,31 +4,14 @@ import pandas as pd
 import numpy as np
 import time
 import threading
-import websocket
-import json
+from candle_store import get_store
+from deriv_client import get_client
 
 # Function to fetch historical data using WebSocket
 
 def fetch_data(symbol, timeframe, count=200):
-    data = []
     try:
-        ws = websocket.create_connection("wss://ws.derivws.com/websockets/v3?app_id=1089")
-        request = {
-            "ticks_history": symbol,
-            "adjust_start_time": 1,
-            "count": count,
-            "end": "latest",
-            "granularity": int(timeframe),
-            "style": "candles"
-        }
-        ws.send(json.dumps(request))
-        response = json.loads(ws.recv())
-        ws.close()
-        if 'candles' in response:
-            candles = response['candles']
-            df = pd.DataFrame(candles)
-            if all(col in df.columns for col in ['open', 'close', 'high', 'low']):
-                return df
+        return get_store().fetch(get_client(), symbol, int(timeframe), count)
     except Exception as e:
         print(f"Error fetching data for {symbol} on timeframe {timeframe}: {e}")
     return None
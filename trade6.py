@@ -4,30 +4,13 @@ import pandas as pd
 import numpy as np
 import time
 import threading
-import websocket
-import json
+from candle_store import get_store
+from deriv_client import get_client, latest_tick_quote, latest_tick_request
 
 # Function to fetch historical data using WebSocket
 def fetch_data(symbol, timeframe, count=200):
-    data = []
     try:
-        ws = websocket.create_connection("wss://ws.derivws.com/websockets/v3?app_id=1089")
-        request = {
-            "ticks_history": symbol,
-            "adjust_start_time": 1,
-            "count": count,
-            "end": "latest",
-            "granularity": int(timeframe),
-            "style": "candles"
-        }
-        ws.send(json.dumps(request))
-        response = json.loads(ws.recv())
-        ws.close()
-        if 'candles' in response:
-            candles = response['candles']
-            df = pd.DataFrame(candles)
-            if all(col in df.columns for col in ['open', 'close', 'high', 'low']):
-                return df
+        return get_store().fetch(get_client(), symbol, int(timeframe), count)
     except Exception as e:
         print(f"Error fetching data for {symbol} on timeframe {timeframe}: {e}")
     return None
@@ -35,13 +18,9 @@ def fetch_data(symbol, timeframe, count=200):
 # Function to fetch the latest price
 def fetch_latest_price(symbol):
     try:
-        ws = websocket.create_connection("wss://ws.derivws.com/websockets/v3?app_id=1089")
-        request = {"ticks": symbol}
-        ws.send(json.dumps(request))
-        response = json.loads(ws.recv())
-        ws.close()
-        if 'tick' in response:
-            return response['tick']['quote']
+        response = get_client().request(latest_tick_request(symbol))
+        if 'history' in response:
+            return latest_tick_quote(response)
     except Exception as e:
         print(f"Error fetching latest price for {symbol}: {e}")
     return None
@@ -2,61 +2,78 @@ import tkinter as tk
 from tkinter import messagebox
 import numpy as np
 import websocket  # For live data
+import functools
 import json
 import threading
 import time
+from deriv_client import DERIV_API_URL
+from frame_recorder import recorder_from_env
+from rate_limiter import PRIORITY_LIVE, get_scheduler
+from ring_buffer import RingBuffer
 
 # Constants
 SYMBOLS = ["1HZ100V"]  # VOLATILITY 100(1S) INDEX
-WS_URL = "wss://ws.derivws.com/websockets/v3?app_id=1089"
+WS_URL = DERIV_API_URL
+PRICE_WINDOW = 100  # Ticks kept per symbol; appends cost the same at 100k
 
 
 # Main Trading App Class
 class TradingApp:
-    def __init__(self, root):
+    def __init__(self, root, symbols=SYMBOLS):
+        # Price data for indicators
+        self.prices = {symbol: RingBuffer(PRICE_WINDOW) for symbol in symbols}
+        self.last_signal_time = {symbol: 0 for symbol in symbols}  # Track last signal time
+        self.signals = {symbol: None for symbol in symbols}  # Latest entry details, None when there is none
+
+        # Without a root the app runs headless (no window, no streams); feed it with on_message()
         self.root = root
+        self.signal_label = None
+        if root is None:
+            return
+
         self.root.title("Volatility 100(1S) Index Trading Signals")
         self.root.geometry("800x400")
         self.root.configure(bg='#1e1e1e')
 
-        # Price data for indicators
-        self.prices = {symbol: [] for symbol in SYMBOLS}
-        self.last_signal_time = {symbol: 0 for symbol in SYMBOLS}  # Track last signal time
-
         # UI Components
         self.signal_label = tk.Label(root, text="Signal: Analyzing...", font=("Helvetica", 14), fg="white",
                                      bg='#1e1e1e')
         self.signal_label.pack(pady=10)
 
         # Start WebSocket connection in a separate thread
-        for symbol in SYMBOLS:
+        for symbol in symbols:
             threading.Thread(target=self.start_websocket, args=(symbol,), daemon=True).start()
 
+    def on_message(self, symbol, ws, message):
+        data = json.loads(message)
+        if 'tick' in data:
+            price = float(data['tick']['quote'])
+            self.prices[symbol].append(price)
+            self.perform_ict_analysis(symbol, data['tick'].get('epoch'))
+
+    def on_error(self, ws, error):
+        messagebox.showerror("WebSocket Error", f"{error}")
+
+    def on_close(self, symbol, ws, close_status_code, close_msg):
+        print(f"WebSocket closed for {symbol}")
+
+    def on_open(self, symbol, ws):
+        subscribe_message = json.dumps({
+            "ticks": symbol,
+            "subscribe": 1
+        })
+        get_scheduler('deriv').acquire(PRIORITY_LIVE)
+        ws.send(subscribe_message)
+
     def start_websocket(self, symbol):
-        def on_message(ws, message):
-            data = json.loads(message)
-            if 'tick' in data:
-                price = float(data['tick']['quote'])
-                self.prices[symbol].append(price)
-                if len(self.prices[symbol]) > 100:
-                    self.prices[symbol].pop(0)
-                self.perform_ict_analysis(symbol)
-
-        def on_error(ws, error):
-            messagebox.showerror("WebSocket Error", f"{error}")
-
-        def on_close(ws, close_status_code, close_msg):
-            print(f"WebSocket closed for {symbol}")
-
-        def on_open(ws):
-            subscribe_message = json.dumps({
-                "ticks": symbol,
-                "subscribe": 1
-            })
-            ws.send(subscribe_message)
-
-        ws = websocket.WebSocketApp(WS_URL, on_message=on_message, on_error=on_error, on_close=on_close,
-                                    on_open=on_open)
+        # Set RECORD_FRAMES to a directory to capture the feed for frame_recorder.replay()
+        recorder = recorder_from_env(f"tradeictfibrsi_{symbol}")
+        on_message = functools.partial(self.on_message, symbol)
+        if recorder:
+            on_message = recorder.wrap(on_message)
+        ws = websocket.WebSocketApp(WS_URL, on_message=on_message, on_error=self.on_error,
+                                    on_close=functools.partial(self.on_close, symbol),
+                                    on_open=functools.partial(self.on_open, symbol))
         ws.run_forever()
 
     def detect_fvg(self, prices):
@@ -75,12 +92,15 @@ class TradingApp:
     def detect_liquidity_grab(self, prices):
         if len(prices) < 10:
             return False
-        highs = [max(prices[i:i + 3]) for i in range(-10, -3)]
-        return prices[-1] > max(highs)
+        # Same as the max of the 3-tick highs over the previous nine ticks
+        return prices[-1] > prices[-10:-1].max()
 
-    def perform_ict_analysis(self, symbol):
-        prices = self.prices[symbol]
-        current_time = time.time()
+    def perform_ict_analysis(self, symbol, current_time=None):
+        # A view, valid until the next append; ticks for a symbol are appended and analysed on
+        # its own WebSocket thread, so none can land while this analysis runs
+        prices = self.prices[symbol].view()
+        if current_time is None:
+            current_time = time.time()
 
         # Only update signal every 60 seconds
         if current_time - self.last_signal_time[symbol] < 60:
@@ -91,21 +111,30 @@ class TradingApp:
         if len(prices) < 10:
             return  # Not enough data for analysis
 
-        entry_price = round(prices[-1], 2)
+        entry_price = round(float(prices[-1]), 2)
         take_profit = round(entry_price + 2.0, 2)  # Example TP
         stop_loss = round(entry_price - 2.0, 2)  # Example SL
 
         # ICT Strategy-Based Signals
+        details = None
         if self.detect_fvg(prices):
             signal = f"{symbol}: BUY (Fair Value Gap) - Entry: {entry_price}, TP: {take_profit}, SL: {stop_loss}"
+            details = {'signal': 'Buy', 'entry_price': entry_price, 'take_profit': take_profit,
+                       'stop_loss': stop_loss}
         elif self.detect_order_block(prices):
             signal = f"{symbol}: SELL (Order Block) - Entry: {entry_price}, TP: {stop_loss}, SL: {take_profit}"
+            details = {'signal': 'Sell', 'entry_price': entry_price, 'take_profit': stop_loss,
+                       'stop_loss': take_profit}
         elif self.detect_liquidity_grab(prices):
             signal = f"{symbol}: BUY (Liquidity Grab) - Entry: {entry_price}, TP: {take_profit}, SL: {stop_loss}"
+            details = {'signal': 'Buy', 'entry_price': entry_price, 'take_profit': take_profit,
+                       'stop_loss': stop_loss}
         else:
             signal = f"{symbol}: No clear entry"
 
-        self.signal_label.config(text=signal)
+        self.signals[symbol] = details
+        if self.signal_label is not None:
+            self.signal_label.config(text=signal)
 
 
 if __name__ == "__main__":
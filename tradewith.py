@@ -1,33 +1,18 @@
+import asyncio
 import tkinter as tk
 from tkinter import messagebox
-import pandas as pd
 import numpy as np
 import time
 import threading
-import websocket
-import json
+from candle_store import get_store
+from deriv_client import get_client, latest_tick_quote, latest_tick_request
+import indicators
+from strategy_rules import SIGNAL_BUY, get_strategy, market_variables
 
-# Function to fetch historical data using WebSocket
+# Function to fetch historical data using WebSocket; only candles newer than the local cache are requested
 def fetch_data(symbol, timeframe, count=200):
-    data = []
     try:
-        ws = websocket.create_connection("wss://ws.derivws.com/websockets/v3?app_id=1089")
-        request = {
-            "ticks_history": symbol,
-            "adjust_start_time": 1,
-            "count": count,
-            "end": "latest",
-            "granularity": int(timeframe),
-            "style": "candles"
-        }
-        ws.send(json.dumps(request))
-        response = json.loads(ws.recv())
-        ws.close()
-        if 'candles' in response:
-            candles = response['candles']
-            df = pd.DataFrame(candles)
-            if all(col in df.columns for col in ['open', 'close', 'high', 'low']):
-                return df
+        return get_store().fetch(get_client(), symbol, int(timeframe), count)
     except Exception as e:
         print(f"Error fetching data for {symbol} on timeframe {timeframe}: {e}")
     return None
@@ -35,115 +20,144 @@ def fetch_data(symbol, timeframe, count=200):
 # Function to fetch the latest price
 def fetch_latest_price(symbol):
     try:
-        ws = websocket.create_connection("wss://ws.derivws.com/websockets/v3?app_id=1089")
-        request = {"ticks": symbol}
-        ws.send(json.dumps(request))
-        response = json.loads(ws.recv())
-        ws.close()
-        if 'tick' in response:
-            return response['tick']['quote']
+        response = get_client().request(latest_tick_request(symbol))
+        if 'history' in response:
+            return latest_tick_quote(response)
     except Exception as e:
         print(f"Error fetching latest price for {symbol}: {e}")
     return None
 
-# RSI Calculation
-def calculate_rsi(data, period=14):
-    delta = data['close'].diff()
-    gain = np.where(delta > 0, delta, 0)
-    loss = np.where(delta < 0, -delta, 0)
-    avg_gain = pd.Series(gain).rolling(window=period).mean()
-    avg_loss = pd.Series(loss).rolling(window=period).mean()
-    rs = avg_gain / avg_loss
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
-
-# Fibonacci Retracement Levels
-def fibonacci_levels(data):
-    swing_high = data['high'].max()
-    swing_low = data['low'].min()
-    levels = {
-        '0.236': swing_high - 0.236 * (swing_high - swing_low),
-        '0.382': swing_high - 0.382 * (swing_high - swing_low),
-        '0.5': swing_high - 0.5 * (swing_high - swing_low),
-        '0.618': swing_high - 0.618 * (swing_high - swing_low),
-        '0.786': swing_high - 0.786 * (swing_high - swing_low)
+# Fetch latest prices and candles for every symbol and timeframe in one pipelined batch
+def fetch_market_batch(symbols, timeframes, count=200):
+    store = get_store()
+    keys, requests = [], []
+    for symbol in symbols:
+        keys.append((symbol, None))
+        requests.append(latest_tick_request(symbol))
+        for tf in timeframes:
+            keys.append((symbol, tf))
+            requests.append(store.request_for(symbol, int(tf), count))
+
+    prices, candles = {}, {}
+    try:
+        responses = get_client().request_many(requests)
+    except Exception as e:
+        print(f"Error fetching market batch: {e}")
+        return prices, candles
+
+    for (symbol, tf), response in zip(keys, responses):
+        if 'error' in response:
+            print(f"Error fetching {symbol} {tf or 'latest price'}: {response['error'].get('message')}")
+        if tf is None:
+            prices[symbol] = latest_tick_quote(response) if 'history' in response else None
+        else:
+            candles[(symbol, tf)] = store.update(symbol, int(tf), response, count)
+    return prices, candles
+
+# Symbols and timeframes covered by each analysis cycle
+SYMBOLS = {
+    'Gold': 'frxXAUUSD',
+    'USOIL': 'frxUSOIL',
+    'EURUSD': 'frxEURUSD',
+    'USDJPY': 'frxUSDJPY',
+    'GBPUSD': 'frxGBPUSD',
+    'BTCUSD': 'frxBTCUSD',
+    'V10 (1s)': '1HZ10V', 'V10': 'R_10',
+    'V25 (1s)': '1HZ25V', 'V25': 'R_25',
+    'V50 (1s)': '1HZ50V', 'V50': 'R_50',
+    'V75 (1s)': '1HZ75V', 'V75': 'R_75',
+    'V100 (1s)': '1HZ100V', 'V100': 'R_100',
+    'Step 100': 'stpRNG', 'Step 200': 'stpRNG2',
+    'Step 300': 'stpRNG3', 'Step 400': 'stpRNG4',
+    'Step 500': 'stpRNG5'
+}
+TIMEFRAMES = {'1h': '3600', '30m': '1800', '15m': '900', '5m': '300'}
+
+# Entry rules that evaluate_grid runs in both analyze_market and analyze_market_async
+STRATEGY = get_strategy('tradewith')
+
+# Maximum number of Deriv requests in flight during an async analysis cycle
+MAX_CONCURRENT_REQUESTS = 20
+
+def signal_details(symbol, signal, entry_price, take_profit, stop_loss):
+    decimal_places = 5 if symbol in ['frxEURUSD', 'frxGBPUSD', 'frxUSDJPY'] else 2
+    return {
+        'signal': signal,
+        'entry_price': round(float(entry_price), decimal_places),
+        'take_profit': round(float(take_profit), decimal_places),
+        'stop_loss': round(float(stop_loss), decimal_places),
     }
-    return levels
-
-# Support and Resistance Levels
-def support_resistance_levels(data):
-    support = data['low'].min()
-    resistance = data['high'].max()
-    return support, resistance
-
-# Liquidity Grab Detection
-def detect_liquidity_grab(data):
-    prev_high = data['high'].shift(1)
-    prev_low = data['low'].shift(1)
-    liquidity_grab_up = (data['high'] > prev_high) & (data['close'] < prev_high)
-    liquidity_grab_down = (data['low'] < prev_low) & (data['close'] > prev_low)
-    return liquidity_grab_up.iloc[-1], liquidity_grab_down.iloc[-1]
+
+# Evaluate a rule-based strategy (STRATEGY by default) on every (symbol, timeframe) series in one vectorized pass
+def evaluate_grid(candles, prices, strategy=None):
+    strategy = strategy or STRATEGY
+    keys, stacked = indicators.stack_candles(candles)
+    if not keys:
+        return {}
+    price = np.array([float(prices.get(symbol) or np.nan) for symbol, _ in keys])
+    result = strategy.evaluate(market_variables(stacked, price))
+
+    results = {}
+    for row in np.flatnonzero(result['signal']):
+        signal = 'Buy' if result['signal'][row] == SIGNAL_BUY else 'Sell'
+        results[keys[row]] = signal_details(keys[row][0], signal, result['entry_price'][row],
+                                            result['take_profit'][row], result['stop_loss'][row])
+    return results
+
+# Label evaluate_grid results with the display names, in SYMBOLS and TIMEFRAMES order
+def label_signals(results):
+    signals = {}
+    for name, symbol in SYMBOLS.items():
+        for tf_label, tf in TIMEFRAMES.items():
+            if (symbol, tf) in results:
+                signals[f"{name} - {tf_label}"] = results[(symbol, tf)]
+    return signals if signals else {'No Clear Trading Signal': 'No valid Buy or Sell signals found.'}
 
 # Analyze market with combined ICT strategy
 def analyze_market():
-    symbols = {
-        'Gold': 'frxXAUUSD',
-        'USOIL': 'frxUSOIL',
-        'EURUSD': 'frxEURUSD',
-        'USDJPY': 'frxUSDJPY',
-        'GBPUSD': 'frxGBPUSD',
-        'BTCUSD': 'frxBTCUSD',
-        'V10 (1s)': '1HZ10V', 'V10': 'R_10',
-        'V25 (1s)': '1HZ25V', 'V25': 'R_25',
-        'V50 (1s)': '1HZ50V', 'V50': 'R_50',
-        'V75 (1s)': '1HZ75V', 'V75': 'R_75',
-        'V100 (1s)': '1HZ100V', 'V100': 'R_100',
-        'Step 100': 'stpRNG', 'Step 200': 'stpRNG2',
-        'Step 300': 'stpRNG3', 'Step 400': 'stpRNG4',
-        'Step 500': 'stpRNG5'
-    }
-    timeframes = {'1h': '3600', '30m': '1800', '15m': '900', '5m': '300'}
-    signals = {}
+    prices, candles = fetch_market_batch(SYMBOLS.values(), TIMEFRAMES.values())
+    return label_signals(evaluate_grid(candles, prices))
 
-    for name, symbol in symbols.items():
-        latest_price = fetch_latest_price(symbol)
-        for tf_label, tf in timeframes.items():
-            data = fetch_data(symbol, tf)
-            if data is not None and latest_price:
-                data['rsi'] = calculate_rsi(data)
-                fib_levels = fibonacci_levels(data)
-                support, resistance = support_resistance_levels(data)
-                liquidity_grab_up, liquidity_grab_down = detect_liquidity_grab(data)
-                current_price = float(latest_price)
-                rsi_value = data['rsi'].iloc[-1]
-
-                if rsi_value < 30 and current_price <= fib_levels['0.618'] and current_price > support and liquidity_grab_down:
-                    signal = 'Buy'
-                    entry_price = current_price
-                    risk = abs(entry_price - support)
-                    take_profit = entry_price + (2 * risk)
-                    stop_loss = support
-                elif rsi_value > 70 and current_price >= fib_levels['0.618'] and current_price < resistance and liquidity_grab_up:
-                    signal = 'Sell'
-                    entry_price = current_price
-                    risk = abs(entry_price - resistance)
-                    take_profit = entry_price - (2 * risk)
-                    stop_loss = resistance
-                else:
-                    continue
-
-                decimal_places = 5 if symbol in ['frxEURUSD', 'frxGBPUSD', 'frxUSDJPY'] else 2
-                signals[f"{name} - {tf_label}"] = {
-                    'signal': signal,
-                    'entry_price': round(float(entry_price), decimal_places),
-                    'take_profit': round(float(take_profit), decimal_places),
-                    'stop_loss': round(float(stop_loss), decimal_places),
-                }
-    return signals if signals else {'No Clear Trading Signal': 'No valid Buy or Sell signals found.'}
+# Send one request on the shared client without holding more than the allowed number in flight
+async def fetch_async(request, semaphore):
+    async with semaphore:
+        return await get_client().request_async(request)
+
+async def fetch_latest_price_async(symbol, semaphore):
+    try:
+        response = await fetch_async(latest_tick_request(symbol), semaphore)
+        if 'history' in response:
+            return latest_tick_quote(response)
+    except Exception as e:
+        print(f"Error fetching latest price for {symbol}: {e}")
+    return None
+
+async def fetch_candles_async(symbol, tf, semaphore, count=200):
+    try:
+        store = get_store()
+        response = await fetch_async(store.request_for(symbol, int(tf), count), semaphore)
+        return store.update(symbol, int(tf), response, count)
+    except Exception as e:
+        print(f"Error fetching data for {symbol} on timeframe {tf}: {e}")
+    return None
+
+# Fetch every price and candle set concurrently, then score them all in one evaluate_grid pass;
+# returns the same signals dict as analyze_market
+async def analyze_market_async(concurrency=MAX_CONCURRENT_REQUESTS):
+    semaphore = asyncio.Semaphore(concurrency)
+    symbols = list(SYMBOLS.values())
+    pairs = [(symbol, tf) for symbol in symbols for tf in TIMEFRAMES.values()]
+    fetched = await asyncio.gather(
+        *(fetch_latest_price_async(symbol, semaphore) for symbol in symbols),
+        *(fetch_candles_async(symbol, tf, semaphore) for symbol, tf in pairs),
+    )
+    prices = dict(zip(symbols, fetched[:len(symbols)]))
+    candles = dict(zip(pairs, fetched[len(symbols):]))
+    return label_signals(evaluate_grid(candles, prices))
 
 # GUI using Tkinter
 def update_signals():
-    signals = analyze_market()
+    signals = asyncio.run(analyze_market_async())
     output = ""
     last_update = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime())
     for pair, details in signals.items():
@@ -164,17 +178,18 @@ def update_signals():
     signal_display.insert(tk.END, output)
     signal_display.config(state=tk.DISABLED)
 
-# Main Tkinter window
-app = tk.Tk()
-app.title("RELAX OO ")
-app.geometry("700x500")
+if __name__ == "__main__":
+    # Main Tkinter window
+    app = tk.Tk()
+    app.title("RELAX OO ")
+    app.geometry("700x500")
 
-label = tk.Label(app, text="VIX", font=("Helvetica", 16))
-label.pack(pady=10)
+    label = tk.Label(app, text="VIX", font=("Helvetica", 16))
+    label.pack(pady=10)
 
-signal_display = tk.Text(app, font=("Helvetica", 10), wrap=tk.WORD)
-signal_display.pack(fill=tk.BOTH, expand=True)
-signal_display.config(state=tk.DISABLED)
+    signal_display = tk.Text(app, font=("Helvetica", 10), wrap=tk.WORD)
+    signal_display.pack(fill=tk.BOTH, expand=True)
+    signal_display.config(state=tk.DISABLED)
 
-threading.Thread(target=update_signals, daemon=True).start()
-app.mainloop()
+    threading.Thread(target=update_signals, daemon=True).start()
+    app.mainloop()
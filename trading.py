@@ -7,12 +7,13 @@ import logging
 import datetime
 from PyQt6.QtWidgets import QApplication, QMainWindow, QLabel, QVBoxLayout, QWidget
 from PyQt6.QtCore import QTimer, QThread, pyqtSignal
+from deriv_client import DERIV_API_URL
+from rate_limiter import PRIORITY_LIVE, get_scheduler
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 # API Constants
-DERIV_API_URL = "wss://ws.derivws.com/websockets/v3?app_id=1089"
 API_KEY = os.getenv("DERIV_API_KEY")  # Secure API key handling
 SYMBOLS = ["frxXAUUSD", "frxEURUSD", "frxGBPUSD", "frxUSDJPY", "cryBTCUSD", "R_75", "R_50", "R_10", "R_100"]
 TIMEFRAMES = {"1H": 3600, "30M": 1800, "15M": 900, "5m": 300}  # Timeframes in seconds
@@ -55,6 +56,7 @@ class TradingBotGUI(QMainWindow):
 
     def on_open(self, ws):
         for symbol in SYMBOLS:
+            get_scheduler('deriv').acquire(PRIORITY_LIVE)
             ws.send(json.dumps({"ticks": symbol}))
 
     def on_message(self, ws, message):
@@ -0,0 +1,183 @@
+"""Walk-forward optimization of the trade21 RSI/Fibonacci parameters.
+
+History is split into rolling folds of ``train`` bars followed by ``test`` bars, advancing
+``step`` bars at a time. The parameter grid is swept on every train window (all symbols
+and folds in one process pool, see param_sweep.py), and the best parameters of each
+fold are then scored on its test window, which the optimization never saw.
+
+Each fold's result is cached as JSON under WALK_FORWARD_CACHE_DIR, keyed by a hash of
+its candle slice, the sweep settings (with the grid expanded to the parameter combinations
+actually run) and param_sweep.SWEEP_VERSION. Folds start on bars aligned to the step in
+epoch time, so after new candles arrive the old folds keep their slices and hashes and
+only the new folds are computed.
+
+    python walk_forward.py --symbols R_100,R_75 --train 2000 --test 500
+"""
+import argparse
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+from param_sweep import OHLC, PARAMETERS, SWEEP_VERSION, evaluate_params, expand_grid, load_candles, run_sweep
+
+WALK_FORWARD_CACHE_DIR = os.getenv("WALK_FORWARD_CACHE_DIR", "walk_forward_cache")
+
+
+def fold_starts(epochs, step):
+    """First bar of each fold: bars where the epoch enters a new block of ``step`` bars.
+
+    Blocks are counted from epoch 0, so boundaries stay on the same candles however much
+    history is loaded.
+    """
+    epochs = np.asarray(epochs, dtype=np.int64)
+    if len(epochs) < 2:
+        return np.zeros(len(epochs), dtype=np.int64)
+    span = int(np.min(np.diff(epochs))) * step
+    block = epochs // span
+    return np.flatnonzero(np.r_[epochs[0] % span == 0, block[1:] != block[:-1]])
+
+
+def make_folds(n, train, test, step=None, epochs=None):
+    """(train_start, test_start, test_end) bar indices of every complete fold"""
+    step = step or test
+    starts = fold_starts(epochs, step) if epochs is not None else np.arange(0, n, step)
+    return [(int(start), int(start + train), int(start + train + test))
+            for start in starts if start + train + test <= n]
+
+
+def _slice_hash(arrays, settings):
+    digest = hashlib.sha256(json.dumps(settings, sort_keys=True).encode())
+    for values in arrays:
+        digest.update(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+    return digest.hexdigest()[:32]
+
+
+class FoldCache:
+    """Fold results stored as one JSON file per key"""
+
+    def __init__(self, directory=WALK_FORWARD_CACHE_DIR):
+        self.directory = directory
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def put(self, key, result):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = self._path(key) + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(result, f)
+        os.replace(tmp, self._path(key))
+
+
+def _best_params(results, metric, min_trades):
+    """(params, metric) of the best row of one train window's sweep, or None if nothing traded enough"""
+    results = results[results['trades'] >= min_trades]
+    if results.empty:
+        return None
+    best = results[metric].idxmax()
+    return {name: results.at[best, name].item() for name in PARAMETERS}, float(results.at[best, metric])
+
+
+def walk_forward(frames, train=2000, test=500, step=None, grid=None, metric='total_return', min_trades=5,
+                 fee=0.0, max_bars=None, workers=None, cache=None):
+    """Runs the walk-forward over {symbol: OHLC DataFrame}; returns one row per symbol and fold.
+
+    Each row has the fold's bar range, the parameters chosen on the train window with their
+    train ``metric``, and the metrics of those parameters on the test window.
+    """
+    cache = FoldCache() if cache is None else cache
+    combos = expand_grid(grid)
+    # Bars before the test window that the indicators need to be valid at its first bar
+    warmup = max(max(params['window'], params['rsi_period'] + 1) for params in combos)
+    settings = {'version': SWEEP_VERSION, 'combos': combos, 'metric': metric, 'min_trades': min_trades,
+                'fee': fee, 'max_bars': max_bars, 'train': train, 'test': test}
+
+    folds, pending = [], {}
+    for symbol, frame in frames.items():
+        arrays = [np.asarray(frame[column], dtype=float) for column in OHLC]
+        epochs = frame['epoch'].to_numpy() if 'epoch' in frame else None
+        for number, (train_start, test_start, test_end) in enumerate(
+                make_folds(len(frame), train, test, step, epochs)):
+            key = _slice_hash([values[train_start:test_end] for values in arrays], settings)
+            fold = {'symbol': symbol, 'fold': number, 'key': key,
+                    'train_start': train_start, 'test_start': test_start, 'test_end': test_end}
+            if epochs is not None:
+                fold.update(train_from=int(epochs[train_start]), test_from=int(epochs[test_start]),
+                            test_to=int(epochs[test_end - 1]))
+            folds.append(fold)
+            if cache.get(key) is None:
+                pending[key] = frame.iloc[train_start:test_end]
+
+    if pending:
+        # Optimize every uncached train window in one sweep, then score each on its test window
+        train_frames = {key: part.iloc[:train] for key, part in pending.items()}
+        sweep = run_sweep(train_frames, grid, fee, max_bars, workers)
+        for key, results in sweep.groupby('symbol'):
+            part = pending[key]
+            chosen = _best_params(results, metric, min_trades)
+            result = {'params': None, 'train_metric': None, 'test': None}
+            if chosen is not None:
+                params, train_metric = chosen
+                lead = min(warmup, train)
+                scored = part.iloc[train - lead:]
+                series = {column: np.asarray(scored[column], dtype=float) for column in OHLC}
+                result = {'params': params, 'train_metric': train_metric,
+                          'test': evaluate_params(series, [params], fee, max_bars, start=lead)[0]}
+            cache.put(key, result)
+
+    rows = []
+    for fold in folds:
+        result = cache.get(fold['key'])
+        row = dict(fold, **(result['params'] or {}), train_metric=result['train_metric'])
+        for name, value in (result['test'] or {}).items():
+            if name not in PARAMETERS:
+                row[f'test_{name}'] = value
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def summarize(results, metric='total_return'):
+    """Per-symbol out-of-sample summary: folds, compounded test return, and train vs test ``metric``"""
+    traded = results.dropna(subset=['train_metric'])
+    grouped = traded.groupby('symbol')
+    return pd.DataFrame({
+        'folds': grouped['fold'].count(),
+        'test_return': grouped['test_total_return'].apply(lambda returns: float(np.prod(1 + returns) - 1)),
+        'test_trades': grouped['test_trades'].sum(),
+        'train_metric': grouped['train_metric'].mean(),
+        'test_metric': grouped[f'test_{metric}'].mean(),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Walk-forward optimization of the RSI/Fibonacci strategy")
+    parser.add_argument('--symbols', default='R_10,R_25,R_50,R_75,R_100')
+    parser.add_argument('--granularity', type=int, default=300)
+    parser.add_argument('--count', type=int, default=5000)
+    parser.add_argument('--train', type=int, default=2000)
+    parser.add_argument('--test', type=int, default=500)
+    parser.add_argument('--step', type=int)
+    parser.add_argument('--metric', default='total_return')
+    parser.add_argument('--fee', type=float, default=0.0)
+    parser.add_argument('--workers', type=int)
+    args = parser.parse_args()
+
+    frames = load_candles(args.symbols.split(','), args.granularity, args.count)
+    results = walk_forward(frames, args.train, args.test, args.step, metric=args.metric, fee=args.fee,
+                           workers=args.workers)
+    columns = ['symbol', 'fold', *PARAMETERS, 'train_metric', f'test_{args.metric}', 'test_trades']
+    print(results[[column for column in columns if column in results]].to_string())
+    print()
+    print(summarize(results, args.metric).to_string())
+
+
+if __name__ == '__main__':
+    main()